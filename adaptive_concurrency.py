@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Adaptive (AIMD) download concurrency
+
+Raises the number of concurrent downloads by one while throughput and
+success rate hold up, and halves it on timeouts or 429/5xx responses.
+The settled value is stored per provider so the next run starts there.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from pipeline_state import load_json, save_json, state_path
+
+DEFAULT_INITIAL = 4
+MIN_WINDOW = 4  # transfers per evaluation window, at least
+
+
+def is_congestion_signal(status=None, timed_out=False):
+    """
+    Timeouts, 429 and 5xx mean the provider wants us to back off
+    """
+    return timed_out or status == 429 or (status is not None and status >= 500)
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease limit on concurrent downloads
+
+    Workers take a slot() around each transfer and record() its outcome.
+    Every window of completed transfers is compared with the previous one:
+    if throughput and success rate did not drop, the limit grows by
+    `increase`. Any congestion signal multiplies the limit by `decrease`
+    (once per round of in-flight requests).
+
+    Args:
+        provider: Name the settled limit is stored under (e.g. 'bing')
+        initial: Starting limit; defaults to the stored value for provider
+        min_limit: Lowest allowed limit
+        max_limit: Highest allowed limit (size the worker pool to this)
+        increase: Additive step
+        decrease: Multiplicative factor applied on congestion
+        state_file: JSON file holding the settled limit per provider
+    """
+
+    def __init__(self, provider, initial=None, min_limit=1, max_limit=16,
+                 increase=1, decrease=0.5, state_file=None):
+        self.provider = provider
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.state_file = state_file or state_path("concurrency.json")
+
+        if initial is None:
+            saved = load_json(self.state_file, {}).get(provider, {})
+            initial = saved.get('limit', DEFAULT_INITIAL)
+        self.limit = self._clamp(initial)
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._prev_throughput = None
+        self._prev_success = None
+        self._reset_window()
+
+    def _clamp(self, value):
+        return max(self.min_limit, min(self.max_limit, int(value)))
+
+    def _reset_window(self):
+        self._window_start = time.monotonic()
+        self._window_total = 0
+        self._window_ok = 0
+        self._window_bytes = 0
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one of the `limit` download slots; yields the start time
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield time.monotonic()
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def record(self, started, ok, nbytes=0, status=None, timed_out=False):
+        """
+        Report the outcome of one transfer
+
+        Args:
+            started: Value yielded by slot() for this transfer
+            ok: Whether the transfer produced a usable file
+            nbytes: Bytes received
+            status: HTTP status code, if a response arrived
+            timed_out: The request timed out
+        """
+        with self._cond:
+            if is_congestion_signal(status, timed_out):
+                # Requests already in flight when we backed off report the
+                # same congestion; only the first round counts
+                if started >= self._last_decrease:
+                    self._set_limit(self.limit * self.decrease, "congestion")
+                    self._last_decrease = time.monotonic()
+                    self._prev_throughput = None
+                    self._reset_window()
+                return
+
+            self._window_total += 1
+            if ok:
+                self._window_ok += 1
+                self._window_bytes += nbytes
+
+            if self._window_total >= max(self.limit, MIN_WINDOW):
+                self._evaluate_window()
+
+    def _evaluate_window(self):
+        elapsed = max(time.monotonic() - self._window_start, 1e-6)
+        throughput = self._window_bytes / elapsed
+        success = self._window_ok / self._window_total
+
+        improving = (
+            self._prev_throughput is None
+            or (throughput >= self._prev_throughput * 0.95
+                and success >= self._prev_success - 0.05)
+        )
+        if improving:
+            self._set_limit(self.limit + self.increase, "throughput holding")
+
+        self._prev_throughput = throughput
+        self._prev_success = success
+        self._reset_window()
+
+    def _set_limit(self, value, reason):
+        new_limit = self._clamp(value)
+        if new_limit == self.limit:
+            return
+        print(f"[concurrency] {self.provider}: {self.limit} -> {new_limit} workers ({reason})")
+        self.limit = new_limit
+        self._cond.notify_all()
+        self.save()
+
+    def save(self):
+        """
+        Store the current limit so the next run for this provider starts there
+        """
+        state = load_json(self.state_file, {})
+        state[self.provider] = {
+            'limit': self.limit,
+            'updated': datetime.now().isoformat(timespec='seconds'),
+        }
+        save_json(self.state_file, state)
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def controller_for(provider, **kwargs):
+    """
+    Return the process-wide controller for a provider
+
+    All crawls against one provider in a run share a single limit.
+    """
+    with _controllers_lock:
+        controller = _controllers.get(provider)
+        if controller is None:
+            controller = AIMDController(provider, **kwargs)
+            _controllers[provider] = controller
+        return controller
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog of every downloaded and derived image
+
+One row per original download (keyed by content hash) with where it came
+from and what it is, and one row per file written to an output folder
+with the variant that produced it. Scripts ask the catalog instead of
+globbing folders and opening every file: dimensions are read from the
+image header when a row is written, never by decoding.
+
+Run directly for a per-folder summary:
+    python asset_catalog.py
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from image_probe import PROBE_LIMIT, probe_image_size
+from image_store import hash_file
+from pipeline_state import state_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    sha256 TEXT PRIMARY KEY,
+    source_url TEXT,
+    query TEXT,
+    provider TEXT,
+    format TEXT,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER,
+    first_seen REAL,
+    last_seen REAL
+);
+CREATE TABLE IF NOT EXISTS derivatives (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    source_sha256 TEXT NOT NULL REFERENCES assets(sha256),
+    variant TEXT NOT NULL,
+    sha256 TEXT,
+    format TEXT,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER,
+    created REAL
+);
+CREATE INDEX IF NOT EXISTS derivatives_by_source ON derivatives(source_sha256, variant);
+CREATE INDEX IF NOT EXISTS derivatives_by_folder ON derivatives(folder);
+CREATE INDEX IF NOT EXISTS assets_by_query ON assets(provider, query);
+CREATE INDEX IF NOT EXISTS assets_by_source_url ON assets(source_url);
+"""
+
+
+def probe_file(path):
+    """
+    Read (format, width, height, bytes) of a file from its header
+
+    Format and dimensions are None when the header cannot be parsed.
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        probe = probe_image_size(f.read(PROBE_LIMIT))
+    fmt, width, height = probe if probe else (None, None, None)
+    return fmt, width, height, path.stat().st_size
+
+
+def folder_key(path):
+    """
+    Folder column value for a path: resolved, so relative and absolute match
+    """
+    return str(Path(path).resolve().parent)
+
+
+class AssetCatalog:
+    """
+    Thread-safe handle on the catalog database
+
+    Args:
+        db_path: SQLite file (defaults to .image_pipeline/catalog.sqlite3)
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or state_path("catalog.sqlite3")
+        self._lock = threading.Lock()
+        # Downloader threads share the connection; the lock serialises them
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def record_asset(self, sha256, path=None, source_url=None, query=None, provider=None,
+                     format=None, width=None, height=None, nbytes=None):
+        """
+        Add or update an original download
+
+        Missing format/size fields are read from the header of path. The
+        first source URL, query and provider seen for a hash are kept.
+        """
+        if path is not None and None in (format, width, height, nbytes):
+            probed = probe_file(path)
+            format, width, height, nbytes = [known if known is not None else found
+                                             for known, found in zip((format, width, height, nbytes), probed)]
+        now = time.time()
+        self._execute("""
+            INSERT INTO assets (sha256, source_url, query, provider, format, width, height,
+                                bytes, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(sha256) DO UPDATE SET
+                source_url = COALESCE(assets.source_url, excluded.source_url),
+                query = COALESCE(assets.query, excluded.query),
+                provider = COALESCE(assets.provider, excluded.provider),
+                format = COALESCE(excluded.format, assets.format),
+                width = COALESCE(excluded.width, assets.width),
+                height = COALESCE(excluded.height, assets.height),
+                bytes = COALESCE(excluded.bytes, assets.bytes),
+                last_seen = excluded.last_seen
+        """, (sha256, source_url, query, provider, format, width, height, nbytes, now, now))
+
+    def asset(self, sha256):
+        rows = self._execute("SELECT * FROM assets WHERE sha256 = ?", (sha256,))
+        return dict(rows[0]) if rows else None
+
+    def source_sha256(self, url):
+        """
+        Hash of the original downloaded from url, or None
+        """
+        rows = self._execute("SELECT sha256 FROM assets WHERE source_url = ?", (url,))
+        return rows[0]['sha256'] if rows else None
+
+    def query_sources(self, provider, queries):
+        """
+        Hashes of the originals these searches found, oldest first
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+        rows = self._execute(f"""
+            SELECT sha256 FROM assets
+            WHERE provider = ? AND query IN ({', '.join('?' * len(queries))})
+            ORDER BY first_seen
+        """, [provider] + queries)
+        return [row['sha256'] for row in rows]
+
+    def record_derivative(self, source_sha256, variant, path):
+        """
+        Record a file written to an output folder from source_sha256
+
+        The file's own hash, format, dimensions and size are filled in from
+        the file, replacing any earlier row for the same path.
+        """
+        path = Path(path)
+        fmt, width, height, nbytes = probe_file(path)
+        self._execute("INSERT OR IGNORE INTO assets (sha256, first_seen, last_seen) VALUES (?, ?, ?)",
+                      (source_sha256, time.time(), time.time()))
+        self._execute("""
+            INSERT OR REPLACE INTO derivatives (path, folder, source_sha256, variant, sha256,
+                                                format, width, height, bytes, created)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (str(path.resolve()), folder_key(path), source_sha256, variant, hash_file(path),
+              fmt, width, height, nbytes, time.time()))
+
+    def derived_path(self, source_sha256, variant):
+        """
+        Output previously produced from this source for a variant, if it still exists
+        """
+        rows = self._execute("SELECT path FROM derivatives WHERE source_sha256 = ? AND variant = ?",
+                             (source_sha256, variant))
+        for row in rows:
+            if Path(row['path']).exists():
+                return Path(row['path'])
+            self.forget(row['path'])
+        return None
+
+    def move(self, old_path, new_path):
+        """
+        Re-point a derivative row after its file was renamed
+        """
+        new_path = Path(new_path)
+        self._execute("UPDATE derivatives SET path = ?, folder = ? WHERE path = ?",
+                      (str(new_path.resolve()), folder_key(new_path), str(Path(old_path).resolve())))
+
+    def forget(self, path):
+        self._execute("DELETE FROM derivatives WHERE path = ?", (str(Path(path).resolve()),))
+
+    def outputs(self, folder, variant=None):
+        """
+        Rows for files recorded in folder that still exist, oldest first
+        """
+        sql = "SELECT * FROM derivatives WHERE folder = ?"
+        params = [str(Path(folder).resolve())]
+        if variant is not None:
+            sql += " AND variant = ?"
+            params.append(variant)
+        rows = self._execute(sql + " ORDER BY created", params)
+        kept = []
+        for row in rows:
+            if Path(row['path']).exists():
+                kept.append(dict(row))
+            else:
+                self.forget(row['path'])
+        return kept
+
+    def sources(self, variants):
+        """
+        Hashes of the sources any of these variants was made from, oldest output first
+        """
+        variants = list(variants)
+        if not variants:
+            return []
+        rows = self._execute(f"""
+            SELECT source_sha256, MIN(created) AS first FROM derivatives
+            WHERE variant IN ({', '.join('?' * len(variants))})
+            GROUP BY source_sha256 ORDER BY first
+        """, variants)
+        return [row['source_sha256'] for row in rows]
+
+    def sync_folder(self, folder, pattern, variant):
+        """
+        Catalog files matching pattern that predate the catalog
+
+        Each untracked image is recorded as its own source (hash + header
+        read, no decode); other files are skipped. Returns the number added.
+        """
+        known = {row['path'] for row in self.outputs(folder)}
+        added = 0
+        for path in sorted(Path(folder).glob(pattern)):
+            if str(path.resolve()) in known or probe_file(path)[0] is None:
+                continue
+            sha256 = hash_file(path)
+            self.record_asset(sha256, path=path)
+            self.record_derivative(sha256, variant, path)
+            added += 1
+        return added
+
+    def folder_summary(self):
+        return [dict(row) for row in self._execute("""
+            SELECT folder, COUNT(*) AS files, COUNT(DISTINCT source_sha256) AS sources,
+                   SUM(bytes) AS bytes
+            FROM derivatives GROUP BY folder ORDER BY folder
+        """)]
+
+    def provider_summary(self):
+        return [dict(row) for row in self._execute("""
+            SELECT COALESCE(provider, 'unknown') AS provider, COUNT(*) AS assets, SUM(bytes) AS bytes
+            FROM assets GROUP BY provider ORDER BY assets DESC
+        """)]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def print_catalog_report(catalog=None):
+    """
+    Per-folder counts and sizes, plus where the originals came from
+    """
+    catalog = catalog or AssetCatalog()
+    print("=" * 50)
+    print(f"ASSET CATALOG: {catalog.db_path}")
+    print("=" * 50)
+    for row in catalog.folder_summary():
+        print(f"{Path(row['folder']).name}: {row['files']} files from {row['sources']} "
+              f"sources, {(row['bytes'] or 0) / 1024 / 1024:.2f} MB")
+    print("\nOriginals by provider:")
+    for row in catalog.provider_summary():
+        print(f"  {row['provider']}: {row['assets']} ({(row['bytes'] or 0) / 1024 / 1024:.2f} MB)")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    print_catalog_report()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+JPEG / WebP encoding to a byte budget or an SSIM floor
+
+Outputs used to be saved at quality 95, roughly twice the bytes a
+one-second background flash needs. An Encoder binary-searches the
+quality instead: the lowest quality whose SSIM against the unencoded
+image reaches min_ssim, capped at the highest quality that fits
+max_bytes. SSIM is computed with NumPy on a downscaled luma plane, so
+each step of the search costs one encode and one decode of a small
+image. Encodes are optimized and progressive, and metadata (EXIF, ICC
+profiles, comments) is stripped.
+
+Run directly for a before/after byte report, and with --apply to
+re-encode the files in place (only those that get smaller):
+    python budget_encoder.py [--min-ssim 0.99] [--max-kb 150] [--apply] folder ...
+"""
+
+import argparse
+import io
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from asset_catalog import AssetCatalog
+from stream_writer import write_atomic
+
+# SSIM is measured on luma downscaled to at most this many pixels per side;
+# much smaller and the downscale averages JPEG block artifacts away
+SSIM_SIDE = 512
+
+# Floor used when neither a floor nor a budget is given (about quality 50-60
+# for the square crops, indistinguishable at countdown display size)
+DEFAULT_MIN_SSIM = 0.99
+
+# Side of the square window SSIM statistics are averaged over
+SSIM_WINDOW = 7
+
+# Standard SSIM stabilising constants for 8-bit data
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+MIN_QUALITY = 30
+MAX_QUALITY = 95
+
+
+def luma_plane(img, side=SSIM_SIDE):
+    """
+    Greyscale float array of img, box-downscaled so its longer side is at most side
+    """
+    luma = img.convert('L')
+    scale = side / max(luma.size)
+    if scale < 1:
+        luma = luma.resize((max(1, round(luma.width * scale)), max(1, round(luma.height * scale))),
+                           Image.Resampling.BOX)
+    return np.asarray(luma, dtype=np.float64)
+
+
+def window_mean(values, window=SSIM_WINDOW):
+    """
+    Mean over every window x window block, from a summed-area table
+    """
+    table = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    sums = (table[window:, window:] - table[:-window, window:]
+            - table[window:, :-window] + table[:-window, :-window])
+    return sums / (window * window)
+
+
+def ssim(reference, candidate):
+    """
+    Mean structural similarity of two luma planes of the same shape
+    """
+    if min(reference.shape) < SSIM_WINDOW:
+        return 1.0 if np.array_equal(reference, candidate) else 0.0
+    mu_x = window_mean(reference)
+    mu_y = window_mean(candidate)
+    var_x = window_mean(reference * reference) - mu_x * mu_x
+    var_y = window_mean(candidate * candidate) - mu_y * mu_y
+    covariance = window_mean(reference * candidate) - mu_x * mu_y
+    index = (((2 * mu_x * mu_y + SSIM_C1) * (2 * covariance + SSIM_C2))
+             / ((mu_x * mu_x + mu_y * mu_y + SSIM_C1) * (var_x + var_y + SSIM_C2)))
+    return float(index.mean())
+
+
+class Encoded:
+    """
+    Result of one Encoder.encode() call
+
+    Attributes:
+        data: Encoded bytes
+        quality: Quality the bytes were encoded at
+        ssim: SSIM of the encoded image against the input (None if not measured)
+        over_budget: The encoder's max_bytes was not met even at MIN_QUALITY
+    """
+
+    def __init__(self, data, quality, ssim=None, over_budget=False):
+        self.data = data
+        self.quality = quality
+        self.ssim = ssim
+        self.over_budget = over_budget
+
+
+class Encoder:
+    """
+    Encodes images at a fixed quality, or at the quality a budget allows
+
+    With neither max_bytes nor min_ssim this is a plain encode at quality.
+
+    Args:
+        format: 'JPEG' or 'WEBP'
+        quality: Fixed quality, and the top of the search range
+        max_bytes: Largest acceptable output (None = no budget)
+        min_ssim: Lowest acceptable SSIM against the input (None = no floor)
+        optimize: Optimized Huffman tables (JPEG) / slower, smaller encode (WebP)
+        progressive: Progressive JPEG
+        strip: Drop EXIF, ICC profiles and comments
+    """
+
+    def __init__(self, format='JPEG', quality=MAX_QUALITY, max_bytes=None, min_ssim=None,
+                 optimize=True, progressive=True, strip=True):
+        if format not in ('JPEG', 'WEBP'):
+            raise ValueError(f"unsupported format: {format}")
+        self.format = format
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.min_ssim = min_ssim
+        self.optimize = optimize
+        self.progressive = progressive
+        self.strip = strip
+
+    @property
+    def searching(self):
+        return self.max_bytes is not None or self.min_ssim is not None
+
+    def _save(self, img, quality):
+        options = {'quality': quality}
+        if self.format == 'JPEG':
+            options.update(optimize=self.optimize, progressive=self.progressive)
+        elif self.optimize:
+            options['method'] = 6
+        buffer = io.BytesIO()
+        img.save(buffer, self.format, **options)
+        return buffer.getvalue()
+
+    def encode(self, img):
+        """
+        Encode img, searching the quality if a budget or floor is set
+
+        Returns:
+            Encoded
+        """
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        if self.strip:
+            img = img.copy()
+            img.info = {}
+        if not self.searching:
+            return Encoded(self._save(img, self.quality), self.quality)
+
+        reference = luma_plane(img)
+        tried = {}
+
+        def attempt(quality):
+            if quality not in tried:
+                data = self._save(img, quality)
+                with Image.open(io.BytesIO(data)) as decoded:
+                    score = ssim(reference, luma_plane(decoded)) if self.min_ssim is not None else None
+                tried[quality] = Encoded(data, quality, score)
+            return tried[quality]
+
+        def good_enough(encoded):
+            return self.min_ssim is None or encoded.ssim >= self.min_ssim
+
+        def fits(encoded):
+            return self.max_bytes is None or len(encoded.data) <= self.max_bytes
+
+        # Lowest quality meeting the SSIM floor, or the top when there is no floor
+        low, high = MIN_QUALITY, self.quality
+        if self.min_ssim is not None:
+            while low < high:
+                middle = (low + high) // 2
+                if good_enough(attempt(middle)):
+                    high = middle
+                else:
+                    low = middle + 1
+        best = high
+
+        # Budget wins over the floor: come down until the bytes fit
+        if not fits(attempt(best)):
+            low, high = MIN_QUALITY, best
+            while low < high:
+                middle = (low + high + 1) // 2
+                if fits(attempt(middle)):
+                    low = middle
+                else:
+                    high = middle - 1
+            best = low
+        encoded = attempt(best)
+        # Even MIN_QUALITY is too big: hand back the smallest encode, flagged
+        encoded.over_budget = not fits(encoded)
+        return encoded
+
+
+def recompress_folder(folder, encoder, apply=False, catalog=None):
+    """
+    Re-encode a folder's JPEGs with encoder
+
+    Files are only replaced (with apply) when the new encode is smaller,
+    and are then re-recorded in the catalog so its hashes stay current.
+    The new file is renamed over the old one, never written into it, so
+    an interrupted run cannot truncate an image and a file hard-linked
+    from the content store keeps its original bytes there.
+
+    Returns:
+        (files, bytes before, bytes after, files still over max_bytes)
+    """
+    files = before = after = over_budget = 0
+    rows = {row['path']: row for row in catalog.outputs(folder)} if catalog is not None else {}
+    for path in sorted(Path(folder).glob("*.jpg")):
+        size = path.stat().st_size
+        with Image.open(path) as img:
+            encoded = encoder.encode(img)
+        new_size = min(size, len(encoded.data))
+        files += 1
+        before += size
+        after += new_size
+        if encoded.over_budget:
+            over_budget += 1
+        if apply and len(encoded.data) < size:
+            write_atomic(path, encoded.data)
+            row = rows.get(str(path.resolve()))
+            if row:
+                catalog.record_derivative(row['source_sha256'], row['variant'], path)
+    return files, before, after, over_budget
+
+
+def print_byte_report(folders, encoder, apply=False):
+    """
+    Before/after bytes per folder for re-encoding its JPEGs with encoder
+    """
+    catalog = AssetCatalog() if apply else None
+    limits = []
+    if encoder.min_ssim is not None:
+        limits.append(f"SSIM >= {encoder.min_ssim}")
+    if encoder.max_bytes is not None:
+        limits.append(f"<= {encoder.max_bytes / 1024:.0f} KB")
+    print("=" * 50)
+    print(f"RE-ENCODE {'' if apply else '(dry run) '}{encoder.format}: {', '.join(limits) or f'quality {encoder.quality}'}")
+    print("=" * 50)
+    total_before = total_after = total_over = 0
+    for folder in folders:
+        files, before, after, over_budget = recompress_folder(folder, encoder, apply, catalog)
+        total_before += before
+        total_after += after
+        total_over += over_budget
+        if files:
+            missed = f", {over_budget} over budget" if over_budget else ""
+            print(f"{folder}: {files} files, {before / 1024:.0f} KB -> {after / 1024:.0f} KB "
+                  f"({1 - after / before:.0%} smaller){missed}")
+    if total_before:
+        print(f"\nTotal: {total_before / 1024 / 1024:.2f} MB -> {total_after / 1024 / 1024:.2f} MB")
+    if total_over:
+        print(f"{total_over} files do not fit {encoder.max_bytes / 1024:.0f} KB even at quality {MIN_QUALITY}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-encode image folders to a byte budget or SSIM floor")
+    parser.add_argument('folders', nargs='+')
+    parser.add_argument('--min-ssim', type=float, default=None)
+    parser.add_argument('--max-kb', type=float, default=None)
+    parser.add_argument('--apply', action='store_true', help="replace files that get smaller")
+    args = parser.parse_args()
+    min_ssim = args.min_ssim if args.min_ssim is not None or args.max_kb is not None else DEFAULT_MIN_SSIM
+    max_bytes = int(args.max_kb * 1024) if args.max_kb is not None else None
+    print_byte_report(args.folders, Encoder(max_bytes=max_bytes, min_ssim=min_ssim), args.apply)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Countdown background image manifest, generated from the asset catalog
+
+The countdown used to preload a hand-typed list of paths, which had to
+be kept in step with the folders by hand (files deleted from a folder
+left holes, a typo meant a failed request mid-countdown). This writes
+js/countdown/countdown-manifest.js from the catalog's approved outputs:
+every image still present in the countdown folders, in folder and name
+order, with its dimensions, byte size and content hash, plus the byte
+size of each responsive ladder rung so the page can plan its preload
+from real numbers.
+
+index.html loads the manifest with a short hash of its contents as the
+cache-buster, rewritten here whenever the manifest changes, so browsers
+never keep a stale image list.
+
+Run from the repository root after changing a countdown folder:
+    python countdown_manifest.py
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from asset_catalog import AssetCatalog
+from responsive_images import (COUNTDOWN_FOLDERS, FORMATS, LADDER_WIDTHS, available_widths,
+                               build_ladder, ladder_path)
+
+MANIFEST = Path("js/countdown/countdown-manifest.js")
+INDEX = Path("index.html")
+
+# Hex digits of the manifest's SHA-256 used as its ?v= cache-buster
+VERSION_LENGTH = 12
+
+# Catalog variant each folder's images are recorded under if they predate the catalog
+COUNTDOWN_VARIANTS = {
+    "cowboys_memes_square": "pad_square_720",
+}
+DEFAULT_VARIANT = "center_crop_square"
+
+
+def approved_rows(catalog, folder):
+    """
+    Catalog rows of the images in folder, refreshed where the file changed, by name
+    """
+    variant = f"{Path(folder).name}:{COUNTDOWN_VARIANTS.get(Path(folder).name, DEFAULT_VARIANT)}"
+    catalog.sync_folder(folder, "*.jpg", variant)
+    for row in catalog.outputs(folder):
+        if Path(row['path']).stat().st_size != row['bytes']:
+            catalog.record_derivative(row['source_sha256'], row['variant'], row['path'])
+    rows = [row for row in catalog.outputs(folder) if Path(row['path']).suffix.lower() == '.jpg']
+    return sorted(rows, key=lambda row: Path(row['path']).name)
+
+
+def manifest_entry(folder, row):
+    path = Path(folder) / Path(row['path']).name
+    ladder = {}
+    for width in available_widths(path):
+        ladder[str(width)] = {ext: ladder_path(path, width, ext).stat().st_size for ext in FORMATS}
+    return {
+        'path': path.as_posix(),
+        'width': row['width'],
+        'height': row['height'],
+        'bytes': row['bytes'],
+        'sha256': row['sha256'],
+        'ladder': ladder,
+    }
+
+
+def write_manifest(folders=COUNTDOWN_FOLDERS, manifest=MANIFEST, catalog=None):
+    """
+    Build missing ladder rungs and write the manifest
+
+    Returns:
+        List of manifest entries
+    """
+    catalog = catalog or AssetCatalog()
+    entries = []
+    for folder in folders:
+        for row in approved_rows(catalog, folder):
+            build_ladder(row['path'], catalog)
+            entries.append(manifest_entry(folder, row))
+    lines = [f"        {json.dumps(entry)}," for entry in entries]
+    manifest.write_text(
+        "/**\n"
+        " * Countdown background images: approved outputs from the asset catalog\n"
+        " * Generated by countdown_manifest.py - do not edit by hand\n"
+        " */\n\n"
+        "window.COUNTDOWN_MANIFEST = {\n"
+        f"    ladderWidths: {json.dumps(list(LADDER_WIDTHS))},\n"
+        "    images: [\n" + "\n".join(lines).rstrip(",") + "\n    ]\n};\n",
+        encoding='utf-8')
+    return entries
+
+
+def stamp_version(manifest=MANIFEST, index=INDEX):
+    """
+    Point index.html's manifest script tag at ?v=<hash of the manifest>
+
+    Returns:
+        The version string
+    """
+    version = hashlib.sha256(manifest.read_bytes()).hexdigest()[:VERSION_LENGTH]
+    html = index.read_text(encoding='utf-8')
+    tag = re.compile(re.escape(manifest.as_posix()) + r'(\?v=[^"\']*)?')
+    if not tag.search(html):
+        raise ValueError(f"{index} has no script tag for {manifest.as_posix()}")
+    index.write_text(tag.sub(f"{manifest.as_posix()}?v={version}", html), encoding='utf-8')
+    return version
+
+
+def print_manifest_summary(entries):
+    print("=" * 50)
+    print(f"COUNTDOWN MANIFEST: {len(entries)} images -> {MANIFEST}")
+    print("=" * 50)
+    for folder in COUNTDOWN_FOLDERS:
+        count = sum(1 for e in entries if e['path'].startswith(f"{folder}/"))
+        print(f"{folder}: {count} images")
+    print(f"\nOriginals: {sum(e['bytes'] for e in entries) / 1024 / 1024:.2f} MB")
+    for width in LADDER_WIDTHS:
+        # Images without this rung are served at their largest smaller one
+        sizes = {ext: 0 for ext in FORMATS}
+        for entry in entries:
+            usable = [w for w in map(int, entry['ladder']) if w <= width]
+            for ext in FORMATS:
+                sizes[ext] += entry['ladder'][str(max(usable))][ext] if usable else entry['bytes']
+        print(f"{width}px: " + ", ".join(f"{ext} {n / 1024 / 1024:.2f} MB" for ext, n in sizes.items()))
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    entries = write_manifest()
+    print_manifest_summary(entries)
+    print(f"{INDEX} loads it as ?v={stamp_version()}")
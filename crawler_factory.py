@@ -0,0 +1,813 @@
+#!/usr/bin/env python3
+"""
+Shared construction of the icrawler crawlers used by the download scripts
+
+Crawlers built here use PipelineImageDownloader, which runs each transfer
+inside an adaptive concurrency slot and behind the per-host rate limiter,
+and drops images that fail the job's size constraints after the header.
+Kept files are stored once by hash, linked into the crawler's folder and
+recorded in the asset catalog with their source URL, query and provider.
+Result pages are served from the shared search cache when a fresh copy
+exists, so repeating a query costs no search requests. With a job journal,
+URLs an interrupted run already fetched are not requested again.
+start_crawl_terms() runs all of a job's search terms at once, sharing
+the provider's download slots and deduplicating across the terms. With a
+MemoryStorage, downloads are handed to the processing step as bytes and
+no raw files are written to the output folder at all. The crawl runs in
+the background while the caller processes each download as it lands,
+and stops the moment enough images have been accepted.
+"""
+
+import hashlib
+import io
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import current_thread
+from urllib.parse import parse_qs, urlparse, urlsplit
+
+import requests
+from icrawler import ImageDownloader
+from icrawler.builtin import BingImageCrawler, GoogleImageCrawler
+from icrawler.builtin.bing import BingParser
+from icrawler.builtin.google import GoogleParser
+from icrawler.storage import BaseStorage
+from PIL import Image
+
+from adaptive_concurrency import controller_for
+from asset_catalog import AssetCatalog
+from image_probe import (IMAGE_EXTENSIONS, PROBE_LIMIT, SNIFF_BYTES, ProbeStats,
+                         SizeConstraints, describe_non_image, probe_image_size,
+                         sniff_format)
+from image_store import ContentStore
+from rate_limiter import HostRateLimiter
+from search_cache import PAGE_SIZES, SearchCache
+from stream_writer import DEFAULT_MAX_BYTES, MaxBytesExceeded, StreamingWriter
+
+PROVIDER_NAMES = {
+    BingImageCrawler: 'bing',
+    GoogleImageCrawler: 'google',
+}
+
+CHUNK_SIZE = 16 * 1024
+
+# One limiter for every crawler in the process, so parallel crawls share host budgets
+default_rate_limiter = HostRateLimiter()
+
+
+class CachedResultsParser:
+    """
+    Parser mixin that takes result pages from the search cache
+
+    Pages are cached under the same page index SearchPager uses, the
+    result offset in the feeder's URL divided by the provider's PAGE_SIZES
+    entry, so icrawler jobs and the scripts paging a search themselves
+    share entries. On a miss the page is fetched and parsed as usual and
+    the extracted image URLs are stored for the next job.
+    """
+
+    search_cache = None
+    provider = None
+    query = None
+    # Query parameter holding the feeder's result offset
+    offset_param = None
+
+    def page_index(self, url):
+        offset = parse_qs(urlsplit(url).query).get(self.offset_param, ['0'])[0]
+        return int(offset) // PAGE_SIZES[self.provider]
+
+    def page_tasks(self, url, req_timeout, **kwargs):
+        """
+        Tasks for one result page, without a request if the page is cached
+        """
+        page = self.page_index(url) if self.search_cache is not None else None
+        if page is not None:
+            urls = self.search_cache.get(self.provider, self.query, page)
+            if urls is not None:
+                self.logger.info("search cache hit for page %d of %s", page, self.query)
+                return [dict(file_url=file_url) for file_url in urls]
+        base_url = "{0.scheme}://{0.netloc}".format(urlsplit(url))
+        response = self.session.get(url, timeout=req_timeout, headers={"Referer": base_url})
+        self.logger.info(f"parsing result page {url}")
+        tasks = list(self.parse(response, **kwargs) or [])
+        if page is not None:
+            self.search_cache.put(self.provider, self.query, page,
+                                  [task["file_url"] for task in tasks if isinstance(task, dict)])
+        return tasks
+
+    def worker_exec(self, queue_timeout=2, req_timeout=5, max_retry=3, **kwargs):
+        """
+        Same flow as icrawler's Parser.worker_exec, with page_tasks() for the page
+        """
+        while True:
+            if self.signal.get("reach_max_num"):
+                self.logger.info("downloaded image reached max num, thread %s "
+                                 "is ready to exit", current_thread().name)
+                break
+            try:
+                url = self.in_queue.get(timeout=queue_timeout)
+            except queue.Empty:
+                if self.signal.get("feeder_exited"):
+                    self.logger.info("no more page urls for thread %s to parse", current_thread().name)
+                    break
+                self.logger.info("%s is waiting for new page urls", current_thread().name)
+                continue
+            retry = max_retry
+            while retry > 0:
+                try:
+                    tasks = self.page_tasks(url, req_timeout, **kwargs)
+                except Exception as e:
+                    self.logger.error("Exception caught when fetching page %s, "
+                                      "error: %s, remaining retry times: %d", url, e, retry - 1)
+                else:
+                    for task in tasks:
+                        while not self.signal.get("reach_max_num"):
+                            try:
+                                self.output(task, timeout=1)
+                            except queue.Full:
+                                time.sleep(1)
+                            else:
+                                break
+                        if self.signal.get("reach_max_num"):
+                            break
+                    self.in_queue.task_done()
+                    break
+                finally:
+                    retry -= 1
+        self.logger.info(f"thread {current_thread().name} exit")
+
+
+class CachedBingParser(CachedResultsParser, BingParser):
+    offset_param = 'first'
+
+
+class CachedGoogleParser(CachedResultsParser, GoogleParser):
+    offset_param = 'start'
+
+
+CACHED_PARSERS = {
+    BingImageCrawler: CachedBingParser,
+    GoogleImageCrawler: CachedGoogleParser,
+}
+
+
+class SharedDedup:
+    """
+    URLs and image hashes already taken by one of a job's parallel crawls
+
+    Two search terms often turn up the same image; whichever crawl claims
+    it first downloads and keeps it, the others skip it.
+    """
+
+    def __init__(self):
+        self._urls = set()
+        self._hashes = set()
+        self._lock = threading.Lock()
+
+    def _claim(self, claimed, key):
+        with self._lock:
+            if key in claimed:
+                return False
+            claimed.add(key)
+            return True
+
+    def claim_url(self, url):
+        return self._claim(self._urls, url)
+
+    def claim_content(self, sha256):
+        return self._claim(self._hashes, sha256)
+
+
+class Download:
+    """
+    One downloaded image held in memory: raw file name, content hash and bytes
+    """
+
+    def __init__(self, name, sha256, data):
+        self.name = name
+        self.sha256 = sha256
+        self.data = data
+
+    def open(self):
+        return Image.open(io.BytesIO(self.data))
+
+
+class MemoryStorage(BaseStorage):
+    """
+    icrawler storage backend that keeps downloads in memory
+
+    The downloader collects each body in memory as it streams and hands
+    those bytes over directly. Nothing lands in the output folder: the
+    processing step takes the bytes from stream() and only its final
+    outputs are written there. Handed-out bytes are released; their names
+    stay taken. Names are the same 000001.jpg-style ids the file storage
+    would use, so the job journal and the per-term offsets work unchanged.
+
+    With store_originals the downloader also puts each body in the
+    content store. Job resume and a variant job's backfill rely on that
+    copy. Without it, no download touches the disk, and URLs an
+    interrupted run fetched but never processed are fetched again.
+
+    Args:
+        journal: JobJournal of a resumed job; what its interrupted run
+            fetched but never processed is reloaded
+        content_store: ContentStore to reload from (defaults to the shared one)
+        store_originals: Keep a copy of every download in the content store
+    """
+
+    def __init__(self, journal=None, content_store=None, store_originals=True):
+        self.store_originals = store_originals
+        self._downloads = {}
+        self._names = set()
+        self._arrivals = queue.Queue()
+        self._lock = threading.Lock()
+        if journal is not None:
+            self.restore(journal, content_store or ContentStore())
+
+    def write(self, id, data, sha256=None):
+        with self._lock:
+            self._names.add(id)
+            self._downloads[id] = Download(id, sha256 or hashlib.sha256(data).hexdigest(), data)
+        self._arrivals.put(id)
+
+    def exists(self, id):
+        with self._lock:
+            return id in self._names
+
+    def max_file_idx(self):
+        with self._lock:
+            stems = [os.path.splitext(name)[0] for name in self._names]
+        return max((int(stem) for stem in stems if stem.isdigit()), default=0)
+
+    def restore(self, journal, content_store):
+        """
+        Reload what an interrupted run fetched but never processed
+
+        Every name the journal has used stays taken, so new downloads
+        cannot reuse it; bodies still in state 'fetched' are read back from
+        the content store.
+        """
+        for record in list(journal.records.values()):
+            name = record.get('filename')
+            if not name:
+                continue
+            with self._lock:
+                self._names.add(name)
+            if record['state'] == 'fetched' and content_store.has(record['sha256']):
+                self.write(name, content_store.object_path(record['sha256']).read_bytes(),
+                           record['sha256'])
+
+    def stream(self, job=None, until=None):
+        """
+        Yield downloads as they land, while a background crawl runs
+
+        Args:
+            job: CrawlJob filling this storage; the stream ends once it is
+                over and every download has been handed out
+            until: Zero-argument callable checked after each download is
+                processed; once it returns True the job is stopped and the
+                stream ends, so nothing more is downloaded
+        """
+        handed_out = 0
+        while True:
+            try:
+                name = self._arrivals.get(timeout=0.2)
+            except queue.Empty:
+                if (job is None or not job.running()) and self._arrivals.empty():
+                    return
+                continue
+            with self._lock:
+                download = self._downloads.pop(name, None)
+            if download is None:
+                continue
+            yield download
+            handed_out += 1
+            if until is not None and until():
+                if job is not None and job.running():
+                    print(f"Target reached after {handed_out} downloads, stopping the crawl")
+                    job.stop()
+                return
+
+
+class Transfer:
+    """
+    One streamed GET: status, temp file and anything learned from the header probe
+    """
+
+    def __init__(self, status):
+        self.status = status
+        self.writer = None
+        self.format = None
+        self.image_size = None
+        self.rejected = None
+        self.bytes_read = 0
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.discard()
+
+
+class PipelineImageDownloader(ImageDownloader):
+    """
+    ImageDownloader that reports every transfer to an AIMD controller
+
+    The crawler starts controller.max_limit threads; only controller.limit
+    of them may be downloading at any moment. Bodies are streamed to a temp
+    file in the storage folder (for a MemoryStorage, into memory, plus the
+    content store if it keeps originals): anything whose magic bytes are not an image
+    is dropped on the first chunk, and the image header is probed so files
+    failing the job's constraints are dropped after a few KB instead of
+    after the full download. With skip_stored, a URL whose original is
+    already in the content store is not requested at all.
+    """
+
+    def __init__(self, thread_num, signal, session, storage, controller=None,
+                 rate_limiter=None, constraints=None, probe_stats=None,
+                 max_bytes=DEFAULT_MAX_BYTES, content_store=None, catalog=None,
+                 query=None, provider=None, journal=None, dedup=None, skip_stored=False):
+        super().__init__(thread_num, signal, session, storage)
+        self.controller = controller
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.constraints = constraints or SizeConstraints()
+        self.probe_stats = probe_stats or ProbeStats()
+        self.max_bytes = max_bytes
+        self.content_store = content_store or ContentStore()
+        self.catalog = catalog or AssetCatalog()
+        self.query = query
+        self.provider = provider
+        self.journal = journal
+        self.dedup = dedup
+        self.skip_stored = skip_stored
+
+    def stored(self, file_url):
+        """
+        Whether the original from file_url is already in the content store
+        """
+        sha256 = self.catalog.source_sha256(file_url)
+        return sha256 is not None and self.content_store.has(sha256)
+
+    def read_body(self, response, constraints):
+        """
+        Stream a 200 response to disk, aborting once the header fails constraints
+        """
+        transfer = Transfer(response.status_code)
+        length = response.headers.get('Content-Length')
+        length = int(length) if length and length.isdigit() else None
+        # A MemoryStorage gets the bytes collected while streaming; the temp
+        # file is only written if the content store keeps a copy
+        in_memory = isinstance(self.storage, MemoryStorage)
+        transfer.writer = StreamingWriter(self.staging_dir(), self.max_bytes, memory=in_memory,
+                                          spool=not in_memory or self.storage.store_originals)
+        try:
+            self._stream(response, transfer, constraints, length)
+        except MaxBytesExceeded as e:
+            transfer.rejected = str(e)
+        except Exception:
+            transfer.discard()
+            raise
+        if transfer.rejected:
+            return transfer
+        if transfer.format is None:
+            transfer.rejected = "not an image (empty or truncated body)"
+        transfer.writer.close()
+        return transfer
+
+    def _stream(self, response, transfer, constraints, length):
+        head = b""
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if self.signal.get("reach_max_num"):
+                # The job has its images; stop paying for this body
+                transfer.rejected = "crawl stopped"
+                return
+            transfer.writer.write(chunk)
+            transfer.bytes_read += len(chunk)
+            if head is None:
+                continue
+            head += chunk
+            if transfer.format is None and len(head) >= SNIFF_BYTES:
+                transfer.format = sniff_format(head)
+                if transfer.format is None:
+                    transfer.rejected = f"not an image ({describe_non_image(head)})"
+                    self.probe_stats.record_not_image(urlparse(response.url).netloc,
+                                                      transfer.bytes_read, length)
+                    return
+            probe = probe_image_size(head)
+            if probe is None:
+                if len(head) >= PROBE_LIMIT:
+                    head = None
+                continue
+            head = None
+            self.probe_stats.record_probe()
+            transfer.image_size = probe[1:]
+            transfer.rejected = constraints.rejection_reason(*transfer.image_size)
+            if transfer.rejected:
+                self.probe_stats.record_abort(transfer.bytes_read, length)
+                return
+
+    def fetch(self, file_url, timeout, constraints):
+        """
+        GET one file inside a concurrency slot, recording the outcome
+        """
+        self.rate_limiter.wait(file_url)
+        with self.controller.slot() as started:
+            if self.signal.get("reach_max_num"):
+                # Stopped while waiting for the host or a slot; send nothing
+                return Transfer(None)
+            transfer = None
+            try:
+                with self.session.get(file_url, timeout=timeout, stream=True) as response:
+                    if response.status_code == 200:
+                        transfer = self.read_body(response, constraints)
+                    else:
+                        transfer = Transfer(response.status_code)
+            except requests.Timeout:
+                self.controller.record(started, ok=False, timed_out=True)
+                raise
+            except Exception:
+                self.controller.record(started, ok=False)
+                raise
+            finally:
+                if transfer is not None and transfer.rejected:
+                    transfer.discard()
+            self.controller.record(started, ok=transfer.status == 200,
+                                   nbytes=transfer.bytes_read, status=transfer.status)
+            return transfer
+
+    def journal_rejection(self, file_url, reason):
+        if self.journal is not None:
+            self.journal.mark(file_url, 'processed', rejected=reason)
+
+    def get_filename(self, task, default_ext):
+        """
+        Name files by their sniffed format rather than the URL's extension
+        """
+        if task.get("format") in IMAGE_EXTENSIONS:
+            file_idx = self.fetched_num + self.file_idx_offset
+            return f"{file_idx:06d}.{IMAGE_EXTENSIONS[task['format']]}"
+        return super().get_filename(task, default_ext)
+
+    def keep_transfer(self, task, transfer, constraints):
+        """
+        Final size check for files whose header could not be probed
+        """
+        if transfer.image_size is None:
+            data = transfer.writer.data
+            try:
+                with Image.open(io.BytesIO(data) if data is not None else transfer.writer.tmp_path) as img:
+                    transfer.image_size = img.size
+            except OSError:
+                transfer.rejected = "unreadable image"
+                return False
+            transfer.rejected = constraints.rejection_reason(*transfer.image_size)
+            if transfer.rejected:
+                return False
+        task["img_size"] = transfer.image_size
+        return True
+
+    def staging_dir(self):
+        """
+        Temp file folder on the same filesystem as the file's final place
+        """
+        if isinstance(self.storage, MemoryStorage):
+            return self.content_store.root
+        return getattr(self.storage, 'root_dir', None)
+
+    def store(self, filename, transfer):
+        """
+        Put the finished temp file in the content store and link it into storage
+
+        A MemoryStorage gets the bytes collected while streaming, and the
+        content store only gets a copy if the storage keeps originals.
+        """
+        root_dir = getattr(self.storage, 'root_dir', None)
+        if isinstance(self.storage, MemoryStorage):
+            data = transfer.writer.data
+            if self.storage.store_originals:
+                self.content_store.put(transfer.writer)
+            self.storage.write(filename, data, sha256=transfer.writer.sha256)
+        elif root_dir is None:
+            self.storage.write(filename, transfer.writer.read_bytes())
+            transfer.discard()
+        elif not self.content_store.save_view(transfer.writer, os.path.join(root_dir, filename)):
+            self.logger.info("%s already in content store, linked", filename)
+
+    def body_lost(self, record):
+        """
+        Whether a download the interrupted run never processed is gone from memory
+
+        Only a MemoryStorage without stored originals loses them; the URL
+        is fetched again.
+        """
+        return (record['state'] == 'fetched' and isinstance(self.storage, MemoryStorage)
+                and not self.content_store.has(record['sha256']))
+
+    def resume_from_journal(self, task, record):
+        """
+        Settle a URL the job journal already has past 'queued', without a request
+
+        Fetched files count toward max_num again (relinked from the content
+        store if the raw file is gone; a MemoryStorage reloaded them when it
+        was created); rejected ones stay rejected.
+        """
+        if record.get('rejected'):
+            return False
+        if self.dedup is not None and record.get('sha256'):
+            self.dedup.claim_content(record['sha256'])
+        root_dir = getattr(self.storage, 'root_dir', None)
+        if record['state'] == 'fetched' and root_dir is not None:
+            raw_path = os.path.join(root_dir, record['filename'])
+            if not os.path.exists(raw_path) and self.content_store.has(record['sha256']):
+                self.content_store.link(record['sha256'], raw_path)
+        with self.lock:
+            self.fetched_num += 1
+        self.logger.info("skip %s (%s by the interrupted run)", task["file_url"], record['state'])
+        task["success"] = True
+        task["filename"] = record.get('filename')
+        return True
+
+    def download(self, task, default_ext, timeout=5, max_retry=3, overwrite=False,
+                 min_size=None, max_size=None, **kwargs):
+        """
+        Same flow as icrawler's Downloader.download, with fetch() for the GET
+        """
+        file_url = task["file_url"]
+        task["success"] = False
+        task["filename"] = None
+        retry = max_retry
+        constraints = self.constraints.merged(min_size, max_size)
+
+        if self.dedup is not None and not self.dedup.claim_url(file_url):
+            self.logger.info("skip %s, already taken by another search term", file_url)
+            return False
+
+        if self.journal is not None:
+            record = self.journal.get(file_url)
+            if record is not None and record['state'] != 'queued' and not self.body_lost(record):
+                return self.resume_from_journal(task, record)
+
+        if self.skip_stored and self.stored(file_url):
+            self.logger.info("skip %s, original already stored", file_url)
+            return False
+
+        if self.journal is not None:
+            self.journal.mark(file_url, 'queued', query=self.query, provider=self.provider)
+
+        if not overwrite:
+            with self.lock:
+                self.fetched_num += 1
+                filename = self.get_filename(task, default_ext)
+                if self.storage.exists(filename):
+                    self.logger.info("skip downloading file %s", filename)
+                    return False
+                self.fetched_num -= 1
+
+        while retry > 0 and not self.signal.get("reach_max_num"):
+            transfer = None
+            try:
+                transfer = self.fetch(file_url, timeout, constraints)
+            except Exception as e:
+                self.logger.error("Exception caught when downloading file %s, error: %s, "
+                                  "remaining retry times: %d", file_url, e, retry - 1)
+            else:
+                if self.reach_max_num():
+                    self.signal.set(reach_max_num=True)
+                    break
+                elif transfer.status != 200:
+                    self.logger.error("Response status code %d, file %s",
+                                      transfer.status, file_url)
+                    break
+                elif transfer.rejected:
+                    self.logger.info("skip %s after header probe: %s", file_url, transfer.rejected)
+                    self.journal_rejection(file_url, transfer.rejected)
+                    break
+                elif not self.keep_transfer(task, transfer, constraints):
+                    self.journal_rejection(file_url, transfer.rejected)
+                    break
+                elif self.dedup is not None and not self.dedup.claim_content(transfer.writer.sha256):
+                    self.logger.info("skip %s, same image as another search term's download", file_url)
+                    self.journal_rejection(file_url, "duplicate of another search term")
+                    break
+                task["format"] = transfer.format
+                task["sha256"] = transfer.writer.sha256
+                with self.lock:
+                    self.fetched_num += 1
+                    filename = self.get_filename(task, default_ext)
+                self.logger.info("image #%s\t%s", self.fetched_num, file_url)
+                self.store(filename, transfer)
+                self.catalog.record_asset(task["sha256"], source_url=file_url, query=self.query,
+                                          provider=self.provider, format=transfer.format,
+                                          width=transfer.image_size[0], height=transfer.image_size[1],
+                                          nbytes=transfer.writer.nbytes)
+                if self.journal is not None:
+                    self.journal.mark(file_url, 'fetched', filename=filename, sha256=task["sha256"])
+                task["success"] = True
+                task["filename"] = filename
+                break
+            finally:
+                retry -= 1
+                if transfer is not None:
+                    transfer.discard()
+
+        return task["success"]
+
+
+def build_crawler(download_dir, crawler_cls=BingImageCrawler, controller=None,
+                  rate_limiter=None, constraints=None, probe_stats=None, query=None,
+                  catalog=None, search_cache=None, journal=None, dedup=None, storage=None,
+                  skip_stored=False):
+    """
+    Build an icrawler crawler with adaptive download concurrency
+
+    Args:
+        download_dir: Folder the crawler stores images in
+        crawler_cls: BingImageCrawler or GoogleImageCrawler
+        controller: AIMDController to use (defaults to the shared one for
+            the crawler's provider, starting from last run's settled value)
+        rate_limiter: HostRateLimiter to use (defaults to the shared one)
+        constraints: SizeConstraints checked against the probed header
+        probe_stats: ProbeStats collecting the run's aborted transfers
+        query: Search keyword, recorded in the catalog with each download
+        catalog: AssetCatalog to record downloads in (defaults to the shared one)
+        search_cache: SearchCache for result pages (defaults to the shared
+            on-disk cache with its default TTL)
+        journal: JobJournal checkpointing each URL, for resumable jobs
+        dedup: SharedDedup shared with the job's other crawlers
+        storage: icrawler storage instance, e.g. a MemoryStorage (defaults
+            to files in download_dir)
+        skip_stored: Do not request URLs whose original is already in the
+            content store (for jobs that reuse stored originals themselves)
+    """
+    provider = PROVIDER_NAMES.get(crawler_cls, crawler_cls.__name__)
+    if controller is None:
+        controller = controller_for(provider)
+
+    # Other crawler classes keep their own (uncached) parser
+    parser_args = {'parser_cls': CACHED_PARSERS[crawler_cls]} if crawler_cls in CACHED_PARSERS else {}
+
+    crawler = crawler_cls(
+        downloader_cls=PipelineImageDownloader,
+        downloader_threads=controller.max_limit,
+        storage=storage if storage is not None else {'root_dir': str(download_dir)},
+        extra_downloader_args={
+            'controller': controller,
+            'rate_limiter': rate_limiter,
+            'constraints': constraints,
+            'probe_stats': probe_stats,
+            'catalog': catalog,
+            'query': query,
+            'provider': provider,
+            'journal': journal,
+            'dedup': dedup,
+            'skip_stored': skip_stored,
+        },
+        **parser_args
+    )
+    if isinstance(crawler.parser, CachedResultsParser):
+        crawler.parser.search_cache = search_cache or SearchCache()
+        crawler.parser.provider = provider
+        crawler.parser.query = query
+    return crawler
+
+
+class CrawlJob:
+    """
+    A job's crawls running on background threads
+
+    Args:
+        crawlers: The crawlers, one per search term
+        futures: Futures of their crawl() calls
+        executor: Executor running them
+    """
+
+    def __init__(self, crawlers=(), futures=(), executor=None):
+        self.crawlers = list(crawlers)
+        self.futures = list(futures)
+        self.executor = executor
+        self.stopped = False
+        for crawler in self.crawlers:
+            self._hold_stop(crawler)
+
+    def _hold_stop(self, crawler):
+        """
+        Make a stop survive the signal reset crawl() starts with
+
+        icrawler's crawl() resets the crawler's signal before its threads
+        start, which would undo a stop() that landed just before it.
+        stop() sets stopped before it sets the signals, so checking it
+        after the reset catches a stop in either order.
+        """
+        reset = crawler.signal.reset
+
+        def reset_unless_stopped():
+            reset()
+            if self.stopped:
+                crawler.signal.set(reach_max_num=True)
+
+        crawler.signal.reset = reset_unless_stopped
+
+    def running(self):
+        return any(not future.done() for future in self.futures)
+
+    def stop(self):
+        """
+        Tell every crawler it has reached max_num
+
+        Parsers and downloaders exit, and bodies still streaming are
+        abandoned at their next chunk.
+        """
+        self.stopped = True
+        for crawler in self.crawlers:
+            crawler.signal.set(reach_max_num=True)
+
+    def wait(self):
+        for future in self.futures:
+            future.result()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def close(self):
+        """
+        Stop whatever is still crawling and wait for the threads to exit
+        """
+        self.stop()
+        self.wait()
+
+
+def start_crawl_terms(download_dir, search_terms, max_num, journal=None,
+                      crawler_cls=BingImageCrawler, crawl_kwargs=None, skip_stored=False,
+                      **build_kwargs):
+    """
+    Start crawling a job's search terms in parallel into one folder
+
+    Every term gets its own crawler, all running at once on background
+    threads. They share the provider's AIMD controller, so the number of
+    transfers in flight stays within one adaptive budget, and a
+    SharedDedup, so an image found by two terms is downloaded once. Each
+    term numbers its files from its own offset, so the parallel crawls
+    never pick the same file name.
+
+    Args:
+        download_dir: Folder the crawlers store images in
+        search_terms: Search keywords, in order of preference
+        max_num: Images to download per term
+        journal: JobJournal; terms finished on an interrupted run are skipped
+        crawler_cls: BingImageCrawler or GoogleImageCrawler
+        crawl_kwargs: Extra crawl() arguments, e.g. min_size
+        skip_stored: Skip URLs whose original is already stored; each term
+            then crawls that many more results, so max_num new ones remain
+        **build_kwargs: Passed through to build_crawler(); a storage instance
+            such as a MemoryStorage is shared by all the terms
+
+    Returns:
+        CrawlJob; call close() on it when done with the downloads
+    """
+    crawl_kwargs = crawl_kwargs or {}
+    dedup = SharedDedup()
+
+    pending = []
+    for term in search_terms:
+        if journal is not None and journal.step_done(f"search:{term}"):
+            print(f"Already crawled: {term}")
+        else:
+            pending.append(term)
+    if not pending:
+        return CrawlJob()
+
+    crawlers = [build_crawler(download_dir, crawler_cls, query=term, journal=journal,
+                              dedup=dedup, skip_stored=skip_stored, **build_kwargs)
+                for term in pending]
+    term_max = [max_num] * len(pending)
+    if skip_stored:
+        for i, crawler in enumerate(crawlers):
+            downloader = crawler.downloader
+            term_max[i] += len(downloader.catalog.query_sources(downloader.provider, [pending[i]]))
+    # A crawl can overshoot max_num by a file per downloader thread
+    stride = max(term_max) + crawlers[0].downloader.thread_num
+    base = crawlers[0].storage.max_file_idx()
+    job = CrawlJob(crawlers)
+
+    def crawl(i):
+        term = pending[i]
+        if job.stopped:
+            return
+        print(f"Searching: {term}")
+        try:
+            crawlers[i].crawl(keyword=term, max_num=term_max[i],
+                              file_idx_offset=base + i * stride, **crawl_kwargs)
+        except Exception as e:
+            print(f"Error ({term}): {e}")
+            return
+        # A stopped crawl did not finish its term
+        if job.stopped:
+            print(f"Stopped: {term}")
+            return
+        if journal is not None:
+            journal.mark_step(f"search:{term}")
+        print(f"Finished: {term}")
+
+    job.executor = ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="crawl")
+    job.futures = [job.executor.submit(crawl, i) for i in range(len(pending))]
+    return job
+
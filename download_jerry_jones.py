@@ -3,10 +3,14 @@
 Download Jerry Jones face images using icrawler
 """
 
-from icrawler.builtin import BingImageCrawler, GoogleImageCrawler
 from pathlib import Path
 import os
 
+from asset_catalog import AssetCatalog
+from crawler_factory import build_crawler
+from image_store import hash_file, next_free_path
+from job_journal import JobJournal
+
 def download_jerry_jones():
     """
     Use icrawler to download Jerry Jones face images
@@ -16,20 +20,27 @@ def download_jerry_jones():
     download_dir = Path("jerry_jones_images")
     download_dir.mkdir(exist_ok=True)
     
+    # Checkpoints every URL; an interrupted run picks up where it stopped
+    journal = JobJournal(f"{Path(__file__).stem}-{download_dir.name}")
+    journal.print_resume_summary()
+    
+    # Kept files are recorded in the catalog as originals of this folder
+    catalog = AssetCatalog()
+    variant = f"{download_dir.name}:original"
+    catalog.sync_folder(download_dir, "jerry_jones_*", variant)
+    
     print("=" * 50)
     print("DOWNLOADING JERRY JONES FACE IMAGES")
     print("=" * 50)
     
     # Try Bing first
     print("\n1. Searching Bing for Jerry Jones face...")
-    bing_crawler = BingImageCrawler(
-        downloader_threads=4,
-        storage={'root_dir': str(download_dir)}
-    )
+    query = 'Jerry Jones face close up Cowboys owner'
+    bing_crawler = build_crawler(download_dir, query=query, journal=journal)
     
     try:
         bing_crawler.crawl(
-            keyword='Jerry Jones face close up Cowboys owner',
+            keyword=query,
             max_num=5,
             min_size=(200, 200),
             file_idx_offset='auto'
@@ -40,14 +51,12 @@ def download_jerry_jones():
     
     # Try another search
     print("\n2. Searching for Jerry Jones portrait...")
-    bing_crawler2 = BingImageCrawler(
-        downloader_threads=4,
-        storage={'root_dir': str(download_dir)}
-    )
+    query = 'Jerry Jones headshot Dallas Cowboys'
+    bing_crawler2 = build_crawler(download_dir, query=query, journal=journal)
     
     try:
         bing_crawler2.crawl(
-            keyword='Jerry Jones headshot Dallas Cowboys',
+            keyword=query,
             max_num=5,
             min_size=(200, 200),
             file_idx_offset='auto'
@@ -58,19 +67,23 @@ def download_jerry_jones():
     
     # Rename files to our naming convention
     print("\n3. Renaming files...")
-    image_files = list(download_dir.glob("*.jpg")) + list(download_dir.glob("*.png")) + list(download_dir.glob("*.jpeg"))
+    # Only new raw downloads; numbering continues after the files already kept
+    image_files = [f for ext in ("jpg", "png", "jpeg", "webp", "gif", "bmp") for f in download_dir.glob(f"0*.{ext}")]
     
-    for i, file in enumerate(image_files[:10], 1):
-        new_name = download_dir / f"jerry_jones_{i:03d}.jpg"
-        if not new_name.exists():
-            try:
-                file.rename(new_name)
-                print(f"Renamed to: {new_name.name}")
-            except:
-                pass
+    for file in image_files[:10]:
+        new_name = next_free_path(download_dir, "jerry_jones_{:03d}" + file.suffix)
+        try:
+            file.rename(new_name)
+            catalog.record_derivative(hash_file(new_name), variant, new_name)
+            journal.mark_file(file.name, 'written', path=str(new_name))
+            print(f"Renamed to: {new_name.name}")
+        except OSError as e:
+            print(f"Could not rename {file.name}: {e}")
     
     # Final count
-    final_count = len(list(download_dir.glob("jerry_jones_*.jpg")))
+    final_count = len(catalog.outputs(download_dir, variant))
+    
+    journal.complete()
     
     print("\n" + "=" * 50)
     print(f"DOWNLOAD COMPLETE!")
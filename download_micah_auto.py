@@ -6,10 +6,65 @@ Automatically download 30 Micah Parsons images using requests and BeautifulSoup
 import os
 import requests
 from pathlib import Path
-import time
 import re
 import json
 
+from fetch_engine import fetch_pipeline
+from rate_limiter import HostRateLimiter
+from search_cache import PAGE_SIZES, SearchCache
+from search_pager import SearchPager
+
+# Search pages are limited to 1 request/second; image CDNs use the default per-host rate
+rate_limiter = HostRateLimiter(host_rates={'www.bing.com': (1.0, 1)})
+
+# Extracted image URLs, shared with the other scripts and kept for a day
+search_cache = SearchCache()
+
+# Results per Bing image page, the size the search cache's page numbers
+# assume; first= is the 1-based offset of a page
+BING_PAGE_SIZE = PAGE_SIZES['bing']
+
+def search_bing(search_query, headers, page=0):
+    """
+    Image URLs scraped from one Bing image results page ([] on failure)
+    """
+    # Format query for URL
+    query = search_query.replace(' ', '+')
+    
+    # Bing Images URL
+    first = 1 + page * BING_PAGE_SIZE
+    url = f"https://www.bing.com/images/search?q={query}&form=HDRSC2&first={first}&count={BING_PAGE_SIZE}&tsc=ImageBasicHover"
+    
+    try:
+        # Get the page (waits on Bing's token bucket)
+        rate_limiter.wait(url)
+        response = requests.get(url, headers=headers, timeout=10)
+        
+        if response.status_code != 200:
+            print(f"Failed to fetch search results (status {response.status_code})")
+            return []
+        
+        # Find image URLs in the response using regex
+        # Look for patterns like: "murl":"https://..."
+        pattern = r'"murl":"(https?://[^"]+\.(?:jpg|jpeg|png)[^"]*)"'
+        matches = re.findall(pattern, response.text, re.IGNORECASE)
+        
+        if not matches:
+            # Try alternative pattern
+            pattern = r'src="(https?://[^"]+\.(?:jpg|jpeg|png)[^"]*)"'
+            matches = re.findall(pattern, response.text, re.IGNORECASE)
+        
+        if not matches:
+            # Try another pattern for thumbnails
+            pattern = r'"turl":"(https?://[^"]+)"'
+            matches = re.findall(pattern, response.text, re.IGNORECASE)
+        
+        return matches
+        
+    except Exception as e:
+        print(f"Error searching: {e}")
+        return []
+
 def download_images_from_bing():
     """
     Downloads images by scraping Bing image search results
@@ -37,105 +92,80 @@ def download_images_from_bing():
         'Connection': 'keep-alive',
     }
     
-    all_image_urls = []
-    
-    for search_query in searches:
-        print(f"\nSearching: {search_query}")
-        
-        # Format query for URL
-        query = search_query.replace(' ', '+')
-        
-        # Bing Images URL
-        url = f"https://www.bing.com/images/search?q={query}&form=HDRSC2&first=1&tsc=ImageBasicHover"
-        
-        try:
-            # Get the page
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                # Find image URLs in the response using regex
-                # Look for patterns like: "murl":"https://..."
-                pattern = r'"murl":"(https?://[^"]+\.(?:jpg|jpeg|png)[^"]*)"'
-                matches = re.findall(pattern, response.text, re.IGNORECASE)
-                
-                if not matches:
-                    # Try alternative pattern
-                    pattern = r'src="(https?://[^"]+\.(?:jpg|jpeg|png)[^"]*)"'
-                    matches = re.findall(pattern, response.text, re.IGNORECASE)
-                
-                if not matches:
-                    # Try another pattern for thumbnails
-                    pattern = r'"turl":"(https?://[^"]+)"'
-                    matches = re.findall(pattern, response.text, re.IGNORECASE)
-                
-                print(f"Found {len(matches)} image URLs")
-                all_image_urls.extend(matches[:15])  # Take up to 15 from each search
-                
-            else:
-                print(f"Failed to fetch search results (status {response.status_code})")
-                
-        except Exception as e:
-            print(f"Error searching: {e}")
-        
-        time.sleep(1)  # Be respectful between searches
-    
-    # Remove duplicates and limit to 30
-    all_image_urls = list(dict.fromkeys(all_image_urls))[:30]
-    
-    if not all_image_urls:
-        print("\nNo image URLs found through web scraping.")
-        print("Falling back to manual URL list...")
-        # Fallback: Use direct URLs (you'd need to add real ones)
-        all_image_urls = [
-            # Add some direct image URLs here as fallback
-            # Example: "https://example.com/micah-parsons.jpg"
-        ]
-    
-    print(f"\nTotal unique URLs to download: {len(all_image_urls)}")
-    print("=" * 50)
-    
-    # Download the images
+    # Searching and downloading run as overlapping stages: each image URL
+    # is queued for download as soon as it is extracted
     downloaded = 0
     failed = 0
+    target = 30
+    seen_urls = set()
+    url_queries = {}  # search each URL came from, for the catalog
     
-    for i, img_url in enumerate(all_image_urls, 1):
-        try:
-            print(f"Downloading {i}/{len(all_image_urls)}...", end=" ")
-            
-            # Clean up the URL if needed
-            if img_url.startswith('//'):
-                img_url = 'https:' + img_url
+    def extract_urls():
+        for i, search_query in enumerate(searches):
+            print(f"\nSearching: {search_query}")
             
-            # Download with timeout
-            img_response = requests.get(img_url, headers=headers, timeout=10, stream=True)
+            # Spread what is still missing over the remaining searches, for variety
+            term_target = downloaded + -(-(target - downloaded) // (len(searches) - i))
             
-            if img_response.status_code == 200:
-                # Generate filename
-                filename = f"micah_parsons_{i:03d}.jpg"
-                filepath = download_dir / filename
-                
-                # Save the image
-                with open(filepath, 'wb') as f:
-                    for chunk in img_response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                print(f"OK - {filename}")
-                downloaded += 1
+            # Page through results until this search has given its share; the
+            # next page is requested while this one downloads, and results from
+            # an earlier run (any script) are reused without searching
+            pager = SearchPager('bing', search_query,
+                                lambda page, q=search_query: search_bing(q, headers, page),
+                                search_cache, seen=seen_urls)
+            last_page = None
+            for page, url in pager.urls(until=lambda: downloaded >= term_target):
+                if page != last_page:
+                    print(f"Page {page + 1}")
+                    last_page = page
+                # Clean up the URL if needed
+                url = 'https:' + url if url.startswith('//') else url
+                url_queries.setdefault(url, search_query)
+                yield url
+        
+        if not seen_urls:
+            print("\nNo image URLs found through web scraping.")
+            print("Falling back to manual URL list...")
+            # Fallback: Use direct URLs (you'd need to add real ones)
+            yield from [
+                # Add some direct image URLs here as fallback
+                # Example: "https://example.com/micah-parsons.jpg"
+            ]
+    
+    def save_image(result):
+        nonlocal downloaded, failed
+        
+        if downloaded >= target:
+            return
+        
+        if not result.ok:
+            if result.error:
+                print(f"Error: {result.error[:50]}")
             else:
-                print(f"Failed (status {img_response.status_code})")
-                failed += 1
-                
-        except Exception as e:
-            print(f"Error: {str(e)[:50]}")
+                print(f"Failed (status {result.status})")
             failed += 1
+            return
+        
+        # Generate filename
+        filename = f"micah_parsons_{downloaded + 1:03d}.{result.extension}"
+        filepath = download_dir / filename
         
-        time.sleep(0.5)  # Small delay between downloads
+        # Save the image
+        result.save(filepath, query=url_queries.get(result.url))
+        
+        print(f"[{downloaded + 1}/{target}] OK - {filename}")
+        downloaded += 1
+    
+    fetch_pipeline(extract_urls(), on_result=save_image, stop=lambda: downloaded >= target,
+                   headers=headers, rate_limiter=rate_limiter, staging_dir=download_dir,
+                   provider='bing')
     
     print("\n" + "=" * 50)
     print(f"Download Complete!")
     print(f"Successfully downloaded: {downloaded} images")
     print(f"Failed: {failed} images")
     print(f"Saved to: {download_dir.absolute()}")
+    search_cache.print_summary()
     print("=" * 50)
     
     return downloaded
@@ -3,10 +3,15 @@
 Download Micah Parsons images using icrawler
 """
 
-from icrawler.builtin import BingImageCrawler, GoogleImageCrawler
+from icrawler.builtin import GoogleImageCrawler
 from pathlib import Path
 import os
 
+from asset_catalog import AssetCatalog
+from crawler_factory import build_crawler
+from image_store import hash_file, next_free_path
+from job_journal import JobJournal
+
 def download_with_icrawler():
     """
     Use icrawler to download images from Bing and Google
@@ -16,12 +21,19 @@ def download_with_icrawler():
     download_dir = Path("micah_parsons_images")
     download_dir.mkdir(exist_ok=True)
     
+    # Checkpoints every URL; an interrupted run picks up where it stopped
+    journal = JobJournal(f"{Path(__file__).stem}-{download_dir.name}")
+    journal.print_resume_summary()
+    
     print("=" * 50)
     print("DOWNLOADING MICAH PARSONS IMAGES WITH ICRAWLER")
     print("=" * 50)
     
-    # Count existing images
-    existing = len(list(download_dir.glob("*.jpg")))
+    # Count existing images from the catalog (adding any it has not seen yet)
+    catalog = AssetCatalog()
+    variant = f"{download_dir.name}:original"
+    catalog.sync_folder(download_dir, "micah_parsons_*", variant)
+    existing = len(catalog.outputs(download_dir, variant))
     print(f"Existing images: {existing}")
     
     needed = 30 - existing
@@ -34,14 +46,12 @@ def download_with_icrawler():
     
     # Try Bing first (usually more reliable)
     print("\n1. Trying Bing Image Search...")
-    bing_crawler = BingImageCrawler(
-        downloader_threads=4,
-        storage={'root_dir': str(download_dir)}
-    )
+    query = 'Micah Parsons face close up Cowboys headshot'
+    bing_crawler = build_crawler(download_dir, query=query, journal=journal)
     
     try:
         bing_crawler.crawl(
-            keyword='Micah Parsons face close up Cowboys headshot',
+            keyword=query,
             max_num=15,
             min_size=(200, 200),
             file_idx_offset='auto'
@@ -52,14 +62,12 @@ def download_with_icrawler():
     
     # Try different search term
     print("\n2. Trying another Bing search...")
-    bing_crawler2 = BingImageCrawler(
-        downloader_threads=4,
-        storage={'root_dir': str(download_dir)}
-    )
+    query = 'Micah Parsons portrait Cowboys helmet'
+    bing_crawler2 = build_crawler(download_dir, query=query, journal=journal)
     
     try:
         bing_crawler2.crawl(
-            keyword='Micah Parsons portrait Cowboys helmet',
+            keyword=query,
             max_num=15,
             min_size=(200, 200),
             file_idx_offset='auto'
@@ -70,14 +78,12 @@ def download_with_icrawler():
     
     # Try Google as backup
     print("\n3. Trying Google Image Search...")
-    google_crawler = GoogleImageCrawler(
-        downloader_threads=4,
-        storage={'root_dir': str(download_dir)}
-    )
+    query = 'Micah Parsons face smile Cowboys'
+    google_crawler = build_crawler(download_dir, GoogleImageCrawler, query=query, journal=journal)
     
     try:
         google_crawler.crawl(
-            keyword='Micah Parsons face smile Cowboys',
+            keyword=query,
             max_num=15,
             min_size=(200, 200),
             file_idx_offset='auto'
@@ -88,19 +94,23 @@ def download_with_icrawler():
     
     # Rename files to our naming convention
     print("\n4. Renaming files...")
-    image_files = list(download_dir.glob("*.jpg")) + list(download_dir.glob("*.png")) + list(download_dir.glob("*.jpeg"))
-    
-    for i, file in enumerate(image_files[:30], 1):
-        new_name = download_dir / f"micah_parsons_{i:03d}.jpg"
-        if not new_name.exists():
-            try:
-                file.rename(new_name)
-                print(f"Renamed to: {new_name.name}")
-            except:
-                pass
+    # Only new raw downloads; numbering continues after the files already kept
+    image_files = [f for ext in ("jpg", "png", "jpeg", "webp", "gif", "bmp") for f in download_dir.glob(f"0*.{ext}")]
+    
+    for file in image_files[:max(30 - existing, 0)]:
+        new_name = next_free_path(download_dir, "micah_parsons_{:03d}" + file.suffix)
+        try:
+            file.rename(new_name)
+            catalog.record_derivative(hash_file(new_name), variant, new_name)
+            journal.mark_file(file.name, 'written', path=str(new_name))
+            print(f"Renamed to: {new_name.name}")
+        except OSError as e:
+            print(f"Could not rename {file.name}: {e}")
     
     # Final count
-    final_count = len(list(download_dir.glob("micah_parsons_*.jpg")))
+    final_count = len(catalog.outputs(download_dir, variant))
+    
+    journal.complete()
     
     print("\n" + "=" * 50)
     print(f"DOWNLOAD COMPLETE!")
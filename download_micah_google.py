@@ -3,13 +3,31 @@
 Download Micah Parsons images using Google Images Download alternative
 """
 
+import itertools
 import os
 import requests
 import json
-import time
 from pathlib import Path
+import re
 import urllib.parse
 
+from fetch_engine import FetchEngine, fetch_urls
+from rate_limiter import HostRateLimiter
+from search_cache import SearchCache
+from search_pager import SearchPager
+
+# Search requests are limited to 1 request/second; image hosts use the default per-host rate
+rate_limiter = HostRateLimiter(host_rates={'duckduckgo.com': (1.0, 1)})
+
+# Extracted image URLs, shared with the other scripts and kept for a day
+search_cache = SearchCache()
+
+# DuckDuckGo returns up to 100 results per i.js page
+DDG_PAGE_SIZE = 100
+
+# vqd token per query, so later pages skip the token request
+vqd_tokens = {}
+
 def download_from_google_images():
     """
     Download images using Google Custom Search API approach
@@ -39,83 +57,49 @@ def download_from_google_images():
     
     downloaded = 0
     target = 30
+    seen_urls = set()
+    
+    # One engine for every batch, so keep-alive connections to the image
+    # hosts and the HTTP cache last the whole run
+    engine = FetchEngine(headers=headers, timeout=5, rate_limiter=rate_limiter,
+                         staging_dir=download_dir, provider='duckduckgo')
     
-    for search_query in search_terms:
+    for i, search_query in enumerate(search_terms):
         if downloaded >= target:
             break
             
         print(f"\nSearching: {search_query}")
         
-        # Use DuckDuckGo image search (more accessible than Google)
-        encoded_query = urllib.parse.quote(search_query)
-        search_url = f"https://duckduckgo.com/?q={encoded_query}&t=h_&iax=images&ia=images"
-        
-        # Get DuckDuckGo token
-        vqd_url = f"https://duckduckgo.com/?q={encoded_query}&t=h_&iax=images&ia=images"
+        # Spread what is still missing over the remaining searches, for variety
+        remaining_terms = len(search_terms) - i
+        term_target = downloaded + -(-(target - downloaded) // remaining_terms)
         
-        try:
-            # First request to get token
-            response = requests.get(vqd_url, headers=headers)
-            
-            # Extract vqd token from response
-            import re
-            vqd_match = re.search(r'vqd=([\d-]+)', response.text)
-            if not vqd_match:
-                vqd_match = re.search(r'"vqd":"([\d-]+)"', response.text)
-            
-            if vqd_match:
-                vqd = vqd_match.group(1)
-                
-                # Now get actual images
-                images_url = f"https://duckduckgo.com/i.js?l=us-en&o=json&q={encoded_query}&vqd={vqd}&f=,,,&p=1"
-                
-                img_response = requests.get(images_url, headers=headers)
-                
-                if img_response.status_code == 200:
-                    try:
-                        data = img_response.json()
-                        results = data.get('results', [])
-                        
-                        for result in results[:10]:  # Get up to 10 per search
-                            if downloaded >= target:
-                                break
-                                
-                            img_url = result.get('image')
-                            if img_url:
-                                try:
-                                    print(f"Downloading image {downloaded + 1}/{target}...", end=" ")
-                                    
-                                    img_data = requests.get(img_url, headers=headers, timeout=5)
-                                    
-                                    if img_data.status_code == 200:
-                                        filename = f"micah_parsons_{downloaded + 1:03d}.jpg"
-                                        filepath = download_dir / filename
-                                        
-                                        with open(filepath, 'wb') as f:
-                                            f.write(img_data.content)
-                                        
-                                        print(f"OK - {filename}")
-                                        downloaded += 1
-                                    else:
-                                        print("Failed")
-                                        
-                                except Exception as e:
-                                    print(f"Error: {str(e)[:30]}")
-                                
-                                time.sleep(0.3)
-                                
-                    except json.JSONDecodeError:
-                        print("Could not parse image results")
-                        
-        except Exception as e:
-            print(f"Search error: {e}")
-        
-        time.sleep(1)  # Delay between searches
+        # Page through results until this search has given its share; the next
+        # page is requested while this one downloads, and cached pages are
+        # reused without searching
+        pager = SearchPager('duckduckgo', search_query,
+                            lambda page, q=search_query: search_duckduckgo(q, headers, page),
+                            search_cache, seen=seen_urls)
+        urls = pager.urls()
+        while downloaded < term_target:
+            # Only as many URLs as are still missing are taken; the rest of the
+            # page stays for the next batch (or the next search)
+            img_urls = [url for _, url in itertools.islice(urls, term_target - downloaded)]
+            if not img_urls:
+                break
+            print(f"Fetching {len(img_urls)} new image URLs")
+            downloaded = fetch_and_save(img_urls, download_dir, downloaded, target, engine,
+                                        query=search_query)
+        urls.close()
+    
+    engine.close()
+    engine.stats.print_summary()
     
     print("\n" + "=" * 50)
     print(f"Download Complete!")
     print(f"Successfully downloaded: {downloaded} images")
     print(f"Saved to: {download_dir.absolute()}")
+    search_cache.print_summary()
     
     if downloaded < target:
         print(f"\nOnly got {downloaded} images. Trying alternative method...")
@@ -123,6 +107,52 @@ def download_from_google_images():
     
     return downloaded
 
+def search_duckduckgo(search_query, headers, page=0):
+    """
+    Image URLs from one page of DuckDuckGo's image search ([] on failure)
+    """
+    # Use DuckDuckGo image search (more accessible than Google)
+    encoded_query = urllib.parse.quote(search_query)
+    
+    # Get DuckDuckGo token
+    vqd_url = f"https://duckduckgo.com/?q={encoded_query}&t=h_&iax=images&ia=images"
+    
+    try:
+        vqd = vqd_tokens.get(search_query)
+        if vqd is None:
+            # First request to get token
+            rate_limiter.wait(vqd_url)
+            response = requests.get(vqd_url, headers=headers)
+            
+            # Extract vqd token from response
+            vqd_match = re.search(r'vqd=([\d-]+)', response.text)
+            if not vqd_match:
+                vqd_match = re.search(r'"vqd":"([\d-]+)"', response.text)
+            
+            if not vqd_match:
+                return []
+            vqd = vqd_tokens[search_query] = vqd_match.group(1)
+        
+        # Now get actual images; s= is the result offset of the page
+        images_url = (f"https://duckduckgo.com/i.js?l=us-en&o=json&q={encoded_query}&vqd={vqd}"
+                      f"&f=,,,&p=1&s={page * DDG_PAGE_SIZE}")
+        
+        rate_limiter.wait(images_url)
+        img_response = requests.get(images_url, headers=headers)
+        
+        if img_response.status_code != 200:
+            return []
+        try:
+            results = img_response.json().get('results', [])
+        except json.JSONDecodeError:
+            print("Could not parse image results")
+            return []
+        return [r.get('image') for r in results if r.get('image')]
+        
+    except Exception as e:
+        print(f"Search error: {e}")
+        return []
+
 def download_with_serpapi(download_dir, start_count, target):
     """
     Alternative using SerpAPI (requires free API key)
@@ -144,32 +174,42 @@ def download_with_serpapi(download_dir, start_count, target):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
     
+    engine = FetchEngine(headers=headers, rate_limiter=rate_limiter, staging_dir=download_dir)
+    try:
+        return fetch_and_save(direct_urls, download_dir, start_count, target, engine)
+    finally:
+        engine.close()
+        engine.stats.print_summary()
+
+def fetch_and_save(urls, download_dir, start_count, target, engine, query=None):
+    """
+    Fetch URLs concurrently with engine and save them as micah_parsons_NNN.jpg
+    
+    Files are numbered on from start_count in completion order, stopping at target.
+    query is recorded in the asset catalog with each file.
+    Returns the new total count.
+    """
     downloaded = start_count
+    urls = urls[:max(target - start_count, 0)]
+    if not urls:
+        return downloaded
     
-    for i, url in enumerate(direct_urls):
-        if downloaded >= target:
-            break
-            
-        try:
-            print(f"Downloading {downloaded + 1}/{target}...", end=" ")
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                filename = f"micah_parsons_{downloaded + 1:03d}.jpg"
-                filepath = download_dir / filename
-                
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                
-                print(f"OK - {filename}")
-                downloaded += 1
-            else:
-                print("Failed")
-                
-        except Exception as e:
-            print(f"Error: {str(e)[:30]}")
+    def save_image(result):
+        nonlocal downloaded
+        
+        if not result.ok:
+            print(f"Failed - {result.describe_failure()[:30]}")
+            return
         
-        time.sleep(0.5)
+        filename = f"micah_parsons_{downloaded + 1:03d}.{result.extension}"
+        filepath = download_dir / filename
+        
+        result.save(filepath, query=query)
+        
+        print(f"OK {downloaded + 1}/{target} - {filename}")
+        downloaded += 1
+    
+    fetch_urls(urls, on_result=save_image, engine=engine)
     
     return downloaded
 
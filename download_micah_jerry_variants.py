@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Download images of Micah Parsons and Jerry Jones together once,
+for the 1280x720, 720x720 padded and center-cropped square folders
+"""
+
+from pathlib import Path
+
+from image_workers import Shape
+from variant_job import OutputVariant, run_variant_job
+
+def download_micah_jerry_variants():
+    """
+    Fill micah_jerry_sized, micah_jerry_square and micah_jerry_square_crop from one crawl
+    """
+
+    print("=" * 50)
+    print("DOWNLOADING: Micah Parsons & Jerry Jones Together")
+    print("Target: 27 images each at 1280x720, 720x720 padded and cropped square")
+    print("=" * 50)
+
+    num_images = 27
+
+    # Multiple search terms for variety
+    search_terms = [
+        "Micah Parsons Jerry Jones together Cowboys",
+        "Jerry Jones with Micah Parsons Dallas",
+        "Micah Parsons Jerry Jones sideline Cowboys",
+        "Jerry Jones Micah Parsons press conference"
+    ]
+
+    # Same folders, names and catalog variants as the single-output scripts
+    variants = [
+        OutputVariant("micah_jerry_sized", "micah_jerry_{:03d}.jpg",
+                      Shape('fill', (1280, 720), aspect_tolerance=0.25), "fill_1280x720", num_images),
+        OutputVariant("micah_jerry_square", "micah_jerry_{:03d}.jpg",
+                      Shape('pad', (720, 720)), "pad_square_720", num_images),
+        OutputVariant("micah_jerry_square_crop", "micah_jerry_{:03d}.jpg",
+                      Shape('crop', (1, 1), min_side=600), "center_crop_square", num_images),
+    ]
+
+    # The 16:9 folder is the pickiest, so its old overfetch of 50 is the starting guess
+    return run_variant_job(Path(__file__).stem, search_terms, variants,
+                           prior_rate=num_images / 50,
+                           crawl_kwargs={'min_size': (600, 400)})  # Minimum size for quality
+
+if __name__ == "__main__":
+    download_micah_jerry_variants()
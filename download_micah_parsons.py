@@ -4,10 +4,9 @@ Download 30 images of Micah Parsons in Cowboys jersey
 """
 
 import os
-import requests
-import time
 import uuid
-from urllib.parse import urlparse
+
+from fetch_engine import fetch_urls
 
 def download_images_simple():
     """
@@ -65,27 +64,24 @@ def download_images_manual():
         print("Please use the bing-image-downloader method instead (option 1)")
         return
     
-    # Download each image
-    for i, url in enumerate(image_urls, 1):
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                # Get file extension
-                ext = os.path.splitext(urlparse(url).path)[1] or '.jpg'
-                filename = f"micah_parsons_{i:02d}{ext}"
-                filepath = os.path.join("micah_parsons_images", filename)
-                
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                
-                print(f"✅ Downloaded {i}/30: {filename}")
+    # Download all images concurrently (per-host rate limited)
+    def save_image(result):
+        if not result.ok:
+            if result.error:
+                print(f"❌ Error downloading image {result.index}: {result.error}")
             else:
-                print(f"❌ Failed to download image {i}")
-        except Exception as e:
-            print(f"❌ Error downloading image {i}: {e}")
+                print(f"❌ Failed to download image {result.index}")
+            return
+        
+        # Extension comes from the sniffed format, not the URL
+        filename = f"micah_parsons_{result.index:02d}.{result.extension}"
+        filepath = os.path.join("micah_parsons_images", filename)
         
-        # Small delay to be respectful
-        time.sleep(0.5)
+        result.save(filepath)
+        
+        print(f"✅ Downloaded {result.index}/30: {filename}")
+    
+    fetch_urls(image_urls, on_result=save_image, staging_dir="micah_parsons_images")
 
 if __name__ == "__main__":
     print("=" * 50)
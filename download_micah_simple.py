@@ -4,11 +4,11 @@ Simple Micah Parsons image downloader using Google Images
 """
 
 import os
-import requests
-import time
 import json
 from pathlib import Path
 
+from fetch_engine import fetch_urls
+
 def download_micah_parsons_images():
     """
     Downloads 30 Micah Parsons images using direct URLs
@@ -44,30 +44,28 @@ def download_micah_parsons_images():
     ]
     
     if sample_urls:
-        # Download from provided URLs
-        for i, url in enumerate(sample_urls[:30], 1):
-            try:
-                print(f"Downloading image {i}/30...", end=" ")
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    filename = f"micah_parsons_{i:03d}.jpg"
-                    filepath = download_dir / filename
-                    
-                    with open(filepath, 'wb') as f:
-                        f.write(response.content)
-                    
-                    print(f"✅ Saved as {filename}")
-                    downloaded += 1
+        # Download from provided URLs concurrently
+        def save_image(result):
+            nonlocal downloaded, failed
+            
+            if not result.ok:
+                if result.error:
+                    print(f"❌ Image {result.index}: Error: {result.error}")
                 else:
-                    print(f"❌ Failed (status {response.status_code})")
-                    failed += 1
-                    
-                time.sleep(0.5)  # Be respectful
-                
-            except Exception as e:
-                print(f"❌ Error: {e}")
+                    print(f"❌ Image {result.index}: Failed (status {result.status})")
                 failed += 1
+                return
+            
+            filename = f"micah_parsons_{result.index:03d}.{result.extension}"
+            filepath = download_dir / filename
+            
+            result.save(filepath)
+            
+            print(f"✅ Image {result.index}/30 saved as {filename}")
+            downloaded += 1
+        
+        fetch_urls(sample_urls[:30], on_result=save_image, headers=headers,
+                   staging_dir=download_dir)
     else:
         print("\n⚠️  No image URLs provided!")
         print("\nTo use this script, you need to:")
@@ -1,17 +1,12 @@
 #!/usr/bin/env python3
 """
-Download Micah Parsons images using simple urllib
+Download Micah Parsons images from a fixed URL list
 """
 
 import os
-import urllib.request
-import urllib.parse
 from pathlib import Path
-import time
-import ssl
 
-# Bypass SSL verification for downloading
-ssl._create_default_https_context = ssl._create_unverified_context
+from fetch_engine import fetch_urls
 
 def download_micah_images():
     """
@@ -73,32 +68,26 @@ def download_micah_images():
     downloaded = 0
     failed = 0
     
-    for i, url in enumerate(image_urls[:30], 1):
-        try:
-            print(f"Downloading image {i}/30...", end=" ")
-            
-            # Create request with headers
-            req = urllib.request.Request(url, headers=headers)
-            
-            # Download the image
-            with urllib.request.urlopen(req, timeout=10) as response:
-                image_data = response.read()
-            
-            # Save the image
-            filename = f"micah_parsons_{i:03d}.jpg"
-            filepath = download_dir / filename
-            
-            with open(filepath, 'wb') as f:
-                f.write(image_data)
-            
-            print(f"OK - {filename}")
-            downloaded += 1
-            
-        except Exception as e:
-            print(f"Failed - {str(e)[:40]}")
+    def save_image(result):
+        nonlocal downloaded, failed
+        
+        if not result.ok:
+            print(f"[{result.index}/30] Failed - {result.describe_failure()[:40]}")
             failed += 1
+            return
+        
+        # Save the image
+        filename = f"micah_parsons_{result.index:03d}.{result.extension}"
+        filepath = download_dir / filename
         
-        time.sleep(0.5)  # Small delay
+        result.save(filepath)
+        
+        print(f"[{result.index}/30] OK - {filename}")
+        downloaded += 1
+    
+    # Fetch all URLs concurrently (SSL verification bypassed as before)
+    fetch_urls(image_urls[:30], on_result=save_image, headers=headers, verify=False,
+               staging_dir=download_dir)
     
     print("\n" + "=" * 50)
     print(f"Download Complete!")
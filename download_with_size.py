@@ -3,10 +3,12 @@
 Download images with consistent size requirements
 """
 
-from icrawler.builtin import BingImageCrawler, GoogleImageCrawler
 from pathlib import Path
 import os
-from PIL import Image
+
+from image_probe import ProbeStats, SizeConstraints
+from image_workers import Shape
+from variant_job import OutputVariant, run_variant_job
 
 def download_images_with_size(keyword, folder_name, num_images=10, target_size=(1280, 720)):
     """
@@ -19,10 +21,6 @@ def download_images_with_size(keyword, folder_name, num_images=10, target_size=(
         target_size: Target resolution (width, height) - will find similar aspect ratio
     """
     
-    # Create download folder
-    download_dir = Path(folder_name)
-    download_dir.mkdir(exist_ok=True)
-    
     print("=" * 50)
     print(f"DOWNLOADING: {keyword}")
     print(f"Target size: {target_size[0]}x{target_size[1]} (16:9 aspect ratio)")
@@ -31,98 +29,34 @@ def download_images_with_size(keyword, folder_name, num_images=10, target_size=(
     # Calculate target aspect ratio
     target_aspect = target_size[0] / target_size[1]
     
-    # Try to download more than needed to account for filtering
-    download_extra = num_images * 2
-    
-    print(f"\n1. Downloading up to {download_extra} images to filter...")
-    bing_crawler = BingImageCrawler(
-        downloader_threads=4,
-        storage={'root_dir': str(download_dir)}
-    )
-    
-    try:
+    # Cropped to aspect and resized; sources outside the 20% aspect tolerance are rejected
+    variant = OutputVariant(folder_name, "image_{:03d}.jpg",
+                            Shape('fill', target_size, aspect_tolerance=0.2),
+                            f"fill_{target_size[0]}x{target_size[1]}", num_images)
+    
+    # Images outside the 20% aspect tolerance are dropped after their header
+    probe_stats = ProbeStats()
+    # The old fixed overfetch of num_images * 2 is the starting guess
+    kept = run_variant_job(
+        f"{Path(__file__).stem}-{Path(folder_name).name}",
+        [keyword],
+        [variant],
+        prior_rate=num_images / (num_images * 2),
+        constraints=SizeConstraints(target_aspect=target_aspect, aspect_tolerance=0.2),
+        probe_stats=probe_stats,
         # Set minimum size to ensure quality
         # Using 16:9 aspect ratio common for HD images
-        bing_crawler.crawl(
-            keyword=keyword,
-            max_num=download_extra,
-            min_size=(1024, 576),  # Minimum HD ready
-            max_size=(1920, 1080),  # Maximum Full HD
-            file_idx_offset='auto'
-        )
-        print("Download complete")
-    except Exception as e:
-        print(f"Error: {e}")
+        crawl_kwargs={
+            'min_size': (1024, 576),  # Minimum HD ready
+            'max_size': (1920, 1080),  # Maximum Full HD
+        }
+    )[variant.key]
     
-    # Filter and resize images to consistent size
-    print("\n2. Filtering and standardizing image sizes...")
-    image_files = list(download_dir.glob("*.jpg")) + list(download_dir.glob("*.png")) + list(download_dir.glob("*.jpeg"))
-    
-    kept_images = []
-    for img_path in image_files:
-        try:
-            # Open and check image
-            img = Image.open(img_path)
-            width, height = img.size
-            aspect_ratio = width / height
-            
-            # Check if aspect ratio is close to target (within 20% tolerance)
-            if abs(aspect_ratio - target_aspect) / target_aspect <= 0.2:
-                # Resize to exact target size
-                img_resized = img.resize(target_size, Image.Resampling.LANCZOS)
-                
-                # Save with new name
-                new_name = download_dir / f"sized_{len(kept_images)+1:03d}.jpg"
-                img_resized.save(new_name, 'JPEG', quality=95)
-                kept_images.append(new_name)
-                print(f"[OK] Processed: {img_path.name} ({width}x{height}) -> {target_size[0]}x{target_size[1]}")
-                
-                # Close image before deleting
-                img.close()
-                # Delete original
-                try:
-                    img_path.unlink()
-                except:
-                    pass
-                
-                if len(kept_images) >= num_images:
-                    break
-            else:
-                print(f"[SKIP] {img_path.name} (aspect ratio {aspect_ratio:.2f} too different from {target_aspect:.2f})")
-                img.close()
-                try:
-                    img_path.unlink()
-                except:
-                    pass
-                
-        except Exception as e:
-            print(f"Error processing {img_path.name}: {e}")
-            try:
-                img_path.unlink()
-            except:
-                pass
-    
-    # Rename to final names
-    print("\n3. Finalizing names...")
-    for i, img_path in enumerate(kept_images, 1):
-        final_name = download_dir / f"image_{i:03d}.jpg"
-        img_path.rename(final_name)
-        print(f"Renamed to: {final_name.name}")
-    
-    # Clean up any remaining unnamed files
-    for f in download_dir.glob("0*.jpg"):
-        f.unlink()
-    for f in download_dir.glob("0*.png"):
-        f.unlink()
-    
-    print("\n" + "=" * 50)
-    print(f"DOWNLOAD COMPLETE!")
-    print(f"Total images saved: {len(kept_images)}")
     print(f"All images resized to: {target_size[0]}x{target_size[1]}")
-    print(f"Location: {download_dir.absolute()}")
-    print("=" * 50)
+    print(f"Location: {variant.folder.absolute()}")
+    probe_stats.print_summary()
     
-    return len(kept_images)
+    return kept
 
 def main():
     """
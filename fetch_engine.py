@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Shared asyncio fetch engine for the URL-list downloaders
+
+Fetches many image URLs at once with a bounded global concurrency, a
+keep-alive connection pool and a token-bucket rate limit per host, then
+prints a bytes/throughput summary. Bodies whose magic bytes are not an
+image are dropped on the first chunk; images stream to a temp file with a
+size cap and SHA-256 computed on the way, so memory use stays flat.
+Saved files go into the content store once, are linked to their path and
+are recorded in the asset catalog with the URL they came from. URLs saved
+on an earlier run are revalidated with ETag / Last-Modified, and a 304 (or
+a still-fresh cache entry) reuses the stored body instead of downloading.
+fetch_pipeline() takes URLs from a generator (e.g. a search scraper)
+through a bounded queue, so the first download starts while the search
+is still running.
+"""
+
+import asyncio
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from asset_catalog import AssetCatalog
+from image_probe import (IMAGE_EXTENSIONS, SNIFF_BYTES, describe_non_image,
+                         print_rejections_by_host, sniff_format)
+from http_cache import HttpCache
+from image_store import ContentStore
+from rate_limiter import HostRateLimiter
+from stream_writer import DEFAULT_MAX_BYTES, MaxBytesExceeded, StreamingWriter
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FetchResult:
+    """
+    Outcome of fetching a single URL
+    """
+
+    def __init__(self, index, url):
+        self.index = index
+        self.url = url
+        self.host = urlparse(url).netloc
+        self.status = None
+        self.writer = None
+        self.format = None
+        self.rejected = None
+        self.error = None
+        self.elapsed = 0.0
+        self.engine = None
+        # 'hit', 'revalidated' or 'miss' when the HTTP cache was consulted
+        self.cache_status = None
+        self.cached_sha256 = None
+        self.cached_nbytes = 0
+        self.response_headers = {}
+
+    @property
+    def from_cache(self):
+        return self.cached_sha256 is not None
+
+    @property
+    def ok(self):
+        if self.from_cache:
+            return True
+        return self.status == 200 and self.writer is not None and self.format is not None
+
+    @property
+    def extension(self):
+        """
+        File extension for the sniffed format (not the URL's)
+        """
+        return IMAGE_EXTENSIONS.get(self.format, 'jpg')
+
+    @property
+    def nbytes(self):
+        if self.from_cache:
+            return self.cached_nbytes
+        return self.writer.nbytes if self.writer is not None else 0
+
+    @property
+    def sha256(self):
+        if self.from_cache:
+            return self.cached_sha256
+        return self.writer.sha256 if self.writer is not None else None
+
+    def save(self, dest, query=None):
+        """
+        Keep the downloaded file at dest
+
+        When fetched by an engine the bytes are stored once under their hash
+        in its content store and dest is a link to them (a body reused from
+        the HTTP cache is linked straight from the store); the download and
+        the saved file are recorded in the engine's catalog. A result with
+        no engine just moves its temp file to dest.
+
+        Args:
+            dest: Output path
+            query: Search query the URL came from, for the catalog
+
+        Returns:
+            The destination Path
+        """
+        dest = Path(dest)
+        engine = self.engine
+        if engine is None:
+            return self.writer.commit(dest)
+        sha256 = self.sha256
+        if self.from_cache:
+            engine.content_store.link(sha256, dest)
+        else:
+            engine.content_store.save_view(self.writer, dest)
+            engine.http_cache.store(self.url, self.response_headers, sha256,
+                                    self.format, self.nbytes)
+        engine.catalog.record_asset(sha256, path=dest, source_url=self.url, query=query,
+                                    provider=engine.provider, format=self.format,
+                                    nbytes=self.nbytes)
+        engine.catalog.record_derivative(sha256, f"{dest.parent.name}:original", dest)
+        return dest
+
+    def discard(self):
+        """
+        Delete the temp file if the result was never saved
+        """
+        if self.writer is not None:
+            self.writer.discard()
+
+    def describe_failure(self):
+        if self.error:
+            return self.error[:50]
+        if self.rejected:
+            return f"not an image ({self.rejected})"
+        return f"status {self.status}"
+
+
+class FetchStats:
+    """
+    Running totals for one engine run
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished = None
+        self.first_image = None
+        self.ok = 0
+        self.failed = 0
+        self.total_bytes = 0
+        self.transfer_time = 0.0
+        self.rate_wait = 0.0
+        self.not_image_by_host = Counter()
+        self.cache = Counter()
+        self.cache_bytes_saved = 0
+
+    def record(self, result):
+        if result.cache_status:
+            self.cache[result.cache_status] += 1
+        if result.from_cache:
+            self.ok += 1
+            self.cache_bytes_saved += result.nbytes
+        elif result.ok:
+            self.ok += 1
+            self.total_bytes += result.nbytes
+        else:
+            self.failed += 1
+            if result.rejected:
+                self.not_image_by_host[result.host] += 1
+        if result.ok and self.first_image is None:
+            self.first_image = time.monotonic() - self.started
+        self.transfer_time += result.elapsed
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    @property
+    def wall_time(self):
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+    def print_summary(self):
+        wall = max(self.wall_time, 1e-6)
+        print("-" * 50)
+        print(f"Fetched: {self.ok} ok, {self.failed} failed")
+        print(f"Total bytes: {self.total_bytes:,} ({self.total_bytes / 1024 / 1024:.2f} MB)")
+        print(f"Wall time: {wall:.2f}s (sum of transfers {self.transfer_time:.2f}s)")
+        if self.first_image is not None:
+            print(f"First image after: {self.first_image:.2f}s")
+        print(f"Throughput: {self.total_bytes / 1024 / 1024 / wall:.2f} MB/s")
+        if self.rate_wait:
+            print(f"Cumulative wait on per-host rate limits: {self.rate_wait:.2f}s")
+        if self.cache:
+            print(f"HTTP cache: {self.cache['hit']} hit, {self.cache['revalidated']} revalidated, "
+                  f"{self.cache['miss']} miss; {self.cache_bytes_saved:,} bytes not re-downloaded")
+        print_rejections_by_host(self.not_image_by_host)
+
+
+class FetchEngine:
+    """
+    Concurrent fetcher with per-host keep-alive sessions
+
+    Args:
+        max_concurrency: Maximum number of transfers in flight across all hosts
+        per_host_connections: Size of the keep-alive pool kept for each host
+        timeout: Request timeout in seconds
+        headers: Request headers (defaults to a desktop browser User-Agent)
+        verify: Verify TLS certificates
+        rate_limiter: HostRateLimiter shared with the caller's other requests
+            (a default per-host limiter is created when omitted)
+        staging_dir: Folder for in-progress temp files; use the output
+            folder so saving is a same-filesystem rename
+        max_bytes: Per-file size cap; larger bodies are abandoned
+        content_store: ContentStore that saved files go into (defaults to
+            the shared one under .image_pipeline/objects)
+        catalog: AssetCatalog saved files are recorded in
+        provider: Search provider the URLs came from, for the catalog
+        http_cache: HttpCache for conditional requests (defaults to the
+            shared one backed by content_store)
+    """
+
+    def __init__(self, max_concurrency=8, per_host_connections=4, timeout=10,
+                 headers=None, verify=True, rate_limiter=None, staging_dir=None,
+                 max_bytes=DEFAULT_MAX_BYTES, content_store=None, catalog=None,
+                 provider=None, http_cache=None):
+        self.max_concurrency = max_concurrency
+        self.per_host_connections = per_host_connections
+        self.timeout = timeout
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.verify = verify
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.staging_dir = staging_dir
+        self.max_bytes = max_bytes
+        self.content_store = content_store or ContentStore()
+        # A catalog passed in belongs to the caller and stays open
+        self._owns_catalog = catalog is None
+        self.catalog = catalog or AssetCatalog()
+        self.provider = provider
+        self.http_cache = http_cache or HttpCache(self.content_store)
+        self.stats = FetchStats()
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="fetch")
+
+        if not verify:
+            requests.packages.urllib3.disable_warnings()
+
+    def session_for(self, host):
+        """
+        Return the keep-alive session for a host, creating it on first use
+        """
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                session.verify = self.verify
+                # pool_block keeps each host at per_host_connections sockets
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self.per_host_connections,
+                                      pool_block=True)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def _new_result(self, index, url):
+        result = FetchResult(index, url)
+        result.engine = self
+        return result
+
+    def _reuse_cached(self, result, entry, status):
+        result.cache_status = status
+        result.cached_sha256 = entry['sha256']
+        result.cached_nbytes = entry['bytes']
+        result.format = entry['format']
+
+    def _fetch_blocking(self, index, url, entry=None):
+        result = self._new_result(index, url)
+        headers = HttpCache.conditional_headers(entry) if entry else {}
+        start = time.monotonic()
+        try:
+            session = self.session_for(result.host)
+            with session.get(url, timeout=self.timeout, stream=True, headers=headers) as response:
+                result.status = response.status_code
+                if response.status_code == 304 and entry:
+                    self.http_cache.refresh(url, response.headers)
+                    self._reuse_cached(result, entry, 'revalidated')
+                elif response.status_code == 200:
+                    result.cache_status = 'miss'
+                    result.response_headers = response.headers
+                    self._read_image(response, result)
+        except Exception as e:
+            result.error = str(e)
+        result.elapsed = time.monotonic() - start
+        return result
+
+    def _read_image(self, response, result):
+        """
+        Stream the body to a temp file, giving up on the first chunk if it
+        is not an image
+        """
+        head = b""
+        writer = StreamingWriter(self.staging_dir, self.max_bytes)
+        try:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if result.format is None:
+                    head += chunk
+                    if len(head) >= SNIFF_BYTES:
+                        result.format = sniff_format(head)
+                        if result.format is None:
+                            result.rejected = describe_non_image(head)
+                            writer.discard()
+                            return
+                writer.write(chunk)
+        except MaxBytesExceeded as e:
+            result.error = str(e)
+            writer.discard()
+            return
+        except Exception:
+            writer.discard()
+            raise
+        if result.format is None:
+            # Body shorter than any image header
+            result.rejected = describe_non_image(head)
+            writer.discard()
+            return
+        writer.close()
+        result.writer = writer
+
+    async def fetch(self, index, url):
+        """
+        Fetch one URL without blocking the event loop
+        
+        Waiting on the host's token bucket happens before a worker thread is
+        taken, so a throttled host never holds up transfers to other hosts.
+        A URL whose cached body is still fresh is answered with no request.
+        """
+        entry = self.http_cache.lookup(url)
+        if entry and HttpCache.is_fresh(entry):
+            result = self._new_result(index, url)
+            self._reuse_cached(result, entry, 'hit')
+            return result
+        await self.rate_limiter.wait_async(url)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._fetch_blocking, index, url, entry)
+
+    async def fetch_all(self, urls, on_result=None):
+        """
+        Fetch every URL concurrently
+
+        Args:
+            urls: URLs to fetch; results are numbered from 1 in this order
+            on_result: Optional callback run on the event loop as each
+                result completes (completion order, not list order)
+
+        Returns:
+            List of FetchResult in the original URL order
+        """
+        wait_before = self.rate_limiter.total_wait
+        tasks = [asyncio.ensure_future(self.fetch(i, url))
+                 for i, url in enumerate(urls, 1)]
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            self.stats.record(result)
+            if on_result:
+                on_result(result)
+        self.stats.rate_wait += self.rate_limiter.total_wait - wait_before
+        self.stats.finish()
+        return [task.result() for task in tasks]
+
+    async def fetch_stream(self, queue, on_result=None, stop=None):
+        """
+        Fetch URLs as they arrive on an asyncio queue, until a None sentinel
+
+        A URL is only taken off the queue once a transfer slot is free, so a
+        bounded queue pushes back on whoever fills it.
+
+        Args:
+            queue: asyncio.Queue of URLs, ended by None
+            on_result: Optional callback run on the event loop as each
+                result completes
+            stop: Optional zero-argument callable; once it returns True the
+                remaining queued URLs are drained without being fetched
+
+        Returns:
+            List of FetchResult in arrival order (numbered from 1)
+        """
+        wait_before = self.rate_limiter.total_wait
+        slots = asyncio.Semaphore(self.max_concurrency)
+        tasks = []
+
+        async def run(index, url):
+            try:
+                result = await self.fetch(index, url)
+            finally:
+                slots.release()
+            self.stats.record(result)
+            if on_result:
+                on_result(result)
+            return result
+
+        while True:
+            await slots.acquire()
+            url = await queue.get()
+            if url is None or (stop and stop()):
+                slots.release()
+                if url is None:
+                    break
+                continue
+            tasks.append(asyncio.ensure_future(run(len(tasks) + 1, url)))
+        results = await asyncio.gather(*tasks)
+        self.stats.rate_wait += self.rate_limiter.total_wait - wait_before
+        self.stats.finish()
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.http_cache.save()
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        if self._owns_catalog:
+            self.catalog.close()
+
+
+def fetch_urls(urls, on_result=None, engine=None, **engine_kwargs):
+    """
+    Synchronous entry point used by the download scripts
+
+    Args:
+        urls: URLs to fetch
+        on_result: Callback receiving each FetchResult as it completes
+        engine: FetchEngine to fetch with, for a script that fetches
+            several batches; the caller closes it and prints its stats.
+            Without one, an engine is built for this call and closed after
+        **engine_kwargs: Passed through to FetchEngine
+
+    Call result.save(path) inside on_result to keep a file; temp files of
+    results that were not saved are deleted before this returns.
+
+    Returns:
+        List of FetchResult in the original URL order
+    """
+    own_engine = engine is None
+    if own_engine:
+        engine = FetchEngine(**engine_kwargs)
+    try:
+        results = asyncio.run(engine.fetch_all(list(urls), on_result))
+    finally:
+        if own_engine:
+            engine.close()
+    for result in results:
+        result.discard()
+    if own_engine:
+        engine.stats.print_summary()
+    return results
+
+
+def fetch_pipeline(url_source, on_result=None, stop=None, queue_size=None, **engine_kwargs):
+    """
+    Fetch URLs while they are still being produced
+
+    url_source (typically a generator that runs searches and yields each
+    image URL as soon as it is extracted) is consumed on its own thread
+    and feeds the engine through a bounded queue, so searching and
+    downloading overlap instead of running one after the other.
+
+    Args:
+        url_source: Iterable of URLs; deduplicate before yielding
+        on_result: Callback receiving each FetchResult as it completes
+        stop: Optional zero-argument callable; once it returns True no new
+            URLs are pulled from url_source or started
+        queue_size: Queue bound (defaults to twice max_concurrency)
+        **engine_kwargs: Passed through to FetchEngine
+
+    Returns:
+        List of FetchResult in the order the URLs were produced
+    """
+    engine = FetchEngine(**engine_kwargs)
+    queue_size = queue_size or 2 * engine.max_concurrency
+    stopped = threading.Event()
+
+    def should_stop():
+        if not stopped.is_set() and stop and stop():
+            stopped.set()
+        return stopped.is_set()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(queue_size)
+
+        def produce():
+            try:
+                for url in url_source:
+                    if should_stop():
+                        break
+                    asyncio.run_coroutine_threadsafe(queue.put(url), loop).result()
+            finally:
+                # The consumer drains until the sentinel, so this never blocks for long
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+        producer = loop.run_in_executor(None, produce)
+        results = await engine.fetch_stream(queue, on_result, should_stop)
+        await producer
+        return results
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        engine.close()
+    for result in results:
+        result.discard()
+    engine.stats.print_summary()
+    return results
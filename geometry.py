@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Geometry planner for the crop / pad / resize output modes
+
+Every output shape the processing scripts make is one of four modes:
+    pad:  letterbox - scale to fit inside the target, fill the rest with
+          a background colour
+    fit:  scale to fit inside the target, no padding (one side may come
+          out shorter)
+    fill: scale to cover the target, centre-cropping the overflow
+    crop: centre crop to the target's aspect ratio at source resolution
+
+plan() works out the cheapest order of operations for one source size:
+the resize always comes before the padding, so the canvas is allocated
+at output size instead of max(width, height) squared, and a crop is
+folded into the resize (resize with a source box), so the cropped region
+is never copied at full resolution. Plan.covered_size() tells the
+decoder how small the source may be decoded, and Plan.apply() counts the
+pixels it decoded, allocated and processed.
+
+Run directly to compare a plan against pad-then-resize:
+    python geometry.py WIDTH HEIGHT [TARGET_WIDTH TARGET_HEIGHT]
+"""
+
+import sys
+
+from PIL import Image
+
+MODES = ('pad', 'fit', 'fill', 'crop')
+
+
+def center_box(size, aspect):
+    """
+    Largest centred (left, top, right, bottom) box of the given aspect inside size
+    """
+    width, height = size
+    if width / height > aspect:
+        crop_width = round(height * aspect)
+        left = (width - crop_width) // 2
+        return left, 0, left + crop_width, height
+    crop_height = round(width / aspect)
+    top = (height - crop_height) // 2
+    return 0, top, width, top + crop_height
+
+
+class PixelCount:
+    """
+    Work one image's plan did, in pixels
+
+    Attributes:
+        decoded: Pixels the decoder produced (less than the source with draft)
+        allocated: Pixels of every image the steps created
+        processed: Pixels the steps read (resample input, crop, paste)
+    """
+
+    def __init__(self, decoded=0):
+        self.decoded = decoded
+        self.allocated = 0
+        self.processed = 0
+
+    def add(self, allocated, processed):
+        self.allocated += allocated
+        self.processed += processed
+
+    def __str__(self):
+        return (f"{self.decoded / 1e6:.1f} MP decoded, {self.allocated / 1e6:.1f} MP allocated, "
+                f"{self.processed / 1e6:.1f} MP processed")
+
+
+class Plan:
+    """
+    Operations that turn one source size into an output
+
+    Attributes:
+        mode: One of MODES
+        source_size: (width, height) of the full-resolution source
+        box: Region of the source used, (left, top, right, bottom)
+        scaled_size: Size the box is resized to (None = no resize)
+        canvas_size: Size of the padded canvas (None = no padding)
+        offset: Where the resized box goes on the canvas
+        background: Canvas colour
+    """
+
+    def __init__(self, mode, source_size, box, scaled_size=None, canvas_size=None,
+                 offset=(0, 0), background='white'):
+        self.mode = mode
+        self.source_size = source_size
+        self.box = box
+        self.scaled_size = scaled_size
+        self.canvas_size = canvas_size
+        self.offset = offset
+        self.background = background
+
+    @property
+    def output_size(self):
+        if self.canvas_size:
+            return self.canvas_size
+        if self.scaled_size:
+            return self.scaled_size
+        return self.box[2] - self.box[0], self.box[3] - self.box[1]
+
+    def covered_size(self):
+        """
+        Size the whole source has at output scale, or None if it is used at full resolution
+        """
+        if not self.scaled_size:
+            return None
+        left, top, right, bottom = self.box
+        return (max(1, round(self.source_size[0] * self.scaled_size[0] / (right - left))),
+                max(1, round(self.source_size[1] * self.scaled_size[1] / (bottom - top))))
+
+    def apply(self, img, reducing_gap=None):
+        """
+        Run the plan on an open image, which may have been decoded at reduced size
+
+        Returns:
+            (output image, PixelCount)
+        """
+        count = PixelCount(img.width * img.height)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+            count.add(img.width * img.height, img.width * img.height)
+        # Map the box onto the decoded image (draft scales it down)
+        scale_x = img.width / self.source_size[0]
+        scale_y = img.height / self.source_size[1]
+        left, top, right, bottom = self.box
+        box = (left * scale_x, top * scale_y, right * scale_x, bottom * scale_y)
+        box_pixels = round((box[2] - box[0]) * (box[3] - box[1]))
+
+        if self.scaled_size:
+            output = img.resize(self.scaled_size, Image.Resampling.LANCZOS, box=box,
+                                reducing_gap=reducing_gap)
+            count.add(self.scaled_size[0] * self.scaled_size[1], box_pixels)
+        else:
+            output = img.crop(tuple(round(v) for v in box))
+            count.add(output.width * output.height, box_pixels)
+
+        if self.canvas_size:
+            canvas = Image.new('RGB', self.canvas_size, self.background)
+            canvas.paste(output, self.offset)
+            count.add(self.canvas_size[0] * self.canvas_size[1], output.width * output.height)
+            output = canvas
+        return output, count
+
+
+def plan(mode, source_size, target_size, background='white'):
+    """
+    Cheapest plan for shaping a source into the target
+
+    Args:
+        mode: One of MODES
+        source_size: (width, height) of the source
+        target_size: Output (width, height); for 'crop' only its aspect
+            ratio matters
+        background: Padding colour for 'pad'
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown geometry mode: {mode}")
+    width, height = source_size
+    target_width, target_height = target_size
+    full = (0, 0, width, height)
+
+    if mode == 'crop':
+        return Plan(mode, source_size, center_box(source_size, target_width / target_height))
+    if mode == 'fill':
+        return Plan(mode, source_size, center_box(source_size, target_width / target_height),
+                    scaled_size=target_size)
+
+    scale = min(target_width / width, target_height / height)
+    scaled_size = (max(1, min(target_width, round(width * scale))),
+                   max(1, min(target_height, round(height * scale))))
+    if mode == 'fit':
+        return Plan(mode, source_size, full, scaled_size=scaled_size)
+    offset = ((target_width - scaled_size[0]) // 2, (target_height - scaled_size[1]) // 2)
+    return Plan(mode, source_size, full, scaled_size=scaled_size, canvas_size=target_size,
+                offset=offset, background=background)
+
+
+def print_plan_comparison(source_size, target_size=(720, 720)):
+    """
+    Pixels allocated and processed by pad-then-resize vs the planned order
+    """
+    width, height = source_size
+    side = max(width, height)
+    naive_allocated = side * side + target_size[0] * target_size[1]
+    naive_processed = width * height + side * side
+    source = Image.new('RGB', source_size, 'gray')
+    _, count = plan('pad', source_size, target_size).apply(source)
+    print(f"Pad {width}x{height} to {target_size[0]}x{target_size[1]}:")
+    print(f"  pad then resize: {naive_allocated / 1e6:.1f} MP allocated, "
+          f"{naive_processed / 1e6:.1f} MP processed")
+    print(f"  planned:         {count.allocated / 1e6:.1f} MP allocated, "
+          f"{count.processed / 1e6:.1f} MP processed")
+
+
+if __name__ == "__main__":
+    sizes = [int(v) for v in sys.argv[1:]] or [3000, 2000]
+    print_plan_comparison(tuple(sizes[:2]), tuple(sizes[2:4]) or (720, 720))
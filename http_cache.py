@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+HTTP validator cache for the URL-list downloaders
+
+Remembers each saved URL's ETag / Last-Modified and freshness lifetime,
+with the SHA-256 of its body in the content store. A rerun of the same
+URL list then either reuses a still-fresh body without any request (hit)
+or sends a conditional request and reuses the stored body on 304
+(revalidated), so an unchanged list costs headers only.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from pipeline_state import load_json, save_json, state_path
+
+
+def freshness_lifetime(headers):
+    """
+    Seconds a response may be reused without revalidation
+
+    Cache-Control max-age wins over Expires; no-cache means always
+    revalidate. Returns None if the response must not be stored at all.
+    """
+    cache_control = {}
+    for directive in headers.get('Cache-Control', '').lower().split(','):
+        name, _, value = directive.strip().partition('=')
+        if name:
+            cache_control[name] = value.strip('"')
+    if 'no-store' in cache_control:
+        return None
+    if 'no-cache' in cache_control:
+        return 0
+    age = int(headers.get('Age', '0')) if headers.get('Age', '').isdigit() else 0
+    if cache_control.get('max-age', '').isdigit():
+        return max(int(cache_control['max-age']) - age, 0)
+    if headers.get('Expires'):
+        try:
+            expires = parsedate_to_datetime(headers['Expires']).timestamp()
+            return max(expires - time.time(), 0)
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+class HttpCache:
+    """
+    Per-URL validators plus the content hash of the stored body
+
+    Entries are only used while the body is still in the content store.
+    Call save() once the run is over to write the entries to disk.
+
+    Args:
+        content_store: ContentStore holding the cached bodies
+        state_file: JSON file holding the entries (defaults to
+            .image_pipeline/http_cache.json)
+    """
+
+    def __init__(self, content_store, state_file=None):
+        self.content_store = content_store
+        self.state_file = state_file or state_path("http_cache.json")
+        self.entries = load_json(self.state_file, {})
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def lookup(self, url):
+        """
+        Entry for url if its body is still stored, else None
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if entry and self.content_store.has(entry['sha256']):
+            return entry
+        return None
+
+    @staticmethod
+    def is_fresh(entry):
+        return time.time() < entry.get('expires', 0)
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, headers, sha256, format, nbytes):
+        """
+        Remember a 200 response's validators and body hash
+
+        Responses with no validator and no freshness lifetime are skipped:
+        they could never be reused.
+        """
+        lifetime = freshness_lifetime(headers)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if lifetime is None or not (etag or last_modified or lifetime):
+            return
+        with self._lock:
+            self.entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'expires': time.time() + lifetime,
+                'sha256': sha256,
+                'format': format,
+                'bytes': nbytes,
+            }
+            self._dirty = True
+
+    def refresh(self, url, headers):
+        """
+        Update an entry from a 304: new lifetime, and any new validators
+        """
+        lifetime = freshness_lifetime(headers)
+        with self._lock:
+            entry = self.entries[url]
+            entry['expires'] = time.time() + (lifetime or 0)
+            entry['etag'] = headers.get('ETag') or entry.get('etag')
+            entry['last_modified'] = headers.get('Last-Modified') or entry.get('last_modified')
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            # Merge with entries other processes wrote since this run started
+            entries = load_json(self.state_file, {})
+            entries.update(self.entries)
+            save_json(self.state_file, entries)
+            self._dirty = False
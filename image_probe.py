@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Read image dimensions from the first few KB of a download
+
+Sniffs the real format from magic bytes, so HTML interstitials and error
+pages can be dropped on the first chunk, and parses JPEG SOF, PNG IHDR, GIF
+logical screen, BMP and WebP (VP8/VP8L/VP8X) headers so a transfer can be
+dropped as soon as the image is known to fail a job's size or aspect-ratio
+filter, before the rest of the body arrives.
+"""
+
+import struct
+import threading
+from collections import Counter
+
+# Bytes needed to tell every supported format apart
+SNIFF_BYTES = 12
+
+# File extension to use for each sniffed format
+IMAGE_EXTENSIONS = {
+    'jpeg': 'jpg',
+    'png': 'png',
+    'gif': 'gif',
+    'webp': 'webp',
+    'bmp': 'bmp',
+    'tiff': 'tiff',
+}
+
+# Give up probing (and fall back to a full download) after this many bytes.
+# Large EXIF/ICC segments can push a JPEG's SOF marker past the first few KB.
+PROBE_LIMIT = 128 * 1024
+
+# JPEG start-of-frame markers (excluding DHT C4, JPG C8 and DAC CC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers with no length field
+JPEG_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+
+
+def sniff_format(head):
+    """
+    Identify an image format from its magic bytes
+
+    Args:
+        head: At least SNIFF_BYTES leading bytes of the body
+
+    Returns:
+        A key of IMAGE_EXTENSIONS, or None if the bytes are not a known image
+    """
+    if head[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if head[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[:2] == b'BM':
+        return 'bmp'
+    if head[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'tiff'
+    return None
+
+
+def describe_non_image(head):
+    """
+    Short label for a rejected body, used in log lines
+    """
+    text = head[:256].lstrip().lower()
+    if text.startswith((b'<!doctype html', b'<html')) or b'<html' in text:
+        return 'HTML page'
+    if text.startswith((b'{', b'[')):
+        return 'JSON'
+    if text.startswith(b'<'):
+        return 'XML/markup'
+    return 'unknown bytes'
+
+
+def _probe_jpeg(data):
+    pos = 2
+    while True:
+        # Find the next marker, skipping fill bytes
+        while pos < len(data) and data[pos] != 0xFF:
+            pos += 1
+        while pos < len(data) and data[pos] == 0xFF:
+            pos += 1
+        if pos >= len(data):
+            return None
+        marker = data[pos]
+        pos += 1
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image / start of scan before any frame header
+            return None
+        if pos + 2 > len(data):
+            return None
+        (length,) = struct.unpack(">H", data[pos:pos + 2])
+        if marker in JPEG_SOF_MARKERS:
+            if pos + 7 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[pos + 3:pos + 7])
+            return ('jpeg', width, height)
+        pos += length
+
+
+def _probe_png(data):
+    if len(data) < 24 or data[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack(">II", data[16:24])
+    return ('png', width, height)
+
+
+def _probe_gif(data):
+    if len(data) < 10:
+        return None
+    width, height = struct.unpack("<HH", data[6:10])
+    return ('gif', width, height)
+
+
+def _probe_bmp(data):
+    if len(data) < 26:
+        return None
+    width, height = struct.unpack("<ii", data[18:26])
+    # Negative height marks a top-down bitmap
+    return ('bmp', width, abs(height))
+
+
+def _probe_webp(data):
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b'VP8 ':
+        # Lossy: frame tag (3 bytes) + start code 9d 01 2a, then 14-bit sizes
+        if data[23:26] != b'\x9d\x01\x2a':
+            return None
+        width, height = struct.unpack("<HH", data[26:30])
+        return ('webp', width & 0x3FFF, height & 0x3FFF)
+    if chunk == b'VP8L':
+        # Lossless: signature 0x2f, then 14-bit (size - 1) fields
+        if data[20] != 0x2F:
+            return None
+        (bits,) = struct.unpack("<I", data[21:25])
+        return ('webp', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b'VP8X':
+        # Extended: 24-bit (canvas size - 1) fields
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return ('webp', width, height)
+    return None
+
+
+HEADER_PARSERS = {
+    'jpeg': _probe_jpeg,
+    'png': _probe_png,
+    'gif': _probe_gif,
+    'webp': _probe_webp,
+    'bmp': _probe_bmp,
+}
+
+
+def probe_image_size(data):
+    """
+    Read (format, width, height) from the start of an image
+
+    Args:
+        data: Leading bytes of the file
+
+    Returns:
+        (format, width, height), or None if the header is not (yet) readable
+    """
+    data = bytes(data[:PROBE_LIMIT])
+    parser = HEADER_PARSERS.get(sniff_format(data))
+    return parser(data) if parser else None
+
+
+class SizeConstraints:
+    """
+    A job's size and aspect-ratio filter
+
+    Args:
+        min_size: (w, h) the image must cover, orientation-independent
+            (same rule as icrawler's min_size)
+        max_size: (w, h) the image must fit in, orientation-independent
+        target_aspect: Desired width / height
+        aspect_tolerance: Allowed relative deviation from target_aspect
+        min_dimension: Minimum length of the shorter side
+    """
+
+    def __init__(self, min_size=None, max_size=None, target_aspect=None,
+                 aspect_tolerance=None, min_dimension=None):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_aspect = target_aspect
+        self.aspect_tolerance = aspect_tolerance
+        self.min_dimension = min_dimension
+
+    def merged(self, min_size=None, max_size=None):
+        """
+        Copy with icrawler's per-crawl min_size/max_size filled in
+        """
+        return SizeConstraints(
+            min_size=self.min_size or min_size,
+            max_size=self.max_size or max_size,
+            target_aspect=self.target_aspect,
+            aspect_tolerance=self.aspect_tolerance,
+            min_dimension=self.min_dimension,
+        )
+
+    def rejection_reason(self, width, height):
+        """
+        Return why an image of this size fails, or None if it passes
+        """
+        size = (width, height)
+        if self.min_size and not (max(size) >= max(self.min_size) and min(size) >= min(self.min_size)):
+            return f"smaller than {self.min_size[0]}x{self.min_size[1]}"
+        if self.max_size and not (max(size) <= max(self.max_size) and min(size) <= min(self.max_size)):
+            return f"larger than {self.max_size[0]}x{self.max_size[1]}"
+        if self.min_dimension and min(size) < self.min_dimension:
+            return f"shorter side under {self.min_dimension}px"
+        if self.target_aspect and self.aspect_tolerance is not None and height:
+            aspect = width / height
+            if abs(aspect - self.target_aspect) / self.target_aspect > self.aspect_tolerance:
+                return f"aspect ratio {aspect:.2f} too different from {self.target_aspect:.2f}"
+        return None
+
+
+class ProbeStats:
+    """
+    Per-run count of transfers aborted after the header probe
+
+    Also counts bodies rejected by magic-byte sniffing, per host.
+    """
+
+    def __init__(self):
+        self.not_image_by_host = Counter()
+        self.probed = 0
+        self.aborted = 0
+        self.bytes_read = 0
+        self.bytes_saved = 0
+        self.unknown_length = 0
+        self._lock = threading.Lock()
+
+    def record_abort(self, bytes_read, content_length=None):
+        with self._lock:
+            self.aborted += 1
+            self.bytes_read += bytes_read
+            if content_length is None:
+                self.unknown_length += 1
+            else:
+                self.bytes_saved += max(content_length - bytes_read, 0)
+
+    def record_not_image(self, host, bytes_read, content_length=None):
+        with self._lock:
+            self.not_image_by_host[host] += 1
+        self.record_abort(bytes_read, content_length)
+
+    def record_probe(self):
+        with self._lock:
+            self.probed += 1
+
+    def print_summary(self):
+        not_image = sum(self.not_image_by_host.values())
+        print(f"Early aborts: {self.aborted} transfers ({self.aborted - not_image} of "
+              f"{self.probed} probed headers failed filters, {not_image} not images)")
+        print(f"Bytes saved: {self.bytes_saved:,} ({self.bytes_saved / 1024 / 1024:.2f} MB)"
+              f" after reading {self.bytes_read:,} header bytes")
+        if self.unknown_length:
+            print(f"({self.unknown_length} aborted transfers had no Content-Length; not counted)")
+        print_rejections_by_host(self.not_image_by_host)
+
+
+def print_rejections_by_host(counter):
+    """
+    Print non-image rejections per host, most frequent first
+    """
+    if not counter:
+        return
+    print("Non-image responses rejected:")
+    for host, count in counter.most_common():
+        print(f"  {host}: {count}")
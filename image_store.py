@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for original downloads
+
+Every downloaded file is kept once under .image_pipeline/objects, keyed by
+its SHA-256. The scripts' output folders hold views of it: raw downloads
+are hard links into the store, and processed images are recorded in the
+asset catalog as derivatives of the source hash.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from pipeline_state import state_path
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """
+    SHA-256 of a file, read in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def next_free_path(directory, pattern, start=1):
+    """
+    First pattern.format(n) in directory, from n=start, that does not exist yet
+
+    Keeps new outputs from overwriting ones kept from an earlier run.
+    """
+    n = start
+    while (Path(directory) / pattern.format(n)).exists():
+        n += 1
+    return Path(directory) / pattern.format(n)
+
+
+class ContentStore:
+    """
+    Originals keyed by SHA-256
+
+    Args:
+        root: Store directory (defaults to .image_pipeline/objects)
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else state_path("objects")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def object_path(self, sha256):
+        return self.root / sha256[:2] / sha256
+
+    def has(self, sha256):
+        return self.object_path(sha256).exists()
+
+    def put(self, writer):
+        """
+        Store a finished StreamingWriter's file under its hash
+
+        Identical bytes are stored once: if the hash is already known the
+        temp file is dropped instead of written.
+
+        Returns:
+            (sha256, is_new)
+        """
+        sha256 = writer.sha256
+        with self._lock:
+            if self.has(sha256):
+                writer.discard()
+                return sha256, False
+            self.object_path(sha256).parent.mkdir(exist_ok=True)
+            writer.commit(self.object_path(sha256))
+            return sha256, True
+
+    def put_file(self, path):
+        """
+        Store an existing file (e.g. one written by another tool)
+
+        Returns:
+            (sha256, is_new)
+        """
+        sha256 = hash_file(path)
+        with self._lock:
+            if self.has(sha256):
+                return sha256, False
+            self.object_path(sha256).parent.mkdir(exist_ok=True)
+            shutil.copyfile(path, self.object_path(sha256))
+            return sha256, True
+
+    def link(self, sha256, dest):
+        """
+        Expose a stored object at dest as a hard link (copy if linking fails)
+        """
+        src = self.object_path(sha256)
+        dest = Path(dest)
+        if dest.exists():
+            if dest.samefile(src):
+                return dest
+            dest.unlink()
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copyfile(src, dest)
+        return dest
+
+    def save_view(self, writer, dest):
+        """
+        Store a download and expose it at dest
+
+        Returns:
+            True if the bytes were new to the store
+        """
+        sha256, is_new = self.put(writer)
+        self.link(sha256, dest)
+        return is_new
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Parallel decode / transform / encode stage for the processing scripts
+
+Decoding a download, hashing it for the near-duplicate check, resizing or
+cropping it and JPEG-encoding the result is CPU work that used to run on
+one core. ImagePool hands it to a pool of worker processes (or threads:
+Pillow releases the GIL while it decodes, resamples and encodes). Each
+worker holds a near_duplicates.HashSnapshot of the images already kept
+and checks a download against it before shaping anything, so a
+near-duplicate costs a decode and a hash, not a resize and an encode.
+The calling script keeps everything that depends on what was kept before
+(cache lookups, the final near-duplicate check, file numbering and
+writes) in its own loop, and with ordered output gets the results back
+in download order, so _001, _002, ... come out the same however the work
+was spread.
+
+What a job makes of each download is a Shape: a geometry mode and
+target (see geometry.py) plus the size and aspect limits a source must
+meet.
+
+In fast mode (the default) a downscale does not start from a
+full-resolution decode: JPEG sources are decoded with DCT scaling
+(draft) at the smallest power-of-two scale still REDUCING_GAP times the
+output size, Image.reduce takes the remaining integer part of the scale,
+and LANCZOS only does the final step. Compare the two modes with:
+    python image_workers.py [image_folder]
+"""
+
+import copy
+import io
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageStat
+
+from budget_encoder import Encoder
+from geometry import MODES, plan
+from near_duplicates import image_hashes
+
+JPEG_QUALITY = 95
+
+# How outputs were always saved: plain quality-95 JPEG, no quality search
+DEFAULT_ENCODER = Encoder(quality=JPEG_QUALITY, optimize=False, progressive=False, strip=False)
+
+# How many times the output size a fast downscale keeps before the
+# final LANCZOS step (Pillow's thumbnail() uses the same default)
+REDUCING_GAP = 2.0
+
+# Results waiting per worker before the pool stops taking new downloads
+IN_FLIGHT_PER_WORKER = 2
+
+# The HashSnapshot each worker checks downloads against, set by _start_worker
+_worker = threading.local()
+
+
+class Output:
+    """
+    One shape made from a download
+
+    Attributes:
+        output: Encoded JPEG bytes, or None if the source was rejected
+        output_size: (width, height) of the output
+        pixels: geometry.PixelCount of the work the plan did
+        quality: Quality the encoder settled on
+        skipped: Why the source was rejected for this shape, or None
+        duplicate: The source matched the worker's snapshot, so it was not shaped
+    """
+
+    def __init__(self):
+        self.output = None
+        self.output_size = None
+        self.pixels = None
+        self.quality = None
+        self.skipped = None
+        self.duplicate = False
+
+
+class Rendered:
+    """
+    What a worker made of one download
+
+    output, output_size, pixels, quality, skipped and duplicate are those
+    of the pool's first shape, which is all a single-output job needs.
+
+    Attributes:
+        size: (width, height) of the source image
+        hashes: (frame_hash, center_hash) of the source, for NearDuplicateIndex
+        outputs: One Output per pool shape (None for shapes not asked for)
+        error: Message of the exception processing raised, or None
+    """
+
+    def __init__(self):
+        self.size = None
+        self.hashes = None
+        self.outputs = []
+        self.error = None
+
+    def _first(self, name):
+        return getattr(self.outputs[0], name) if self.outputs and self.outputs[0] else None
+
+    @property
+    def output(self):
+        return self._first('output')
+
+    @property
+    def output_size(self):
+        return self._first('output_size')
+
+    @property
+    def pixels(self):
+        return self._first('pixels')
+
+    @property
+    def quality(self):
+        return self._first('quality')
+
+    @property
+    def skipped(self):
+        return self._first('skipped')
+
+    @property
+    def duplicate(self):
+        return bool(self._first('duplicate'))
+
+
+def encode_jpeg(img, quality=JPEG_QUALITY):
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class Shape:
+    """
+    Output a processing job makes from each download
+
+    Args:
+        mode: Geometry mode, one of geometry.MODES
+        target_size: Output (width, height); for 'crop' only its aspect counts
+        aspect_tolerance: Reject sources whose aspect ratio is further than
+            this fraction from the target's (None = accept any)
+        min_side: Reject sources whose shorter side is below this
+    """
+
+    def __init__(self, mode, target_size, aspect_tolerance=None, min_side=0):
+        if mode not in MODES:
+            raise ValueError(f"unknown geometry mode: {mode}")
+        self.mode = mode
+        self.target_size = target_size
+        self.aspect_tolerance = aspect_tolerance
+        self.min_side = min_side
+
+    def rejection(self, source_size):
+        """
+        Why a source of this size is not used, or None
+        """
+        width, height = source_size
+        if min(width, height) < self.min_side:
+            return "too small"
+        if self.aspect_tolerance is not None:
+            target_aspect = self.target_size[0] / self.target_size[1]
+            if abs(width / height - target_aspect) / target_aspect > self.aspect_tolerance:
+                return "aspect ratio"
+        return None
+
+
+def draft_for(img, size):
+    """
+    Let a JPEG decode at a reduced DCT scale that keeps REDUCING_GAP x size
+
+    Other formats ignore this and decode at full resolution.
+    """
+    img.draft(None, (int(size[0] * REDUCING_GAP), int(size[1] * REDUCING_GAP)))
+
+
+def _start_worker(known, shared):
+    """
+    Pool initializer: give this worker its own copy of the snapshot
+    """
+    _worker.known = copy.deepcopy(known) if shared else known
+
+
+def render(shapes, data, fast=True, wanted=None, encoder=DEFAULT_ENCODER, added=None):
+    """
+    Decode one download's bytes once, hash it and make each wanted shape of it
+
+    A shape is not made if the source is rejected for it or, after that,
+    if its hashes match that shape's entry in the worker's snapshot.
+
+    Args:
+        shapes: The pool's Shapes
+        data: Encoded source image
+        fast: Allow a reduced decode (the largest size any wanted shape needs)
+        wanted: Indexes into shapes to make (None = all)
+        encoder: budget_encoder.Encoder for the outputs
+        added: {shape index: hashes kept since the snapshot was taken}
+    """
+    rendered = Rendered()
+    wanted = range(len(shapes)) if wanted is None else wanted
+    known = getattr(_worker, 'known', None)
+    if known is not None and added:
+        known.update(added)
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            rendered.size = img.size
+            plans = {i: plan(shapes[i].mode, img.size, shapes[i].target_size) for i in wanted}
+            covered = [image_plan.covered_size() for image_plan in plans.values()]
+            if fast and covered and None not in covered:
+                draft_for(img, (max(c[0] for c in covered), max(c[1] for c in covered)))
+            rendered.hashes = image_hashes(img)
+            rendered.outputs = [None] * len(shapes)
+            for i, image_plan in plans.items():
+                output = Output()
+                output.skipped = shapes[i].rejection(rendered.size)
+                if not output.skipped and known is not None:
+                    output.duplicate = known.matches(i, rendered.hashes)
+                if not output.skipped and not output.duplicate:
+                    shaped, output.pixels = image_plan.apply(img, REDUCING_GAP if fast else None)
+                    encoded = encoder.encode(shaped)
+                    output.output_size = shaped.size
+                    output.output = encoded.data
+                    output.quality = encoded.quality
+                rendered.outputs[i] = output
+    except Exception as e:
+        rendered.error = str(e)
+    return rendered
+
+
+class ImagePool:
+    """
+    Shapes a stream of downloads on a process or thread pool
+
+    Several shapes share one decode of each download, so a job writing
+    more than one variant pays only for the extra resizes and encodes.
+
+    Args:
+        *shapes: Shapes to make of each download
+        kind: 'process' or 'thread'
+        workers: Pool size (defaults to the CPU count)
+        ordered: Yield results in download order (deterministic file
+            numbering) instead of as soon as each one finishes
+        fast: Downscale from a reduced JPEG decode (see module docstring)
+        encoder: budget_encoder.Encoder for the outputs (JPEG, since the
+            scripts name them .jpg); the default is plain quality 95
+    """
+
+    def __init__(self, *shapes, kind='process', workers=None, ordered=True, fast=True,
+                 encoder=DEFAULT_ENCODER):
+        if kind not in ('process', 'thread'):
+            raise ValueError(f"unknown pool kind: {kind}")
+        self.shapes = shapes
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.ordered = ordered
+        self.fast = fast
+        self.encoder = encoder
+
+    def _executor(self, known):
+        if self.kind == 'thread':
+            return ThreadPoolExecutor(max_workers=self.workers, initializer=_start_worker,
+                                      initargs=(known, True))
+        # Crawler threads are running by now, and forking a process that
+        # has threads can deadlock the child; spawn starts clean workers
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_start_worker, initargs=(known, False))
+
+    def _ready(self, pending, block):
+        """
+        Pop finished (download, future) pairs, waiting for one if block is set
+        """
+        if self.ordered:
+            if block:
+                pending[0][1].result()
+            while pending and pending[0][1].done():
+                yield pending.popleft()
+            return
+        if block:
+            wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+        for item in [item for item in pending if item[1].done()]:
+            pending.remove(item)
+            yield item
+
+    def run(self, downloads, wanted=None, known=None, added=None):
+        """
+        Yield (download, Rendered) for each download
+
+        Downloads are taken from the iterable only while fewer than
+        IN_FLIGHT_PER_WORKER results per worker are waiting, so a crawl
+        feeding the pool is never drained far ahead of processing.
+        Breaking out of the loop cancels work that has not started.
+
+        Args:
+            downloads: Iterable of crawler_factory.Download
+            wanted: Callable taking a download and returning the indexes
+                of the shapes to make of it (None = every shape)
+            known: near_duplicates.HashSnapshot keyed by shape index,
+                copied to each worker once (None = no check)
+            added: {shape index: [hashes kept since known was taken]},
+                sent with each download as it is submitted
+        """
+        executor = self._executor(known)
+        pending = deque()
+        try:
+            for download in downloads:
+                future = executor.submit(render, self.shapes, download.data, self.fast,
+                                         wanted(download) if wanted else None, self.encoder,
+                                         added)
+                pending.append((download, future))
+                full = len(pending) >= self.workers * IN_FLIGHT_PER_WORKER
+                for download, future in self._ready(pending, block=full):
+                    yield download, future.result()
+            while pending:
+                for download, future in self._ready(pending, block=True):
+                    yield download, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def psnr(a, b):
+    """
+    Peak signal-to-noise ratio in dB between two same-sized RGB images
+    """
+    mse = sum(v ** 2 for v in ImageStat.Stat(ImageChops.difference(a, b)).rms) / 3
+    return float('inf') if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def benchmark_downscale(folder=None, target_size=(720, 720), sides=(1000, 2000, 3000, 4000), rounds=3):
+    """
+    Time full vs fast downscale per source size, with the PSNR between the two
+
+    Sources are JPEGs re-encoded at each size from an image in folder (a
+    synthetic gradient with noise if there is none), so every row starts
+    from a real decode.
+    """
+    images = sorted(p for p in Path(folder).iterdir()
+                    if p.suffix.lower() in ('.jpg', '.jpeg')) if folder else []
+    if images:
+        base = Image.open(images[0]).convert('RGB')
+    else:
+        base = Image.merge('RGB', (Image.linear_gradient('L'), Image.effect_noise((256, 256), 40),
+                                   Image.linear_gradient('L').rotate(90)))
+    print("=" * 50)
+    print(f"DOWNSCALE BENCHMARK: pad to {target_size[0]}x{target_size[1]}, {rounds} rounds")
+    print("=" * 50)
+    print(f"{'source':>11}  {'full ms':>8}  {'fast ms':>8}  {'speedup':>7}  {'PSNR dB':>7}")
+    for side in sides:
+        source = base.resize((side, side * 3 // 4), Image.Resampling.BICUBIC)
+        data = encode_jpeg(source, quality=90)
+        timings = {}
+        outputs = {}
+        for fast in (False, True):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                rendered = render([Shape('pad', target_size)], data, fast)
+            timings[fast] = (time.perf_counter() - start) / rounds * 1000
+            if rendered.error:
+                raise RuntimeError(rendered.error)
+            outputs[fast] = Image.open(io.BytesIO(rendered.output)).convert('RGB')
+        print(f"{source.width:>5}x{source.height:<5}  {timings[False]:>8.0f}  {timings[True]:>8.0f}  "
+              f"{timings[False] / timings[True]:>6.1f}x  {psnr(outputs[False], outputs[True]):>7.1f}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    benchmark_downscale(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Checkpoint journal for resumable download jobs
+
+Each job appends one JSON line per state change to
+.image_pipeline/jobs/<job>.jsonl, flushed and fsynced before the work it
+describes moves on. A URL goes queued -> fetched -> processed -> written
+(or stops at processed with a rejection reason). If the job is killed, the
+next run replays the journal: finished search steps are skipped, fetched
+URLs are not requested again and processed images are not reprocessed.
+The journal is deleted once the job completes, so the run after that is
+a fresh job.
+"""
+
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+from pipeline_state import state_path
+
+STATES = ('queued', 'fetched', 'processed', 'written')
+
+
+class JobJournal:
+    """
+    Append-only log of one job's per-URL states and finished steps
+
+    Args:
+        name: Job name, unique per script and output folder
+        directory: Where journals live (defaults to .image_pipeline/jobs)
+    """
+
+    def __init__(self, name, directory=None):
+        directory = Path(directory) if directory else state_path("jobs")
+        directory.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.path = directory / f"{name}.jsonl"
+        self.records = {}
+        self.steps = set()
+        self._by_file = {}
+        self._lock = threading.Lock()
+        self.resumed = self.path.exists()
+        if self.resumed:
+            self._replay()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _replay(self):
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                # Drop a torn last line from a kill mid-write, so new
+                # entries do not get glued onto it
+                data = data[:data.rfind(b"\n") + 1]
+                f.seek(len(data))
+                f.truncate()
+        for line in data.decode('utf-8').splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._apply(entry)
+
+    def _apply(self, entry):
+        if 'step' in entry:
+            self.steps.add(entry['step'])
+            return
+        self.records[entry['url']] = entry
+        if entry.get('filename'):
+            self._by_file[entry['filename']] = entry
+
+    def _append(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._apply(entry)
+
+    def mark(self, url, state, **info):
+        """
+        Record a URL's new state; info fields are merged into its record
+        """
+        if state not in STATES:
+            raise ValueError(f"unknown job state: {state}")
+        entry = dict(self.records.get(url, {}))
+        entry.update(info, url=url, state=state)
+        self._append(entry)
+
+    def get(self, url):
+        return self.records.get(url)
+
+    def for_file(self, filename):
+        """
+        Record of the URL that was fetched into filename, if any
+        """
+        return self._by_file.get(Path(filename).name)
+
+    def mark_file(self, filename, state, **info):
+        """
+        mark() the URL behind a fetched file; files the job did not fetch are ignored
+        """
+        record = self.for_file(filename)
+        if record is not None:
+            self.mark(record['url'], state, **info)
+
+    def step_done(self, step):
+        return step in self.steps
+
+    def mark_step(self, step):
+        """
+        Record that a whole step (e.g. one search's crawl) finished
+        """
+        self._append({'step': step})
+
+    def outputs(self, variant=None):
+        """
+        Paths written by this job that still exist, in journal order
+
+        Args:
+            variant: For a job writing several variants per URL (recorded
+                as outputs={variant: path}), only that variant's paths
+        """
+        if variant is None:
+            paths = [r.get('path') for r in self.records.values() if r['state'] == 'written']
+        else:
+            # Records from before a job wrote variants carry a single path
+            paths = [r['outputs'].get(variant) if 'outputs' in r else r.get('path')
+                     for r in self.records.values() if r['state'] == 'written']
+        return [Path(p) for p in paths if p and Path(p).exists()]
+
+    def print_resume_summary(self):
+        if not self.resumed:
+            return
+        counts = Counter(r['state'] for r in self.records.values())
+        states = ", ".join(f"{counts[s]} {s}" for s in STATES if counts[s])
+        print(f"Resuming interrupted job '{self.name}': {states or 'no URLs yet'}, "
+              f"{len(self.steps)} steps done")
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def complete(self):
+        """
+        Finish the job: the journal is removed so the next run starts fresh
+        """
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -1,5 +1,5 @@
 /**
- * Background Images Module - 57 Cowboys/Micah/Jerry Images for Countdown Seconds 60-4
+ * Background Images Module - Cowboys/Micah/Jerry Images for Countdown Seconds 60-4
  */
 
 console.log('🖼️ BACKGROUND IMAGES VERSION: 2025-01-28-CROSSFADE-FIX (smooth transitions)');
@@ -7,78 +7,56 @@ console.log('🖼️ BACKGROUND IMAGES VERSION: 2025-01-28-CROSSFADE-FIX (smooth
 let imageContainer = null;
 let currentImageElement = null;
 
-// Complete array of 57 images for countdown seconds 60-4 - CORRECT PATHS
-const COUNTDOWN_IMAGES = [
-    // Cowboys Memes Square (10 images) - FOUND THE DIRECTORY!
-    'cowboys_memes_square/cowboys_meme_002.jpg',
-    'cowboys_memes_square/cowboys_meme_003.jpg',
-    'cowboys_memes_square/cowboys_meme_006.jpg',
-    'cowboys_memes_square/cowboys_meme_010.jpg',
-    'cowboys_memes_square/cowboys_meme_013.jpg',
-    'cowboys_memes_square/cowboys_meme_014.jpg',
-    'cowboys_memes_square/cowboys_meme_015.jpg',
-    'cowboys_memes_square/cowboys_meme_017.jpg',
-    'cowboys_memes_square/cowboys_meme_018.jpg',
-    'cowboys_memes_square/cowboys_meme_019.jpg',
-    
-    // Micah Solo Square Crop (24 images)
-    'micah_solo_square_crop/micah_solo_001.jpg',
-    'micah_solo_square_crop/micah_solo_002.jpg',
-    'micah_solo_square_crop/micah_solo_003.jpg',
-    'micah_solo_square_crop/micah_solo_004.jpg',
-    'micah_solo_square_crop/micah_solo_006.jpg',
-    'micah_solo_square_crop/micah_solo_008.jpg',
-    'micah_solo_square_crop/micah_solo_009.jpg',
-    'micah_solo_square_crop/micah_solo_011.jpg',
-    'micah_solo_square_crop/micah_solo_012.jpg',
-    'micah_solo_square_crop/micah_solo_013.jpg',
-    'micah_solo_square_crop/micah_solo_014.jpg',
-    'micah_solo_square_crop/micah_solo_015.jpg',
-    'micah_solo_square_crop/micah_solo_016.jpg',
-    'micah_solo_square_crop/micah_solo_017.jpg',
-    'micah_solo_square_crop/micah_solo_018.jpg',
-    'micah_solo_square_crop/micah_solo_019.jpg',
-    'micah_solo_square_crop/micah_solo_020.jpg',
-    'micah_solo_square_crop/micah_solo_023.jpg',
-    'micah_solo_square_crop/micah_solo_024.jpg',
-    'micah_solo_square_crop/micah_solo_025.jpg',
-    'micah_solo_square_crop/micah_solo_026.jpg',
-    'micah_solo_square_crop/micah_solo_027.jpg',
-    'micah_solo_square_crop/micah_solo_028.jpg',
-    'micah_solo_square_crop/micah_solo_029.jpg',
-    
-    // Micah Jerry Square Crop (8 images)
-    'micah_jerry_square_crop/micah_jerry_001.jpg',
-    'micah_jerry_square_crop/micah_jerry_002.jpg',
-    'micah_jerry_square_crop/micah_jerry_005.jpg',
-    'micah_jerry_square_crop/micah_jerry_017.jpg',
-    'micah_jerry_square_crop/micah_jerry_018.jpg',
-    'micah_jerry_square_crop/micah_jerry_020.jpg',
-    'micah_jerry_square_crop/micah_jerry_021.jpg',
-    'micah_jerry_square_crop/micah_jerry_022.jpg',
-    
-    // Cowboys Memes Funny Crop (1 image)
-    'cowboys_memes_funny_crop/cowboys_memes_funny_crop_006.jpg',
-    
-    // Jerry Jones Solo Crop (14 images)
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_001.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_002.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_003.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_004.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_006.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_008.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_009.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_010.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_011.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_014.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_015.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_017.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_019.jpg',
-    'jerry_jones_solo_crop/jerry_jones_solo_crop_020.jpg'
-];
+// One image per countdown second from 60 down to 4, in manifest order.
+// The manifest is generated by countdown_manifest.py from the images that
+// exist on disk, so every entry is a file that can be loaded.
+const COUNTDOWN_IMAGES = (window.COUNTDOWN_MANIFEST && window.COUNTDOWN_MANIFEST.images) || [];
+
+// Bytes fetched up front when the countdown starts; the rest are fetched
+// a few seconds before they are shown
+const PRELOAD_BUDGET_BYTES = 3 * 1024 * 1024;
+const PRELOAD_AHEAD = 3;
+
+// Images already requested, by index
+const preloaded = new Set();
+
+// Browser can decode WebP (checked once; falls back to the JPEG ladder)
+const SUPPORTS_WEBP = (() => {
+    try {
+        return document.createElement('canvas').toDataURL('image/webp').startsWith('data:image/webp');
+    } catch (e) {
+        return false;
+    }
+})();
+
+/**
+ * Pick the smallest generated derivative that covers the image on this screen
+ * Ladder rungs and their byte sizes come from the manifest; images without
+ * a ladder are served as-is
+ * @param {Object} entry - Manifest entry from COUNTDOWN_IMAGES
+ * @returns {{src: string, bytes: number}} Path to load and its size
+ */
+function pickImageSource(entry) {
+    const widths = Object.keys(entry.ladder || {}).map(Number).sort((a, b) => a - b);
+    if (widths.length === 0) {
+        return { src: entry.path, bytes: entry.bytes };
+    }
+    
+    // Square images with object-fit: contain show at the shorter viewport side
+    const needed = Math.min(window.innerWidth, window.innerHeight) * (window.devicePixelRatio || 1);
+    const width = widths.find(w => w >= needed) || widths[widths.length - 1];
+    const ext = SUPPORTS_WEBP ? 'webp' : 'jpg';
+    
+    const slash = entry.path.lastIndexOf('/');
+    const stem = entry.path.slice(slash + 1).replace(/\.[^.]+$/, '');
+    return {
+        src: `${entry.path.slice(0, slash)}/responsive/${stem}-${width}.${ext}`,
+        bytes: entry.ladder[width][ext]
+    };
+}
 
 /**
- * Initialize background images system - 57 images total
+ * Initialize background images system
  */
 function initializeBackgroundImages() {
     imageContainer = document.querySelector('.background-image-container');
@@ -87,31 +65,62 @@ function initializeBackgroundImages() {
         return;
     }
     
-    console.log('🖼️ Initializing background images system - 57 IMAGES READY');
-    console.log(`📊 Total images loaded: ${COUNTDOWN_IMAGES.length}`);
+    if (COUNTDOWN_IMAGES.length === 0) {
+        console.error('❌ Countdown manifest missing or empty - run countdown_manifest.py');
+        return;
+    }
+    
+    console.log(`🖼️ Initializing background images system - ${COUNTDOWN_IMAGES.length} IMAGES READY`);
     preloadImages();
 }
 
 /**
- * Preload all countdown images for smooth transitions
+ * Request one countdown image ahead of time
+ * @param {number} index - Index into COUNTDOWN_IMAGES
+ * @param {Function} onload - Called once the image has loaded
+ */
+function preloadImage(index, onload) {
+    if (index >= COUNTDOWN_IMAGES.length || preloaded.has(index)) {
+        return;
+    }
+    preloaded.add(index);
+    
+    const entry = COUNTDOWN_IMAGES[index];
+    const img = new Image();
+    img.onload = onload || null;
+    img.onerror = () => {
+        console.warn(`⚠️ Failed to load image ${index + 1}: ${entry.path}`);
+    };
+    img.src = pickImageSource(entry).src;
+}
+
+/**
+ * Preload the first images, in countdown order, up to PRELOAD_BUDGET_BYTES
  */
 function preloadImages() {
-    console.log('📸 Preloading all 57 countdown images...');
-    let loadedCount = 0;
+    let budget = PRELOAD_BUDGET_BYTES;
+    let count = 0;
+    while (count < COUNTDOWN_IMAGES.length) {
+        const bytes = pickImageSource(COUNTDOWN_IMAGES[count]).bytes;
+        // Always preload the first image, however large
+        if (count > 0 && bytes > budget) {
+            break;
+        }
+        budget -= bytes;
+        count++;
+    }
     
-    COUNTDOWN_IMAGES.forEach((imagePath, index) => {
-        const img = new Image();
-        img.onload = () => {
+    const kilobytes = Math.round((PRELOAD_BUDGET_BYTES - budget) / 1024);
+    console.log(`📸 Preloading ${count} of ${COUNTDOWN_IMAGES.length} countdown images (${kilobytes} KB)...`);
+    let loadedCount = 0;
+    for (let index = 0; index < count; index++) {
+        preloadImage(index, () => {
             loadedCount++;
-            if (loadedCount === COUNTDOWN_IMAGES.length) {
-                console.log('✅ All 57 countdown images preloaded successfully');
+            if (loadedCount === count) {
+                console.log(`✅ ${count} countdown images preloaded successfully`);
             }
-        };
-        img.onerror = () => {
-            console.warn(`⚠️ Failed to load image ${index + 1}: ${imagePath}`);
-        };
-        img.src = imagePath;
-    });
+        });
+    }
 }
 
 /**
@@ -131,13 +140,19 @@ function showImageAtSecond(remainingSeconds) {
     // Calculate image index: second 60 = index 0, second 4 = index 56
     const imageIndex = 60 - remainingSeconds;
     
+    // Keep the next few images requested ahead of the countdown
+    for (let ahead = 1; ahead <= PRELOAD_AHEAD; ahead++) {
+        preloadImage(imageIndex + ahead);
+    }
+    
     if (imageIndex < 0 || imageIndex >= COUNTDOWN_IMAGES.length) {
         console.warn(`⚠️ Image index ${imageIndex} out of range for ${COUNTDOWN_IMAGES.length} images`);
         return;
     }
     
-    const imagePath = COUNTDOWN_IMAGES[imageIndex];
-    console.log(`🖼️ COUNTDOWN ${remainingSeconds}s: Showing image ${imageIndex + 1}/57 - ${imagePath}`);
+    const imagePath = COUNTDOWN_IMAGES[imageIndex].path;
+    preloaded.add(imageIndex);
+    console.log(`🖼️ COUNTDOWN ${remainingSeconds}s: Showing image ${imageIndex + 1}/${COUNTDOWN_IMAGES.length} - ${imagePath}`);
     
     if (!imageContainer) {
         console.error('❌ Image container not found!');
@@ -151,7 +166,7 @@ function showImageAtSecond(remainingSeconds) {
     // Create new image element
     const newImageElement = document.createElement('img');
     newImageElement.className = 'background-image'; // Start without 'active' class
-    newImageElement.src = imagePath;
+    newImageElement.src = pickImageSource(COUNTDOWN_IMAGES[imageIndex]).src;
     newImageElement.alt = '';
     
     // Add error handling
@@ -175,7 +190,7 @@ function showImageAtSecond(remainingSeconds) {
     // Handle previous image with crossfade
     if (currentImageElement) {
         const previousImage = currentImageElement;
-        const previousIndex = imageIndex > 0 ? imageIndex : 56; // Handle wrap-around
+        const previousIndex = imageIndex > 0 ? imageIndex : COUNTDOWN_IMAGES.length; // Handle wrap-around
         
         // Start fading out previous image after new one starts fading in
         setTimeout(() => {
@@ -0,0 +1,67 @@
+/**
+ * Countdown background images: approved outputs from the asset catalog
+ * Generated by countdown_manifest.py - do not edit by hand
+ */
+
+window.COUNTDOWN_MANIFEST = {
+    ladderWidths: [360, 720, 1080],
+    images: [
+        {"path": "cowboys_memes_square/cowboys_meme_002.jpg", "width": 720, "height": 720, "bytes": 98730, "sha256": "84dd074f9c66d16ec95f31fd5544f987f9cf8a5abea0cbd154cfa7bc8b7e1a31", "ladder": {"360": {"jpg": 24813, "webp": 12594}, "720": {"jpg": 56909, "webp": 25374}}},
+        {"path": "cowboys_memes_square/cowboys_meme_003.jpg", "width": 720, "height": 720, "bytes": 157624, "sha256": "3178d7e7a67268e94e164c70f49bcebfbc67003551a6f5a3326b4ccd861e3bee", "ladder": {"360": {"jpg": 31596, "webp": 19168}, "720": {"jpg": 86139, "webp": 43740}}},
+        {"path": "cowboys_memes_square/cowboys_meme_006.jpg", "width": 720, "height": 720, "bytes": 235711, "sha256": "f2bcae07f479df7e07cf42a99c533d7a87d986f4f74690dc6d3a794bedd58a4c", "ladder": {"360": {"jpg": 46133, "webp": 33014}, "720": {"jpg": 129785, "webp": 81850}}},
+        {"path": "cowboys_memes_square/cowboys_meme_010.jpg", "width": 720, "height": 720, "bytes": 164356, "sha256": "b835f54cadcea13b14171cbb905b29ea9cdb1aa122fdd8dab8d61d41d85952f5", "ladder": {"360": {"jpg": 34981, "webp": 22038}, "720": {"jpg": 90767, "webp": 46084}}},
+        {"path": "cowboys_memes_square/cowboys_meme_013.jpg", "width": 720, "height": 720, "bytes": 124581, "sha256": "8ef6d03443f297f15f637cc2d523b1d41537895f645daed3aba00d2a2ac48c55", "ladder": {"360": {"jpg": 28458, "webp": 17310}, "720": {"jpg": 75287, "webp": 44430}}},
+        {"path": "cowboys_memes_square/cowboys_meme_014.jpg", "width": 720, "height": 720, "bytes": 136716, "sha256": "b887e34c9dfe2e5c797a5e1e1d864b9b1ff3f7a84170e44843f93589d780585a", "ladder": {"360": {"jpg": 26782, "webp": 14396}, "720": {"jpg": 79827, "webp": 43296}}},
+        {"path": "cowboys_memes_square/cowboys_meme_015.jpg", "width": 720, "height": 720, "bytes": 152157, "sha256": "30710e9e7e85ef4102639dd4f0b6ee81351de8eeeaef33a4113510cb53da30aa", "ladder": {"360": {"jpg": 31193, "webp": 17702}, "720": {"jpg": 83240, "webp": 42154}}},
+        {"path": "cowboys_memes_square/cowboys_meme_017.jpg", "width": 720, "height": 720, "bytes": 360430, "sha256": "cee14550cb2fb9b5906204d8be3e32d19c179744f9727567191edb9e8847ce2c", "ladder": {"360": {"jpg": 59621, "webp": 50218}, "720": {"jpg": 200001, "webp": 161338}}},
+        {"path": "cowboys_memes_square/cowboys_meme_018.jpg", "width": 720, "height": 720, "bytes": 73438, "sha256": "247dd2bcf9997b01a3620770dc1e00e5d8a9206d33fabe5bea0ccd7c6fd50c01", "ladder": {"360": {"jpg": 14546, "webp": 7916}, "720": {"jpg": 39988, "webp": 19414}}},
+        {"path": "cowboys_memes_square/cowboys_meme_019.jpg", "width": 720, "height": 720, "bytes": 219272, "sha256": "f48df7f4c2746ac36188068380cca9c02b0d6b0e74bb2b03db3863475e6360e1", "ladder": {"360": {"jpg": 43818, "webp": 30512}, "720": {"jpg": 122861, "webp": 77148}}},
+        {"path": "micah_solo_square_crop/micah_solo_001.jpg", "width": 810, "height": 810, "bytes": 159343, "sha256": "ee0fed83902cc7de41d966f51ecd84680f63de4c9a557f8d44c4808f2802bbe5", "ladder": {"360": {"jpg": 27700, "webp": 16168}, "720": {"jpg": 77297, "webp": 38580}}},
+        {"path": "micah_solo_square_crop/micah_solo_002.jpg", "width": 720, "height": 720, "bytes": 124483, "sha256": "6e9ffd59a0fd1262d713cfb4938bd75b43f0a599370d2737f0130a3149662e81", "ladder": {"360": {"jpg": 34301, "webp": 23374}, "720": {"jpg": 68886, "webp": 53264}}},
+        {"path": "micah_solo_square_crop/micah_solo_003.jpg", "width": 802, "height": 802, "bytes": 231770, "sha256": "28cac9c6a51ff4c8c8539c873fa6cc58923629f603a920deb7edd8fbd1c6f0b4", "ladder": {"360": {"jpg": 33339, "webp": 22592}, "720": {"jpg": 100204, "webp": 56780}}},
+        {"path": "micah_solo_square_crop/micah_solo_004.jpg", "width": 720, "height": 720, "bytes": 164881, "sha256": "53f618ea383f36cc65739f60bf04bcfa1c6a6fcc842a62c47cabb9fd10bd5f8c", "ladder": {"360": {"jpg": 39171, "webp": 28032}, "720": {"jpg": 98593, "webp": 71828}}},
+        {"path": "micah_solo_square_crop/micah_solo_006.jpg", "width": 675, "height": 675, "bytes": 176792, "sha256": "eaae70a2019b168cd1d9380df7fe8f8add45c101e158506dd1e2e45147342bc0", "ladder": {"360": {"jpg": 35621, "webp": 24376}}},
+        {"path": "micah_solo_square_crop/micah_solo_008.jpg", "width": 800, "height": 800, "bytes": 168871, "sha256": "47caf739a4f208238560cb2609c03b9cd549c529eac68e91f661889693f5e78e", "ladder": {"360": {"jpg": 31188, "webp": 20022}, "720": {"jpg": 90936, "webp": 48500}}},
+        {"path": "micah_solo_square_crop/micah_solo_009.jpg", "width": 833, "height": 833, "bytes": 119004, "sha256": "86b70277ca1fe95b54eb7be693c07ab912377b620ac0093f5fe77c2c2668be74", "ladder": {"360": {"jpg": 26909, "webp": 16160}, "720": {"jpg": 77726, "webp": 41024}}},
+        {"path": "micah_solo_square_crop/micah_solo_011.jpg", "width": 749, "height": 749, "bytes": 144202, "sha256": "2a573f662e62218192e930fdaedf6a446c6e56f9ded88d1609edcef85d5908e9", "ladder": {"360": {"jpg": 25945, "webp": 15036}, "720": {"jpg": 72343, "webp": 35128}}},
+        {"path": "micah_solo_square_crop/micah_solo_012.jpg", "width": 854, "height": 854, "bytes": 199353, "sha256": "36713ced31db42057bbd6c5402e036523b08f567754b1fae19445c2504a01f40", "ladder": {"360": {"jpg": 30188, "webp": 19860}, "720": {"jpg": 87326, "webp": 48480}}},
+        {"path": "micah_solo_square_crop/micah_solo_013.jpg", "width": 853, "height": 853, "bytes": 225854, "sha256": "82d887b47d009ee6baae5b20f43a5cf9d6ef18639af33305e547d27562c58fde", "ladder": {"360": {"jpg": 31951, "webp": 20790}, "720": {"jpg": 96735, "webp": 54908}}},
+        {"path": "micah_solo_square_crop/micah_solo_014.jpg", "width": 682, "height": 682, "bytes": 119578, "sha256": "cfae75bb3a4a931f9b5adb1d678091eeae643baac9093837024dbf9a407fc42e", "ladder": {"360": {"jpg": 26695, "webp": 15920}}},
+        {"path": "micah_solo_square_crop/micah_solo_015.jpg", "width": 683, "height": 683, "bytes": 136954, "sha256": "befbb49b9cf9a4ad1e4688f3df4ae20da23c1bca5f47f8f1ce08002c7d09e6b7", "ladder": {"360": {"jpg": 29988, "webp": 18476}}},
+        {"path": "micah_solo_square_crop/micah_solo_016.jpg", "width": 720, "height": 720, "bytes": 98349, "sha256": "d79c3f31a93925f9fc6a601b4a3d8f45e9b37c30d12ced3fef8cd25b58ff8c25", "ladder": {"360": {"jpg": 29214, "webp": 17326}, "720": {"jpg": 57565, "webp": 41712}}},
+        {"path": "micah_solo_square_crop/micah_solo_017.jpg", "width": 720, "height": 720, "bytes": 124483, "sha256": "6e9ffd59a0fd1262d713cfb4938bd75b43f0a599370d2737f0130a3149662e81", "ladder": {"360": {"jpg": 34301, "webp": 23374}, "720": {"jpg": 68886, "webp": 53264}}},
+        {"path": "micah_solo_square_crop/micah_solo_018.jpg", "width": 802, "height": 802, "bytes": 231770, "sha256": "28cac9c6a51ff4c8c8539c873fa6cc58923629f603a920deb7edd8fbd1c6f0b4", "ladder": {"360": {"jpg": 33339, "webp": 22592}, "720": {"jpg": 100204, "webp": 56780}}},
+        {"path": "micah_solo_square_crop/micah_solo_019.jpg", "width": 675, "height": 675, "bytes": 127493, "sha256": "ce4137ad78d2d8d19d2edecf4a63c64eca45813796c67c18bf3d6be63fc67ee7", "ladder": {"360": {"jpg": 30776, "webp": 18944}}},
+        {"path": "micah_solo_square_crop/micah_solo_020.jpg", "width": 675, "height": 675, "bytes": 107132, "sha256": "134f2fc321e4707b23b632c66fc0709d90021fc91ee5b551d06a79018675add7", "ladder": {"360": {"jpg": 24633, "webp": 14460}}},
+        {"path": "micah_solo_square_crop/micah_solo_023.jpg", "width": 800, "height": 800, "bytes": 127646, "sha256": "b6e7fcb90dd10dcf13a5fdb618987c9587714342c6708fa95ea1e5584ba1fc72", "ladder": {"360": {"jpg": 25643, "webp": 15514}, "720": {"jpg": 72375, "webp": 37764}}},
+        {"path": "micah_solo_square_crop/micah_solo_024.jpg", "width": 715, "height": 715, "bytes": 174247, "sha256": "ec39cea3c7cf270aff5d47e0a650350bf118d508d1a19c1cdcc5bd993e90f108", "ladder": {"360": {"jpg": 31304, "webp": 20234}}},
+        {"path": "micah_solo_square_crop/micah_solo_025.jpg", "width": 1280, "height": 1280, "bytes": 234594, "sha256": "a85f70eff3f35495740c15cc0d16aaff68edf3afabf75a5d664d4852623b4797", "ladder": {"360": {"jpg": 30062, "webp": 18668}, "720": {"jpg": 86894, "webp": 44862}, "1080": {"jpg": 158004, "webp": 74712}}},
+        {"path": "micah_solo_square_crop/micah_solo_026.jpg", "width": 833, "height": 833, "bytes": 112953, "sha256": "b14b6e2127fb2324628a2f7fa126975ba0fc0dce5700ad7374a5ed54cd92fefe", "ladder": {"360": {"jpg": 26911, "webp": 16076}, "720": {"jpg": 75050, "webp": 38790}}},
+        {"path": "micah_solo_square_crop/micah_solo_027.jpg", "width": 956, "height": 956, "bytes": 265355, "sha256": "62f538cb189448aa5f67f192fd3fc02bc8aa08062e211384d27b8573c083d41f", "ladder": {"360": {"jpg": 31429, "webp": 20766}, "720": {"jpg": 95644, "webp": 56692}}},
+        {"path": "micah_solo_square_crop/micah_solo_028.jpg", "width": 800, "height": 800, "bytes": 123810, "sha256": "d03ba46e8f27da01ed7f71ce9b65a06cdd36a3bc3c9366fdd06b79e002b7e487", "ladder": {"360": {"jpg": 19955, "webp": 9900}, "720": {"jpg": 55980, "webp": 22484}}},
+        {"path": "micah_solo_square_crop/micah_solo_029.jpg", "width": 675, "height": 675, "bytes": 143221, "sha256": "f0bc2af9dc323bc7e688e3b3a4de49c94295be6c76b2cdf90b0182e97750e131", "ladder": {"360": {"jpg": 32608, "webp": 20798}}},
+        {"path": "micah_jerry_square_crop/micah_jerry_001.jpg", "width": 675, "height": 675, "bytes": 162111, "sha256": "51a6a633f4c437db1104d906ae5c59df3fe7cafba3b75fc6889b20627b456280", "ladder": {"360": {"jpg": 34088, "webp": 22100}}},
+        {"path": "micah_jerry_square_crop/micah_jerry_002.jpg", "width": 720, "height": 720, "bytes": 151456, "sha256": "2e2c9db6bac09163589a60bd54e2cccb302b77710f2158082c60cdc03fa1d06d", "ladder": {"360": {"jpg": 27578, "webp": 16732}, "720": {"jpg": 86800, "webp": 58498}}},
+        {"path": "micah_jerry_square_crop/micah_jerry_005.jpg", "width": 900, "height": 900, "bytes": 153450, "sha256": "fbb12b75dc2c94d0b9a65d243a0f614fb8edcd5f5b846d05c440e3a282adcab1", "ladder": {"360": {"jpg": 24244, "webp": 12678}, "720": {"jpg": 64749, "webp": 27902}}},
+        {"path": "micah_jerry_square_crop/micah_jerry_017.jpg", "width": 806, "height": 806, "bytes": 161518, "sha256": "7151de6fcfeae8a6275e88e7017248e00b13c06e00637dc9bd1a473a4e8e5b7a", "ladder": {"360": {"jpg": 23207, "webp": 12196}, "720": {"jpg": 72082, "webp": 32504}}},
+        {"path": "micah_jerry_square_crop/micah_jerry_018.jpg", "width": 871, "height": 871, "bytes": 176013, "sha256": "41495f8979567efee640aa7d98c9f2e74741b65b540cb07fc3532825b1e8b039", "ladder": {"360": {"jpg": 26664, "webp": 15900}, "720": {"jpg": 75250, "webp": 37820}}},
+        {"path": "micah_jerry_square_crop/micah_jerry_020.jpg", "width": 673, "height": 673, "bytes": 227457, "sha256": "e42c99ea16aa15211e2a520ad7725154fb05a7c9b8ccc3303302f42a9070ba9e", "ladder": {"360": {"jpg": 37956, "webp": 28458}}},
+        {"path": "micah_jerry_square_crop/micah_jerry_021.jpg", "width": 675, "height": 675, "bytes": 195582, "sha256": "51557c9899b53131b04b778093446a2b1cef9bdfe4b7aa8cc75997eb4e68d9ea", "ladder": {"360": {"jpg": 31965, "webp": 20850}}},
+        {"path": "micah_jerry_square_crop/micah_jerry_022.jpg", "width": 1080, "height": 1080, "bytes": 487540, "sha256": "6b8200296b722dfb962efa107733361fe0af0a7f78647ddb47fd10d6c3f1ea3f", "ladder": {"360": {"jpg": 37624, "webp": 28306}, "720": {"jpg": 130232, "webp": 91434}, "1080": {"jpg": 272855, "webp": 182652}}},
+        {"path": "cowboys_memes_funny_crop/cowboys_memes_funny_crop_006.jpg", "width": 618, "height": 618, "bytes": 118081, "sha256": "42a5eb81e3aadeba9d09bf2b56160633518cee3341f67b1e028c0511c9090faa", "ladder": {"360": {"jpg": 30552, "webp": 18976}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_001.jpg", "width": 1067, "height": 1067, "bytes": 418353, "sha256": "101cb07042a21a693224c1ec5f256fb3d2f2fab73c3676bc655d2226bd8c2038", "ladder": {"360": {"jpg": 22947, "webp": 12338}, "720": {"jpg": 93596, "webp": 54600}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_002.jpg", "width": 1542, "height": 1542, "bytes": 588110, "sha256": "fa2d239e1558dc21150b208eabbf7555df64049fe3526ddd6ad3dc91d16670ba", "ladder": {"360": {"jpg": 24444, "webp": 14668}, "720": {"jpg": 70371, "webp": 38140}, "1080": {"jpg": 139410, "webp": 70148}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_003.jpg", "width": 3006, "height": 3006, "bytes": 1559947, "sha256": "4b6f722d2943c44a571ba65650088724de6b5a98bd884134c3f9d76af8bc5ce0", "ladder": {"360": {"jpg": 24074, "webp": 14084}, "720": {"jpg": 73943, "webp": 41580}, "1080": {"jpg": 144375, "webp": 77548}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_004.jpg", "width": 740, "height": 740, "bytes": 193185, "sha256": "93e274c6b20b01ba7d96539853546592bb12e32890c57a5ed35eebe2825291f7", "ladder": {"360": {"jpg": 29356, "webp": 18412}, "720": {"jpg": 99967, "webp": 56296}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_006.jpg", "width": 1280, "height": 1280, "bytes": 343837, "sha256": "f722250814e61830f2c0ae969af3cabaf3c3b9918bf2949d7ea032d0e7e16121", "ladder": {"360": {"jpg": 23221, "webp": 13080}, "720": {"jpg": 76294, "webp": 35584}, "1080": {"jpg": 153639, "webp": 64170}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_008.jpg", "width": 944, "height": 944, "bytes": 145374, "sha256": "b344418c161a86eb1f63a0a7bfac776d2f3d4e6205788ebc8a5003b458158781", "ladder": {"360": {"jpg": 23278, "webp": 12240}, "720": {"jpg": 75253, "webp": 36404}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_009.jpg", "width": 956, "height": 956, "bytes": 173847, "sha256": "98ea0f2d4884632f87bfc3c36e11a32ba9b4197ee4a7e9277093e8204af115ef", "ladder": {"360": {"jpg": 22651, "webp": 13162}, "720": {"jpg": 64449, "webp": 31542}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_010.jpg", "width": 683, "height": 683, "bytes": 124193, "sha256": "ffb832558d020113665810f53a57accc78bf75b23382cfeaf04d7398b2e26ce9", "ladder": {"360": {"jpg": 22170, "webp": 12082}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_011.jpg", "width": 880, "height": 880, "bytes": 205687, "sha256": "bfe62cdc6cedca55cf52092f8777e5303a9245330ba116512fdcd2c1cd3a1090", "ladder": {"360": {"jpg": 22944, "webp": 12216}, "720": {"jpg": 78783, "webp": 39138}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_014.jpg", "width": 800, "height": 800, "bytes": 166082, "sha256": "0d78581c15fc40d97db5649d7738a38691ab586e9c66b78dd0d7041a2a00a37a", "ladder": {"360": {"jpg": 22783, "webp": 13426}, "720": {"jpg": 77697, "webp": 40718}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_015.jpg", "width": 800, "height": 800, "bytes": 142526, "sha256": "3aaccc2be2a0b9b7214dfc50784fd32896170c8b3e2b1b1d071ae025da06b319", "ladder": {"360": {"jpg": 20702, "webp": 10636}, "720": {"jpg": 63789, "webp": 29712}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_017.jpg", "width": 1333, "height": 1333, "bytes": 416977, "sha256": "54bc6739b49098db08d40ddea3a0f024989fde47303ea543c784b365903ecf41", "ladder": {"360": {"jpg": 21583, "webp": 11096}, "720": {"jpg": 69609, "webp": 31984}, "1080": {"jpg": 145663, "webp": 61478}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_019.jpg", "width": 1333, "height": 1333, "bytes": 594498, "sha256": "bcf3a3313e1eb268f79a33999d44a5e354f3da183b7b0a6d2555706bba0700b4", "ladder": {"360": {"jpg": 23060, "webp": 12510}, "720": {"jpg": 77089, "webp": 37806}, "1080": {"jpg": 179919, "webp": 93836}}},
+        {"path": "jerry_jones_solo_crop/jerry_jones_solo_crop_020.jpg", "width": 1500, "height": 1500, "bytes": 748702, "sha256": "dd6bc5d5793a133be861fa0dc93504809d4f0b33627e432669142d9b1198026d", "ladder": {"360": {"jpg": 22106, "webp": 12074}, "720": {"jpg": 89303, "webp": 53736}, "1080": {"jpg": 214046, "webp": 135286}}}
+    ]
+};
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash near-duplicate detection across the image folders
+
+Each image gets two 64-bit difference hashes (dHash): one of the whole
+frame with solid padding trimmed off, and one of its centre square. The
+first survives resizing and recompression, the second also matches a
+centre-cropped square against the wide original it was cut from. Hashes
+live in BK-trees, so a lookup only visits the part of the index within
+the Hamming-distance threshold instead of comparing against every image.
+
+Run directly for a report of duplicate clusters across every folder:
+    python near_duplicates.py [root_folder] [threshold]
+"""
+
+import sys
+from pathlib import Path
+
+from PIL import Image, ImageChops
+
+from pipeline_state import load_json, save_json, state_path
+
+# Hash side length; HASH_SIZE ** 2 = 64 bits per hash
+HASH_SIZE = 8
+
+# Max differing bits (of 64) for two images to count as the same photo
+DEFAULT_THRESHOLD = 10
+
+# Index additions between saves; close() writes whatever is left
+SAVE_EVERY = 25
+
+# Pixel difference still treated as part of a solid border
+BORDER_FUZZ = 16
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}
+
+# Folders the report never looks in (responsive/ holds resized copies by design)
+SKIP_FOLDERS = {'.git', '.image_pipeline', '__pycache__', 'node_modules', 'responsive'}
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def trim_borders(img):
+    """
+    Crop away a solid border (e.g. the padding added by the square scripts)
+
+    The border colour is taken from the top-left pixel.
+    """
+    background = Image.new(img.mode, img.size, img.getpixel((0, 0)))
+    diff = ImageChops.difference(img, background).convert('L')
+    bbox = diff.point(lambda p: 255 if p > BORDER_FUZZ else 0).getbbox()
+    return img.crop(bbox) if bbox else img
+
+
+def center_square(img):
+    width, height = img.size
+    side = min(width, height)
+    left = (width - side) // 2
+    top = (height - side) // 2
+    return img.crop((left, top, left + side, top + side))
+
+
+def dhash(img):
+    """
+    Difference hash: one bit per horizontally adjacent pixel pair of a
+    (HASH_SIZE + 1) x HASH_SIZE greyscale thumbnail
+    """
+    small = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            offset = row * (HASH_SIZE + 1) + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return bits
+
+
+def image_hashes(img):
+    """
+    Return (frame_hash, center_hash) for an open PIL image
+    """
+    img = trim_borders(img.convert('RGB'))
+    return dhash(img), dhash(center_square(img))
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes under Hamming distance
+
+    Children are keyed by their distance to the parent, so by the triangle
+    inequality a search for radius r only descends into children whose key
+    is within r of the query's distance to the node.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, key, value):
+        node = [key, [value], {}]
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(key, current[0])
+            if distance == 0:
+                current[1].append(value)
+                return
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, key, max_distance):
+        """
+        Return [(distance, value)] for every entry within max_distance of key
+        """
+        matches = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_key, values, children = stack.pop()
+            distance = hamming(key, node_key)
+            if distance <= max_distance:
+                matches.extend((distance, value) for value in values)
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return matches
+
+    def __len__(self):
+        return self.size
+
+
+class HashSnapshot:
+    """
+    Per-folder copy of the index for pool workers, kept current by deltas
+
+    Each worker gets one copy when it starts. A task then carries only the
+    hashes added since the snapshot was taken, and the worker adds the part
+    it has not seen yet to its own trees, so its check stays a BK-tree
+    lookup however large the folder is.
+
+    Args:
+        groups: {key: [(frame_hash, center_hash), ...]}
+        threshold: Max Hamming distance for a near-duplicate
+    """
+
+    def __init__(self, groups, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.trees = {key: (BKTree(), BKTree()) for key in groups}
+        self.applied = {key: 0 for key in groups}
+        for key, hashes in groups.items():
+            for entry in hashes:
+                self._add(key, entry)
+
+    def _add(self, key, hashes):
+        frame_tree, center_tree = self.trees[key]
+        frame_tree.add(hashes[0], None)
+        center_tree.add(hashes[1], None)
+
+    def update(self, added):
+        """
+        Catch up on added: {key: every (frame_hash, center_hash) added since the snapshot}
+        """
+        for key, hashes in added.items():
+            for entry in hashes[self.applied[key]:]:
+                self._add(key, entry)
+            self.applied[key] = max(self.applied[key], len(hashes))
+
+    def matches(self, key, hashes):
+        """
+        Whether hashes are within the threshold of an image under key
+        """
+        if key not in self.trees:
+            return False
+        frame_tree, center_tree = self.trees[key]
+        return bool(frame_tree.search(hashes[0], self.threshold)
+                    or center_tree.search(hashes[1], self.threshold))
+
+
+class NearDuplicateIndex:
+    """
+    Persistent index of accepted images' perceptual hashes
+
+    Entries whose file has since been deleted are dropped on load, so
+    removing an output by hand lets a similar photo back in on the next run.
+    add() saves every SAVE_EVERY entries and close() saves the rest; images
+    an interrupted run never saved are re-hashed by index_folder().
+
+    Args:
+        state_file: JSON file holding {path: [frame_hash, center_hash]}
+        threshold: Max Hamming distance for a near-duplicate
+    """
+
+    def __init__(self, state_file=None, threshold=DEFAULT_THRESHOLD):
+        self.state_file = state_file or state_path("phash_index.json")
+        self.threshold = threshold
+        saved = load_json(self.state_file, {})
+        self.entries = {path: tuple(int(h, 16) for h in hashes)
+                        for path, hashes in saved.items() if Path(path).exists()}
+        self._unsaved = 0
+        self._build()
+
+    def _build(self):
+        self.frame_tree = BKTree()
+        self.center_tree = BKTree()
+        for path, (frame, center) in self.entries.items():
+            self.frame_tree.add(frame, path)
+            self.center_tree.add(center, path)
+
+    def find(self, hashes, scope=None):
+        """
+        Closest indexed image within the threshold, or None
+
+        Args:
+            hashes: (frame_hash, center_hash) from image_hashes()
+            scope: Only match images in this folder (None = any folder)
+
+        Returns:
+            (Path, distance) of the best match
+        """
+        frame, center = hashes
+        matches = (self.frame_tree.search(frame, self.threshold)
+                   + self.center_tree.search(center, self.threshold))
+        if scope is not None:
+            scope = Path(scope).resolve()
+            matches = [m for m in matches if Path(m[1]).resolve().parent == scope]
+        matches = [m for m in matches if m[1] in self.entries]
+        if not matches:
+            return None
+        distance, path = min(matches)
+        return Path(path), distance
+
+    def snapshot(self, folders):
+        """
+        HashSnapshot of the images indexed in each folder
+
+        Args:
+            folders: {key: folder}; the snapshot is looked up by the same keys
+        """
+        groups = {key: [] for key in folders}
+        scopes = {Path(folder).resolve(): key for key, folder in folders.items()}
+        for path, hashes in self.entries.items():
+            key = scopes.get(Path(path).resolve().parent)
+            if key is not None:
+                groups[key].append(hashes)
+        return HashSnapshot(groups, self.threshold)
+
+    def add(self, path, hashes):
+        path = str(path)
+        self.entries[path] = tuple(hashes)
+        self.frame_tree.add(hashes[0], path)
+        self.center_tree.add(hashes[1], path)
+        self._unsaved += 1
+        if self._unsaved >= SAVE_EVERY:
+            self.save()
+
+    def index_folder(self, folder, skip=()):
+        """
+        Hash images already in folder that the index does not know yet
+
+        Args:
+            folder: Output folder to catch up on (e.g. files from before the index existed)
+            skip: Paths to leave out, such as the raw downloads about to be processed
+        """
+        skip = {str(p) for p in skip}
+        added = 0
+        for path in sorted(Path(folder).iterdir()):
+            if (path.suffix.lower() not in IMAGE_SUFFIXES or str(path) in skip
+                    or str(path) in self.entries):
+                continue
+            try:
+                with Image.open(path) as img:
+                    hashes = image_hashes(img)
+            except OSError:
+                continue
+            self.entries[str(path)] = hashes
+            self.frame_tree.add(hashes[0], str(path))
+            self.center_tree.add(hashes[1], str(path))
+            added += 1
+        if added:
+            self.save()
+        return added
+
+    def save(self):
+        save_json(self.state_file, {path: [f"{h:016x}" for h in hashes]
+                                    for path, hashes in self.entries.items()})
+        self._unsaved = 0
+
+    def close(self):
+        if self._unsaved:
+            self.save()
+
+
+def image_files(root):
+    """
+    Every image under root, skipping state and tooling folders
+    """
+    for path in sorted(Path(root).rglob("*")):
+        if path.suffix.lower() not in IMAGE_SUFFIXES or not path.is_file():
+            continue
+        if SKIP_FOLDERS & set(path.relative_to(root).parts):
+            continue
+        yield path
+
+
+def find_clusters(paths, threshold=DEFAULT_THRESHOLD):
+    """
+    Group images whose hashes are within threshold of each other
+
+    Returns:
+        List of clusters (lists of Paths), largest first
+    """
+    hashes = {}
+    for path in paths:
+        try:
+            with Image.open(path) as img:
+                hashes[path] = image_hashes(img)
+        except OSError as e:
+            print(f"Skipping {path}: {e}")
+
+    frame_tree = BKTree()
+    center_tree = BKTree()
+    for path, (frame, center) in hashes.items():
+        frame_tree.add(frame, path)
+        center_tree.add(center, path)
+
+    # Union-find over every near pair
+    parent = {path: path for path in hashes}
+
+    def root_of(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for path, (frame, center) in hashes.items():
+        for _, other in frame_tree.search(frame, threshold) + center_tree.search(center, threshold):
+            parent[root_of(other)] = root_of(path)
+
+    clusters = {}
+    for path in hashes:
+        clusters.setdefault(root_of(path), []).append(path)
+    return sorted((c for c in clusters.values() if len(c) > 1), key=len, reverse=True)
+
+
+def print_duplicate_report(root=".", threshold=DEFAULT_THRESHOLD):
+    """
+    List near-duplicate clusters across every image folder under root
+    """
+    root = Path(root)
+    paths = list(image_files(root))
+    print("=" * 50)
+    print(f"NEAR-DUPLICATE REPORT: {len(paths)} images under {root.absolute()}")
+    print(f"Threshold: {threshold} of {HASH_SIZE * HASH_SIZE} bits")
+    print("=" * 50)
+
+    clusters = find_clusters(paths, threshold)
+    for i, cluster in enumerate(clusters, 1):
+        folders = sorted({p.parent.relative_to(root).as_posix() for p in cluster})
+        print(f"\nCluster {i}: {len(cluster)} images in {', '.join(folders)}")
+        for path in sorted(cluster):
+            print(f"  {path.relative_to(root).as_posix()}")
+
+    duplicates = sum(len(c) - 1 for c in clusters)
+    print("\n" + "=" * 50)
+    print(f"{len(clusters)} clusters, {duplicates} redundant images")
+    print("=" * 50)
+    return clusters
+
+
+if __name__ == "__main__":
+    root_folder = sys.argv[1] if len(sys.argv) > 1 else "."
+    threshold = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_THRESHOLD
+    print_duplicate_report(root_folder, threshold)
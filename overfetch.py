@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Overfetch sizing from each query's past acceptance rate
+
+When a job completes, its journal's outcomes are added to per-provider,
+per-query counts: how many downloads were kept, and how many each filter
+threw away, both at the header probe (aspect, size, not an image, same
+image as another term) and in processing (aspect, size, near-duplicate).
+The next job for those queries asks for just enough downloads to reach
+its target at the chosen confidence, instead of a fixed "twice as many".
+Its expected rate only counts the filters it applies itself, so a
+padded job is not held to the aspect rejections of a cropped one.
+
+Run directly for the acceptance table:
+    python overfetch.py
+"""
+
+import math
+from statistics import NormalDist
+
+from pipeline_state import load_json, save_json, state_path
+
+# Chance that the requested downloads yield the target on the first pass
+DEFAULT_CONFIDENCE = 0.9
+
+# How many downloads' worth of weight the fallback rate gets against real history
+PRIOR_WEIGHT = 10
+
+FILTERS = ('aspect', 'size', 'dedup', 'not_image', 'error')
+
+# Filters every crawl applies, at the header (other terms' URLs, magic
+# bytes, failed transfers) and again after downloading
+ALWAYS_APPLIED = ('dedup', 'not_image', 'error')
+
+
+def classify(reason):
+    """
+    Filter type behind a journal rejection reason
+    """
+    reason = reason.lower()
+    if 'duplicate' in reason:
+        return 'dedup'
+    if 'aspect' in reason:
+        return 'aspect'
+    if any(word in reason for word in ('smaller', 'larger', 'shorter side', 'too small')):
+        return 'size'
+    if 'not an image' in reason or 'unreadable' in reason:
+        return 'not_image'
+    return 'error'
+
+
+def downloads_for(target, rate, confidence=DEFAULT_CONFIDENCE):
+    """
+    Fewest downloads n for which at least target are accepted with the given confidence
+
+    Uses the normal approximation to the binomial: the smallest n with
+    n*rate - z*sqrt(n*rate*(1-rate)) >= target.
+    """
+    if target <= 0:
+        return 0
+    rate = min(max(rate, 0.05), 1.0)
+    z = NormalDist().inv_cdf(confidence)
+    spread = z * math.sqrt(rate * (1 - rate))
+    root_n = (spread + math.sqrt(spread ** 2 + 4 * rate * target)) / (2 * rate)
+    return max(target, math.ceil(root_n ** 2))
+
+
+def empty_entry():
+    return {'downloaded': 0, 'accepted': 0, 'header': {}, 'processing': {}}
+
+
+class AcceptanceStats:
+    """
+    Persistent per-provider, per-query acceptance counts
+
+    Only downloads that counted toward a crawl's max_num are "downloaded";
+    header-probe rejections are counted separately, since they never use
+    up a crawl's quota.
+
+    Args:
+        state_file: JSON file holding the counts (defaults to
+            .image_pipeline/acceptance.json)
+    """
+
+    def __init__(self, state_file=None):
+        self.state_file = state_file or state_path("acceptance.json")
+        self.entries = load_json(self.state_file, {})
+
+    @staticmethod
+    def key(provider, query):
+        return f"{provider}|{query}"
+
+    def record_job(self, journal):
+        """
+        Add a job's outcomes; call before journal.complete()
+
+        URLs that were fetched but never processed (the crawl stopped
+        early) say nothing about acceptance and are left out.
+        """
+        added = {}
+        for record in journal.records.values():
+            if not record.get('provider') or not record.get('query'):
+                continue
+            fetched = bool(record.get('filename'))
+            entry = added.setdefault(self.key(record['provider'], record['query']), empty_entry())
+            if record['state'] == 'written':
+                entry['downloaded'] += 1
+                entry['accepted'] += 1
+            elif record.get('rejected'):
+                stage = entry['processing' if fetched else 'header']
+                kind = classify(record['rejected'])
+                stage[kind] = stage.get(kind, 0) + 1
+                entry['downloaded'] += fetched
+        if not added:
+            return
+        # Re-read so counts other processes added meanwhile are kept
+        self.entries = load_json(self.state_file, {})
+        for key, counts in added.items():
+            entry = self.entries.setdefault(key, empty_entry())
+            entry['downloaded'] += counts['downloaded']
+            entry['accepted'] += counts['accepted']
+            for stage in ('header', 'processing'):
+                for kind, n in counts[stage].items():
+                    entry[stage][kind] = entry[stage].get(kind, 0) + n
+        save_json(self.state_file, self.entries)
+
+    def _totals(self, keys, filters=FILTERS, probed=FILTERS):
+        """
+        (downloads, kept) of keys as a job applying filters would have seen them
+
+        Rejections by a filter the job does not apply count as kept. Header
+        rejections by a filter it only applies after downloading count as
+        downloads it would have used up, then rejected.
+        """
+        downloaded = kept = 0
+        for entry in (self.entries[k] for k in keys if k in self.entries):
+            late = {kind: n for kind, n in entry['header'].items() if kind not in probed}
+            rejected = sum(n for kind, n in entry['processing'].items() if kind in filters)
+            rejected += sum(n for kind, n in late.items() if kind in filters)
+            seen = entry['downloaded'] + sum(late.values())
+            downloaded += seen
+            kept += seen - rejected
+        return downloaded, kept
+
+    def rate(self, provider, queries, prior_rate=0.5, filters=FILTERS, probed=FILTERS):
+        """
+        Expected share of downloads that end up kept, for these queries
+
+        The queries' own history is shrunk toward the provider-wide rate,
+        which in turn is shrunk toward prior_rate, so a new query starts
+        from what the provider usually gives and a new install from the
+        caller's guess.
+
+        Args:
+            filters: The FILTERS the job applies
+            probed: Those of them it checks at the header, where a
+                rejection does not use up a download
+        """
+        provider_keys = [k for k in self.entries if k.startswith(f"{provider}|")]
+        downloaded, accepted = self._totals(provider_keys, filters, probed)
+        provider_rate = (accepted + PRIOR_WEIGHT * prior_rate) / (downloaded + PRIOR_WEIGHT)
+        downloaded, accepted = self._totals((self.key(provider, q) for q in queries), filters, probed)
+        return (accepted + PRIOR_WEIGHT * provider_rate) / (downloaded + PRIOR_WEIGHT)
+
+    def downloads_needed(self, provider, queries, target, prior_rate=0.5,
+                         confidence=DEFAULT_CONFIDENCE, filters=FILTERS, probed=FILTERS):
+        """
+        Downloads to request so target images are kept with the given confidence
+
+        Args:
+            provider: Search provider, e.g. 'bing'
+            queries: The job's search terms
+            target: Images the job must keep
+            prior_rate: Acceptance rate assumed with no history at all
+            confidence: Wanted chance of reaching target on the first pass
+            filters: The FILTERS the job applies
+            probed: Those of them it checks at the header
+        """
+        rate = self.rate(provider, queries, prior_rate, filters, probed)
+        needed = downloads_for(target, rate, confidence)
+        print(f"Expected acceptance {rate:.0%} ({', '.join(k for k in FILTERS if k in filters)}): "
+              f"requesting {needed} downloads for {target} images ({confidence:.0%} confidence)")
+        return needed
+
+    def print_report(self):
+        print("=" * 50)
+        print("ACCEPTANCE BY QUERY")
+        print("=" * 50)
+        for key, entry in sorted(self.entries.items()):
+            provider, query = key.split('|', 1)
+            rate = entry['accepted'] / entry['downloaded'] if entry['downloaded'] else 0
+            print(f"\n{provider}: {query}")
+            print(f"  kept {entry['accepted']} of {entry['downloaded']} downloads ({rate:.0%})")
+            for stage in ('header', 'processing'):
+                dropped = ", ".join(f"{kind} {entry[stage][kind]}" for kind in FILTERS
+                                    if entry[stage].get(kind))
+                if dropped:
+                    print(f"  dropped at {stage}: {dropped}")
+        print("=" * 50)
+
+
+if __name__ == "__main__":
+    AcceptanceStats().print_report()
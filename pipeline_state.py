@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Location and helpers for state the download scripts keep between runs
+"""
+
+import json
+import os
+from pathlib import Path
+
+# Relative to the working directory, like the image folders the scripts write
+STATE_DIR = Path(".image_pipeline")
+
+
+def state_path(name):
+    """
+    Return a path inside the state directory, creating the directory if needed
+    """
+    STATE_DIR.mkdir(exist_ok=True)
+    return STATE_DIR / name
+
+
+def load_json(path, default=None):
+    """
+    Read a JSON state file, returning default if it is missing or unreadable
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    """
+    Write a JSON state file atomically (temp file + rename)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-host token-bucket rate limiting for the downloaders
+
+Each host gets its own bucket, so requests to different CDNs never wait on
+each other while any single host still sees a bounded request rate.
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_RATE = 2.0   # requests per second per host
+DEFAULT_BURST = 4    # requests allowed back-to-back before throttling
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Tokens refill continuously at `rate` per second up to `burst`. Taking a
+    token never blocks inside the lock: callers reserve a slot and are told
+    how long to wait, so concurrent waiters are spaced out evenly.
+
+    Args:
+        rate: Tokens added per second
+        burst: Bucket capacity
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be > 0 and burst >= 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take one token and return the seconds to wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class HostRateLimiter:
+    """
+    One token bucket per host
+
+    Args:
+        rate: Default requests per second for each host
+        burst: Default burst size for each host
+        host_rates: Optional {host: (rate, burst)} overrides, e.g. a slower
+            rate for search pages than for image CDNs
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, host_rates=None):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = {host.lower(): limits for host, limits in (host_rates or {}).items()}
+        self.total_wait = 0.0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        host = host.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_rates.get(host, (self.rate, self.burst))
+                bucket = TokenBucket(rate, burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def wait(self, url):
+        """
+        Block until a request to url's host is allowed
+        """
+        delay = self.bucket(urlparse(url).netloc).acquire()
+        self.total_wait += delay
+        return delay
+
+    async def wait_async(self, url):
+        """
+        Await until a request to url's host is allowed
+        """
+        delay = await self.bucket(urlparse(url).netloc).acquire_async()
+        self.total_wait += delay
+        return delay
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Responsive JPEG and WebP ladders for the countdown background images
+
+The countdown preloads every background image at full crop resolution,
+some of them over 1000px square, while a phone shows them a few hundred
+pixels wide. For each image in the countdown folders this writes one
+derivative per ladder width in both formats, under a fixed naming scheme:
+
+    <folder>/responsive/<stem>-<width>.jpg
+    <folder>/responsive/<stem>-<width>.webp
+
+Widths above the source's own are skipped (no upscaling). The rungs each
+image has are listed in the countdown manifest (countdown_manifest.py),
+from which the countdown picks the smallest file that covers the screen.
+Rungs are rebuilt only when the source is newer, and are recorded in the
+asset catalog as derivatives of the source file's hash.
+
+Run from the repository root:
+    python responsive_images.py [folder ...]
+"""
+
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+from asset_catalog import AssetCatalog
+from image_store import hash_file
+from image_workers import REDUCING_GAP, draft_for
+
+LADDER_WIDTHS = (360, 720, 1080)
+
+# Pillow format name and save options per file extension
+FORMATS = {
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+}
+
+# Folders the countdown takes its background images from
+COUNTDOWN_FOLDERS = (
+    "cowboys_memes_square",
+    "micah_solo_square_crop",
+    "micah_jerry_square_crop",
+    "cowboys_memes_funny_crop",
+    "jerry_jones_solo_crop",
+)
+
+
+def ladder_path(path, width, ext):
+    path = Path(path)
+    return path.parent / "responsive" / f"{path.stem}-{width}.{ext}"
+
+
+def source_images(folder):
+    return sorted(p for p in Path(folder).glob("*.jpg") if p.is_file())
+
+
+def build_ladder(path, catalog, widths=LADDER_WIDTHS):
+    """
+    Write the missing or stale rungs of one image's ladder
+
+    Returns:
+        Number of files written
+    """
+    path = Path(path)
+    source_mtime = path.stat().st_mtime
+    with Image.open(path) as img:
+        width, height = img.size
+        stale = [w for w in widths if w <= width and any(
+            not ladder_path(path, w, ext).exists()
+            or ladder_path(path, w, ext).stat().st_mtime < source_mtime for ext in FORMATS)]
+        if not stale:
+            return 0
+
+        # One reduced decode serves every rung
+        largest = max(stale)
+        draft_for(img, (largest, max(1, round(height * largest / width))))
+        img = img.convert('RGB')
+        ladder_path(path, largest, 'jpg').parent.mkdir(exist_ok=True)
+        source_sha256 = hash_file(path)
+        written = 0
+        for rung_width in sorted(stale, reverse=True):
+            rung = img.resize((rung_width, max(1, round(height * rung_width / width))),
+                              Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+            for ext, (fmt, options) in FORMATS.items():
+                out = ladder_path(path, rung_width, ext)
+                rung.save(out, fmt, **options)
+                catalog.record_derivative(source_sha256, f"responsive_{rung_width}_{ext}", out)
+                written += 1
+        return written
+
+
+def available_widths(path, widths=LADDER_WIDTHS):
+    """
+    Ladder widths of an image that exist in every format
+    """
+    return [w for w in widths if all(ladder_path(path, w, ext).exists() for ext in FORMATS)]
+
+
+def print_payload_report(folders):
+    """
+    Bytes per folder for the originals against each rung
+    """
+    print("=" * 50)
+    print("PRELOAD PAYLOAD BY RUNG")
+    print("=" * 50)
+    totals = {}
+    for folder in folders:
+        images = source_images(folder)
+        original = sum(p.stat().st_size for p in images)
+        totals['original'] = totals.get('original', 0) + original
+        rungs = []
+        for width in LADDER_WIDTHS:
+            for ext in FORMATS:
+                # Images too small for a rung are served at their largest one
+                size = 0
+                for path in images:
+                    usable = [w for w in available_widths(path) if w <= width]
+                    size += (ladder_path(path, usable[-1], ext).stat().st_size if usable
+                             else path.stat().st_size)
+                totals[(width, ext)] = totals.get((width, ext), 0) + size
+                rungs.append(f"{width} {ext} {size / 1024:.0f} KB")
+        print(f"\n{folder}: {len(images)} images, originals {original / 1024:.0f} KB")
+        print(f"  {', '.join(rungs)}")
+    if totals.get('original'):
+        print("\nAll folders:")
+        for width in LADDER_WIDTHS:
+            print(f"  {width}px: " + ", ".join(
+                f"{ext} {totals[(width, ext)] / 1024 / 1024:.2f} MB "
+                f"({totals['original'] / totals[(width, ext)]:.1f}x smaller)" for ext in FORMATS))
+        print(f"  originals: {totals['original'] / 1024 / 1024:.2f} MB")
+    print("=" * 50)
+
+
+def build_ladders(folders=COUNTDOWN_FOLDERS):
+    catalog = AssetCatalog()
+    for folder in folders:
+        written = sum(build_ladder(path, catalog) for path in source_images(folder))
+        print(f"{folder}: {written} ladder files written")
+    print_payload_report(folders)
+    print("Run countdown_manifest.py to list the new rungs for the countdown")
+
+
+if __name__ == "__main__":
+    build_ladders(sys.argv[1:] or COUNTDOWN_FOLDERS)
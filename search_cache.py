@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of image URLs extracted from search result pages
+
+Entries are keyed by provider + query + page and expire after a TTL, so a
+second job (or a second script) searching for the same thing goes straight
+to fetching images without a single search request. Only non-empty result
+lists are stored, so a blocked or failed search is retried next time.
+"""
+
+import threading
+import time
+
+from pipeline_state import load_json, save_json, state_path
+
+# Search results change slowly; a day keeps reruns off the search engines
+DEFAULT_TTL = 24 * 60 * 60
+
+# Results per page, so every path caching a provider's pages agrees on
+# what page N holds (the steps of icrawler's Bing and Google feeders)
+PAGE_SIZES = {'bing': 20, 'google': 100}
+
+
+class SearchCache:
+    """
+    Persistent provider+query+page -> image URL list cache
+
+    Args:
+        state_file: JSON file holding the entries (defaults to
+            .image_pipeline/search_cache.json)
+        ttl: Seconds an entry stays valid (None = never expires)
+    """
+
+    def __init__(self, state_file=None, ttl=DEFAULT_TTL):
+        self.state_file = state_file or state_path("search_cache.json")
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(provider, query, page):
+        return f"{provider}|{query}|{page}"
+
+    def _fresh(self, entry, now):
+        return self.ttl is None or now - entry['time'] <= self.ttl
+
+    def get(self, provider, query, page=0):
+        """
+        Cached URL list for a search page, or None if missing or expired
+        """
+        entry = load_json(self.state_file, {}).get(self.key(provider, query, page))
+        with self._lock:
+            if entry and self._fresh(entry, time.time()):
+                self.hits += 1
+                return list(entry['urls'])
+            self.misses += 1
+            return None
+
+    def put(self, provider, query, page, urls):
+        """
+        Store a search page's URLs (ignored if empty); expired entries are pruned
+        """
+        if not urls:
+            return
+        now = time.time()
+        with self._lock:
+            # Re-read so entries written by other processes are kept
+            entries = load_json(self.state_file, {})
+            entries = {k: v for k, v in entries.items() if self._fresh(v, now)}
+            entries[self.key(provider, query, page)] = {'time': now, 'urls': list(urls)}
+            save_json(self.state_file, entries)
+
+    def search(self, provider, query, fetch, page=0):
+        """
+        Return cached URLs for a search page, calling fetch() only on a miss
+
+        Args:
+            provider: Search engine name, e.g. 'bing'
+            query: Search text
+            fetch: Zero-argument callable doing the real search, returning a URL list
+            page: Result page number
+        """
+        urls = self.get(provider, query, page)
+        if urls is None:
+            urls = fetch() or []
+            self.put(provider, query, page, urls)
+        return urls
+
+    def print_summary(self):
+        ttl = "no expiry" if self.ttl is None else f"TTL {self.ttl / 3600:g}h"
+        print(f"Search cache: {self.hits} hits, {self.misses} misses ({ttl})")
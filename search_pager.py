@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Paged image search with the next page fetched in the background
+
+A search engine's first results page often is not enough once the size
+and duplicate filters have thrown images away. SearchPager walks the
+result pages of one query one URL at a time, and once the caller is
+halfway through page N it already requests page N+1 on a background
+thread, so the next batch of URLs is usually waiting by the time it is
+needed. A page is drained before the pager moves on, and the caller
+stops taking URLs as soon as its target count is met; no further pages
+are requested after that.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Hard stop so a query whose results never run dry cannot page forever
+DEFAULT_MAX_PAGES = 5
+
+
+class SearchPager:
+    """
+    Iterates the result pages of one search query
+
+    Args:
+        provider: Search engine name, e.g. 'bing' (used as the cache key)
+        query: Search text
+        fetch_page: Callable taking a 0-based page number and returning that
+            page's image URLs ([] when there are no more results)
+        search_cache: SearchCache to serve pages from (None = always search)
+        max_pages: Most pages to request for this query
+        seen: Set of URLs already handed out, shared between pagers so
+            several queries never yield the same URL twice
+    """
+
+    def __init__(self, provider, query, fetch_page, search_cache=None,
+                 max_pages=DEFAULT_MAX_PAGES, seen=None):
+        self.provider = provider
+        self.query = query
+        self.fetch_page = fetch_page
+        self.search_cache = search_cache
+        self.max_pages = max_pages
+        self.seen = seen if seen is not None else set()
+
+    def load(self, page):
+        """
+        URLs of one result page, from the cache when it has them
+        """
+        if self.search_cache is None:
+            return self.fetch_page(page) or []
+        return self.search_cache.search(self.provider, self.query,
+                                        lambda: self.fetch_page(page), page=page)
+
+    def urls(self, until=None):
+        """
+        Yield (page, url) for each URL not seen before, prefetching the next page
+
+        A URL is added to seen only when it is handed out, so whatever
+        the caller leaves untaken on a page is still open to the next
+        pager sharing the set. Paging ends at max_pages, at an empty page,
+        or at a page with nothing new (engines repeat their last page past
+        the end). A prefetch in flight when the caller stops is left to
+        finish and lands in the search cache for next time.
+
+        Args:
+            until: Zero-argument callable checked before each URL is taken;
+                once it returns True the pager stops
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            pending = executor.submit(self.load, 0)
+            for page in range(self.max_pages):
+                urls = [url for url in dict.fromkeys(pending.result()) if url not in self.seen]
+                if not urls:
+                    return
+                pending = None
+                for taken, url in enumerate(urls):
+                    if until is not None and until():
+                        return
+                    if pending is None and taken >= len(urls) // 2 and page + 1 < self.max_pages:
+                        pending = executor.submit(self.load, page + 1)
+                    # Another pager sharing the set may have handed it out meanwhile
+                    if url in self.seen:
+                        continue
+                    self.seen.add(url)
+                    yield page, url
+                if pending is None:
+                    return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory streaming writes for downloaded files
+
+Chunks go straight to a temp file next to the destination while a SHA-256
+and byte count are computed in the same pass; commit() renames the temp
+file into place atomically. Peak memory is one chunk regardless of size,
+unless the caller wants the bytes in memory as well (or only there).
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 25 * 1024 * 1024
+
+
+def write_atomic(dest, data):
+    """
+    Replace dest with data through a temp file in the same folder
+
+    The bytes are fsynced before the rename, so an interrupted write never
+    leaves a partial file at dest, and a file hard-linked at dest is
+    replaced rather than written through.
+
+    Returns:
+        The destination Path
+    """
+    dest = Path(dest)
+    fd, tmp_path = tempfile.mkstemp(dir=dest.parent, prefix='.download-', suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return dest
+
+
+class MaxBytesExceeded(Exception):
+    """
+    Raised when a download grows past the writer's max_bytes cap
+    """
+
+
+class StreamingWriter:
+    """
+    Write a download through a temp file, hashing as it goes
+
+    Use as a context manager; anything not committed is discarded on exit.
+
+    Args:
+        directory: Where the temp file lives (use the destination's folder
+            so commit() is a same-filesystem rename)
+        max_bytes: Abort with MaxBytesExceeded past this size (None = no cap)
+        memory: Also keep the bytes in memory, so data needs no read back
+        spool: Write the temp file; without it the bytes only exist in
+            memory (memory must be set) and commit() writes them out
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, memory=False, spool=True):
+        if not spool and not memory:
+            raise ValueError("a writer that does not spool must keep the bytes in memory")
+        self.tmp_path = None
+        self._file = None
+        if spool:
+            if directory is not None:
+                Path(directory).mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.download-', suffix='.part')
+            self.tmp_path = Path(tmp_path)
+            self._file = os.fdopen(fd, 'wb')
+        self._buffer = io.BytesIO() if memory else None
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.path = None
+        self._hash = hashlib.sha256()
+
+    def write(self, chunk):
+        if self.max_bytes is not None and self.nbytes + len(chunk) > self.max_bytes:
+            raise MaxBytesExceeded(f"larger than {self.max_bytes:,} bytes")
+        self._hash.update(chunk)
+        if self._file is not None:
+            self._file.write(chunk)
+        if self._buffer is not None:
+            self._buffer.write(chunk)
+        self.nbytes += len(chunk)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    @property
+    def committed(self):
+        return self.path is not None
+
+    @property
+    def data(self):
+        """
+        The bytes written so far, if the writer keeps them in memory (else None)
+        """
+        return self._buffer.getvalue() if self._buffer is not None else None
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def read_bytes(self):
+        """
+        The finished bytes (read back from the file unless kept in memory)
+        """
+        self.close()
+        if self._buffer is not None:
+            return self.data
+        return (self.path or self.tmp_path).read_bytes()
+
+    def commit(self, dest):
+        """
+        Move the finished file to dest, replacing any existing file
+
+        Returns:
+            The destination Path
+        """
+        self.close()
+        dest = Path(dest)
+        if self.tmp_path is None:
+            self.path = write_atomic(dest, self.data)
+            return dest
+        try:
+            os.replace(self.tmp_path, dest)
+        except OSError:
+            # Different filesystem; fall back to copy + delete
+            shutil.move(str(self.tmp_path), str(dest))
+        self.path = dest
+        return dest
+
+    def discard(self):
+        self.close()
+        self._buffer = None
+        if not self.committed and self.tmp_path is not None:
+            try:
+                self.tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.discard()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+One crawl, one decode per image, several output folders
+
+Separate scripts for the 16:9, padded-square and cropped-square
+versions of the same photos cost three crawls and three decodes. A
+variant job declares all its outputs up front: each source is downloaded
+once, decoded once, and every variant that still needs images gets its
+own resize and encode from that decode. The single-output scripts are
+variant jobs with one variant.
+
+Variant keys are "<folder>:<name>", so outputs any job made for a folder
+count as already made. A job first fills its variants from the stored
+originals its other variants were made from or its searches found
+before, so a new folder costs encodes, and the crawl only runs for what
+is still missing after that. The crawl never requests those originals
+again; it looks further down the results instead.
+"""
+
+import math
+from pathlib import Path
+
+from asset_catalog import AssetCatalog
+from crawler_factory import Download, MemoryStorage, start_crawl_terms
+from image_store import ContentStore, next_free_path
+from image_workers import ImagePool
+from job_journal import JobJournal
+from near_duplicates import NearDuplicateIndex
+from image_probe import SizeConstraints
+from overfetch import ALWAYS_APPLIED, DEFAULT_CONFIDENCE, AcceptanceStats
+
+
+class OutputVariant:
+    """
+    One output folder a variant job fills
+
+    Args:
+        folder: Output folder
+        pattern: File name pattern, e.g. "micah_jerry_{:03d}.jpg"
+        shape: image_workers.Shape to make of each source
+        name: Variant name within the folder, e.g. "fill_1280x720"
+        num_images: How many images the folder should end up with
+    """
+
+    def __init__(self, folder, pattern, shape, name, num_images):
+        self.folder = Path(folder)
+        self.pattern = pattern
+        self.shape = shape
+        self.key = f"{self.folder.name}:{name}"
+        self.num_images = num_images
+
+
+def applied_filters(variants, constraints=None, crawl_kwargs=None):
+    """
+    The overfetch filters a job applies, and those of them checked at the header
+
+    A filter in a variant's Shape counts only if every variant has it,
+    since a source any variant keeps is a kept download.
+
+    Returns:
+        (filters, probed)
+    """
+    crawl_kwargs = crawl_kwargs or {}
+    constraints = (constraints or SizeConstraints()).merged(crawl_kwargs.get('min_size'),
+                                                           crawl_kwargs.get('max_size'))
+    probed = set(ALWAYS_APPLIED)
+    if constraints.target_aspect and constraints.aspect_tolerance is not None:
+        probed.add('aspect')
+    if constraints.min_size or constraints.max_size or constraints.min_dimension:
+        probed.add('size')
+    filters = set(probed)
+    if all(variant.shape.aspect_tolerance is not None for variant in variants):
+        filters.add('aspect')
+    if all(variant.shape.min_side for variant in variants):
+        filters.add('size')
+    return filters, probed
+
+
+def run_variant_job(job_name, search_terms, variants, prior_rate=0.5, provider='bing',
+                    confidence=DEFAULT_CONFIDENCE, crawl_kwargs=None, **crawl_options):
+    """
+    Fill every variant's folder from one crawl of search_terms
+
+    Args:
+        job_name: Journal name, unique per job
+        search_terms: Queries to crawl
+        variants: OutputVariants to fill
+        prior_rate: Acceptance rate assumed for queries with no history
+        provider: Search provider the crawl uses (for acceptance stats)
+        confidence: Wanted chance of filling every variant from one crawl
+        crawl_kwargs: Extra keyword arguments for each crawl() call
+        **crawl_options: Passed to start_crawl_terms (constraints, probe_stats, ...)
+
+    Returns:
+        {variant key: number of images kept}
+    """
+    for variant in variants:
+        variant.folder.mkdir(exist_ok=True)
+
+    # Checkpoints every URL; an interrupted run picks up where it stopped
+    journal = JobJournal(job_name)
+    journal.print_resume_summary()
+
+    catalog = AssetCatalog()
+    content_store = ContentStore()
+    near_dups = NearDuplicateIndex()
+    for variant in variants:
+        near_dups.index_folder(variant.folder)
+    # Each pool's workers get a snapshot of the index once and skip
+    # near-duplicates before shaping; added carries what was kept since
+    added = {}
+
+    kept = {variant.key: journal.outputs(variant.key) for variant in variants}
+    wanted = {}
+
+    def missing():
+        return [i for i, variant in enumerate(variants)
+                if len(kept[variant.key]) < variant.num_images]
+
+    def outputs_of(download):
+        record = journal.for_file(download.name)
+        return record.get('outputs', {}) if record else {}
+
+    def needs_work(download):
+        # Reuse outputs made from this source before; remember which
+        # variants still want it
+        todo = []
+        made = {}
+        for i in missing():
+            variant = variants[i]
+            cached = catalog.derived_path(download.sha256, variant.key)
+            if not cached:
+                todo.append(i)
+                continue
+            print(f"[CACHED] {download.name} already processed as {variant.folder.name}/{cached.name}")
+            if cached not in kept[variant.key]:
+                kept[variant.key].append(cached)
+            made[variant.key] = str(cached)
+        if made:
+            journal.mark_file(download.name, 'written', outputs=dict(outputs_of(download), **made))
+        wanted[download.name] = todo
+        return bool(todo)
+
+    def keep(download, rendered):
+        if rendered.error:
+            print(f"Error processing {download.name}: {rendered.error}")
+            journal.mark_file(download.name, 'processed', rejected=rendered.error)
+            return
+        width, height = rendered.size
+        written = {}
+        reasons = []
+        for i, (variant, output) in enumerate(zip(variants, rendered.outputs)):
+            if output is None or len(kept[variant.key]) >= variant.num_images:
+                continue
+            if output.skipped:
+                print(f"[SKIP] {download.name} ({width}x{height}) for {variant.folder.name}: {output.skipped}")
+                reasons.append(output.skipped)
+                continue
+
+            # Same photo already kept in this folder (other crop or recompression)?
+            # The worker caught matches its snapshot knew of; one kept while
+            # the download was in flight is caught here
+            duplicate = near_dups.find(rendered.hashes, scope=variant.folder)
+            if duplicate or output.duplicate:
+                match = (f"{variant.folder.name}/{duplicate[0].name} ({duplicate[1]} bits apart)"
+                         if duplicate else f"an image in {variant.folder.name}")
+                print(f"[DUP] {download.name} near-duplicate of {match}")
+                reasons.append("near-duplicate")
+                continue
+
+            new_name = next_free_path(variant.folder, variant.pattern, len(kept[variant.key]) + 1)
+            new_name.write_bytes(output.output)
+            kept[variant.key].append(new_name)
+            catalog.record_derivative(download.sha256, variant.key, new_name)
+            near_dups.add(new_name, rendered.hashes)
+            added[i].append(rendered.hashes)
+            written[variant.key] = str(new_name)
+            print(f"[OK] {download.name} ({width}x{height}) -> {variant.folder.name}/{new_name.name} "
+                  f"{output.output_size[0]}x{output.output_size[1]} ({output.pixels})")
+        if written:
+            journal.mark_file(download.name, 'written', outputs=dict(outputs_of(download), **written))
+        elif reasons and not outputs_of(download):
+            journal.mark_file(download.name, 'processed', rejected=reasons[0])
+
+    # One decode per source feeds every variant it is still wanted for
+    pool = ImagePool(*(variant.shape for variant in variants))
+
+    def snapshot():
+        added.update((i, []) for i in range(len(variants)))
+        return near_dups.snapshot({i: variant.folder for i, variant in enumerate(variants)})
+
+    print("\n1. Filling variants from originals already downloaded...")
+
+    def stored_sources():
+        known = catalog.sources(variant.key for variant in variants)
+        for sha256 in dict.fromkeys(known + catalog.query_sources(provider, search_terms)):
+            if not missing():
+                return
+            if not content_store.has(sha256):
+                continue
+            download = Download(f"{sha256[:12]} (stored)", sha256, None)
+            if needs_work(download):
+                download.data = content_store.object_path(sha256).read_bytes()
+                yield download
+
+    for download, rendered in pool.run(stored_sources(), wanted=lambda d: wanted.pop(d.name),
+                                       known=snapshot(), added=added):
+        keep(download, rendered)
+
+    shortfall = max((variants[i].num_images - len(kept[variants[i].key]) for i in missing()), default=0)
+    if shortfall:
+        # How many downloads to ask for, from these queries' past acceptance rates
+        acceptance = AcceptanceStats()
+        filters, probed = applied_filters(variants, crawl_options.get('constraints'), crawl_kwargs)
+        download_extra = acceptance.downloads_needed(provider, search_terms, shortfall,
+                                                     prior_rate=prior_rate, confidence=confidence,
+                                                     filters=filters, probed=probed)
+
+        print(f"\n2. Downloading up to {download_extra} images for every variant at once...")
+
+        # Downloads stay in memory; only the processed outputs are written.
+        # Originals stored by earlier runs were offered above, so they are skipped
+        storage = MemoryStorage(journal)
+        per_term = math.ceil(download_extra / len(search_terms))
+        crawl = start_crawl_terms(variants[0].folder, search_terms, max_num=per_term,
+                                  journal=journal, storage=storage, skip_stored=True,
+                                  crawl_kwargs=crawl_kwargs, **crawl_options)
+
+        def crawled():
+            # The crawl stops once every variant has enough
+            for download in storage.stream(crawl, until=lambda: not missing()):
+                if needs_work(download):
+                    yield download
+
+        for download, rendered in pool.run(crawled(), wanted=lambda d: wanted.pop(d.name),
+                                           known=snapshot(), added=added):
+            if not missing():
+                break
+            keep(download, rendered)
+
+        crawl.close()
+        acceptance.record_job(journal)
+    near_dups.close()
+    journal.complete()
+
+    print("\n" + "=" * 50)
+    print("VARIANT JOB COMPLETE!")
+    for variant in variants:
+        print(f"{variant.folder.name}: {len(kept[variant.key])} of {variant.num_images} images "
+              f"({variant.key.split(':', 1)[1]})")
+    print("=" * 50)
+
+    return {key: len(paths) for key, paths in kept.items()}